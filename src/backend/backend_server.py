@@ -1,5 +1,9 @@
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.routing import Match
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend.server_router import server_router
@@ -8,10 +12,80 @@ from backend.network_router import network_router
 from backend.image_router import image_router
 from backend.flavor_router import flavor_router
 from backend.node_router import node_router
-from config.config import server_config
+from backend.job_router import job_router
+from backend.system_router import system_router
+from backend.metrics_router import metrics_router
+from backend.debug_router import debug_router
+from config.config import server_config, openstack_config
+from database.factories import AsyncMySQLEngineFactory
+from openStack.connection import connection_registry
+from openStack.executor import openstack_executor
 from util.logger import get_logger
+from util.job_manager import job_manager
+from util.metrics import metrics
+from util.resource_ledger import resource_ledger
+from util.scheduler import expiry_scheduler, sweeper
+from util.tracing import tracer, request_id_from, REQUEST_ID_HEADER
+from util.warm_pool import warm_pool
 
 backend_logger = get_logger(name='backend', log_level='INFO', save_path="./log/backend")
+UNTRACED_PATHS = ('/debug/', '/metrics')
+http_requests = metrics.counter('kws_http_requests_total', 'API 요청 수', ('method', 'route', 'status'))
+http_in_flight = metrics.gauge('kws_http_requests_in_flight', '처리 중인 API 요청 수', ('method', 'route'))
+http_request_seconds = metrics.histogram('kws_http_request_duration_seconds', 'API 요청 처리 시간', ('method', 'route'))
+
+
+class TracingMiddleware(BaseHTTPMiddleware):
+    """
+    요청마다 요청 ID를 정해(클라이언트가 보낸 X-Request-ID 또는 새로 발급) 트레이스를 시작하고 응답 헤더로 돌려줍니다.
+    트레이스 조회(/debug)와 지표(/metrics) 요청은 트레이스를 남기지 않습니다.
+    """
+    async def dispatch(self, request: Request, call_next):
+        if request.url.path.startswith(UNTRACED_PATHS):
+            return await call_next(request)
+
+        request_id = request_id_from(request.headers.get(REQUEST_ID_HEADER))
+        # 실제 경로에는 작업 ID처럼 노출되면 안 되는 값이 들어가므로 트레이스에는 경로 템플릿만 기록
+        route = _route_template(request)
+        token = tracer.start(request_id, f"{request.method} {route}")
+        status_code = 500
+        try:
+            with tracer.span('http', method=request.method, route=route):
+                response = await call_next(request)
+            status_code = response.status_code
+        finally:
+            tracer.end(token, status_code)
+        response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """
+    라우트(경로 템플릿)별 요청 수, 처리 중인 요청 수, 처리 시간을 기록합니다.
+    스트리밍 응답(SSE)은 응답 헤더를 보낼 때까지의 시간만 기록됩니다.
+    """
+    async def dispatch(self, request: Request, call_next):
+        labels = {'method': request.method, 'route': _route_template(request)}
+        http_in_flight.inc(**labels)
+        start = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            http_in_flight.dec(**labels)
+            http_request_seconds.observe(time.perf_counter() - start, **labels)
+            http_requests.inc(status=status_code, **labels)
+
+
+def _route_template(request: Request) -> str:
+    # 경로 파라미터가 들어간 실제 경로 대신 /jobs/{job_id} 같은 템플릿을 라벨로 사용
+    for route in request.app.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return 'unmatched'
 
 
 class LoggingMiddleware(BaseHTTPMiddleware):
@@ -26,19 +100,51 @@ origins = [
     f"http://{server_config['frontend']['host']}:{server_config['frontend']['port']}"
 ]
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_manager.recover()
+    resource_ledger.load()
+    if openstack_config['connection']['connect_on_startup']:
+        backend_logger.info("노드 병렬 연결 시작")
+        errors = await run_in_threadpool(connection_registry.connect_all)
+        for node_name, error in errors.items():
+            backend_logger.error(f"[{node_name}] : 연결 실패 {error}")
+    await run_in_threadpool(expiry_scheduler.start)
+    warm_pool.start()
+    yield
+    backend_logger.info("작업 워커 종료")
+    warm_pool.stop()
+    expiry_scheduler.stop()
+    sweeper.shutdown()
+    job_manager.shutdown()
+    openstack_executor.shutdown(wait=False)
+    await AsyncMySQLEngineFactory().get_instance().dispose()
+
+
 backend_logger.info("서버 실행 시작")
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(server_router)
 app.include_router(container_router)
 app.include_router(network_router)
 app.include_router(image_router)
 app.include_router(flavor_router)
 app.include_router(node_router)
+app.include_router(job_router)
+app.include_router(system_router)
+app.include_router(metrics_router)
+# 트레이스 조회는 인증 없이 모든 요청의 타임라인을 보여주므로 설정으로 켰을 때만 등록
+if server_config['tracing']['debug_endpoint']:
+    app.include_router(debug_router)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 목록 페이지네이션 커서와 이미지 목록 재검증용 헤더를 프론트엔드에서 읽을 수 있도록 노출
+    expose_headers=["X-Next-Cursor", "ETag", REQUEST_ID_HEADER],
 )
 app.add_middleware(LoggingMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
@@ -1,39 +1,59 @@
 import hashlib
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Depends, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from openStack.bulkhead import Admission, BulkheadFullError, node_bulkhead
 from openStack.openstack_controller import OpenStackController
-from database.factories import MySQLEngineFactory
-from model.api_request_models import ContainerCreateRequestDTO, ContainerExtensionRequestDTO, ContainerReturnRequestDTO
-from model.api_response_models import ApiResponse, ErrorResponse, ContainersResponseDTO
+from database.factories import MySQLEngineFactory, AsyncMySQLEngineFactory
+from model.api_request_models import (ContainerCreateRequestDTO, ContainerBatchCreateRequestDTO,
+                                      ContainerExtensionRequestDTO, ContainerReturnRequestDTO, InstanceListRequestDTO)
+from model.api_response_models import ApiResponse, ErrorResponse, ContainersResponseDTO, JobAcceptedResponseDTO
 from model.db_models import Container
 from util.utils import create_env_dict, create_cmd_list, alphabet_check, str_to_date, extension_date_check
-from util.selector import get_available_container_node
+from util.selector import reserve_container_node
 from util.logger import get_logger
-from util.backend_utils import create_network, network_delete, network_rollback
-from config.config import openstack_config
+from util.backend_utils import (create_network, insert_network, network_delete, network_rollback,
+                                node_network_delete, load_instance_list, too_many_requests)
+from util.batch import run_batch
+from util.job_manager import job_manager, JobStatus, JobQueueFullError, JobConflictError
+from util.resource_ledger import Reservation, resource_ledger
+from util.response_cache import response_cache
+from util.scheduler import expiry_scheduler
+from config.config import openstack_config, server_config
 
 
 container_router = APIRouter(prefix="/container")
 controller = OpenStackController()
 db_connection = MySQLEngineFactory().get_instance()
+async_db_connection = AsyncMySQLEngineFactory().get_instance()
 backend_logger = get_logger(name='backend', log_level='INFO', save_path="./log/backend")
 
 
 @container_router.get("/list")
-def container_show():
+async def container_show(list_request: InstanceListRequestDTO = Depends()):
+    """
+    user_name, node_name, end_date_from/end_date_to(YYYY-MM-DD), name_prefix로 필터링하고
+    fields(쉼표 구분)로 응답 필드를 고를 수 있습니다.
+    limit을 지정하면 limit개씩 나누어 반환하며, 다음 페이지가 있으면 X-Next-Cursor 헤더의 값을 cursor로 전달합니다.
+    """
     backend_logger.info("컨테이너 목록 요청 수신")
-    with Session(db_connection) as session, session.begin():
-        containers = session.scalars(select(Container)).all()
-        containers_list = []
-        for container in containers:
-            container_dict = container.__dict__
-            del container_dict['id']
-            del container_dict['_sa_instance_state']
-            del container_dict['password']
-            containers_list.append(ContainersResponseDTO(**container_dict).__dict__)
-    return ApiResponse(status.HTTP_200_OK, containers_list)
+    try:
+        containers_list, next_cursor = await response_cache.get_or_load_async(
+            'container_list',
+            (Container.__tablename__,),
+            lambda: load_instance_list(engine=async_db_connection,
+                                       model=Container,
+                                       name_column=Container.container_name,
+                                       response_fields=ContainersResponseDTO.FIELDS,
+                                       list_request=list_request),
+            params=tuple(list_request.model_dump().items()))
+    except ValueError as e:
+        return ErrorResponse(status.HTTP_400_BAD_REQUEST, str(e))
+
+    headers = {'X-Next-Cursor': next_cursor} if next_cursor is not None else None
+    return ApiResponse(status.HTTP_200_OK, containers_list, headers=headers)
 
 
 @container_router.post("/rental")
@@ -44,31 +64,67 @@ def rental(container_info: ContainerCreateRequestDTO):
         if len(session.scalars(select(Container).where(Container.container_name == container_info.container_name)).all()) != 0:
             return ErrorResponse(status.HTTP_400_BAD_REQUEST, "컨테이너 이름 중복")
 
-        backend_logger.info("컨테이너 이름 검사")
-        if not alphabet_check(container_info.container_name):
-            return ErrorResponse(status.HTTP_400_BAD_REQUEST, "컨테이너 이름은 알파벳과 숫자로만 구성되어야 합니다.")
+    backend_logger.info("컨테이너 이름 검사")
+    if not alphabet_check(container_info.container_name):
+        return ErrorResponse(status.HTTP_400_BAD_REQUEST, "컨테이너 이름은 알파벳과 숫자로만 구성되어야 합니다.")
 
-        if container_info.network_name is None:
-            backend_logger.info("외부 네트워크 사용")
-            container_info.network_name = openstack_config['external_network']['name']
+    if container_info.network_name is None:
+        backend_logger.info("외부 네트워크 사용")
+        container_info.network_name = openstack_config['external_network']['name']
+
+    if container_info.cpu is None:
+        container_info.cpu = openstack_config['container']['cpu']
+    if container_info.memory is None:
+        container_info.memory = openstack_config['container']['memory']
+
+    backend_logger.info("노드 선택 및 자원 선점")
+    reservation = reserve_container_node(cpu=container_info.cpu,
+                                         memory=container_info.memory,
+                                         user_name=container_info.user_name)
+    if reservation is None:
+        return ErrorResponse(status.HTTP_406_NOT_ACCEPTABLE, "시스템의 리소스가 부족합니다.")
+    try:
+        admission = node_bulkhead.admit(reservation.node_name, container_info.user_name)
+    except BulkheadFullError as e:
+        resource_ledger.release(reservation)
+        return too_many_requests(e)
 
-        backend_logger.info("노드 선택")
-        node_name = get_available_container_node()
+    response = _submit_job(job_type='container_rental',
+                           target_name=container_info.container_name,
+                           task=admission.bind(_rental_task),
+                           dispatch=admission.dispatch,
+                           container_info=container_info,
+                           reservation=reservation)
+    if response.status_code != status.HTTP_202_ACCEPTED:
+        admission.release()
+        resource_ledger.release(reservation)
+    return response
 
+
+def _rental_task(job_id: str, container_info: ContainerCreateRequestDTO, reservation: Reservation):
+    node_name = reservation.node_name
+    # 노드 슬롯과 워커를 기다리는 동안 선점이 만료되지 않도록 작업이 시작될 때 만료 시각을 늘림
+    if not resource_ledger.refresh(reservation):
+        raise Exception("시스템의 리소스가 부족합니다.")
+    with Session(db_connection) as session:
         try:
+            job_manager.set_stage(job_id, 'network')
             create_network(session=session,
                            controller=controller,
                            network_name=container_info.network_name,
                            subnet_cidr=container_info.subnet_cidr,
                            node_name=node_name)
 
+            job_manager.set_stage(job_id, 'boot')
             backend_logger.info("컨테이너 생성")
             container = controller.create_container(container_name=container_info.container_name,
                                                     node_name=node_name,
                                                     image_name=container_info.image_name,
                                                     network_name=container_info.network_name,
                                                     env=create_env_dict(container_info.env),
-                                                    cmd=create_cmd_list(container_info.cmd))
+                                                    cmd=create_cmd_list(container_info.cmd),
+                                                    cpu=container_info.cpu,
+                                                    memory=container_info.memory)
 
             sha256 = hashlib.sha256()
             sha256.update(container_info.password.encode('utf-8'))
@@ -81,14 +137,22 @@ def rental(container_info: ContainerCreateRequestDTO):
                 password=sha256.hexdigest(),
                 ip=list(container.addresses.values())[0][0]['addr'],
                 port=str(container.ports),
+                cpu=container_info.cpu,
+                memory=container_info.memory,
                 network_name=container_info.network_name,
                 node_name=node_name
             )
+            job_manager.set_stage(job_id, 'db_commit')
             backend_logger.info("데이터베이스에 인스턴스 저장")
             session.add(container)
-            session.commit()
+            with resource_ledger.claim(reservation):
+                session.commit()
+            expiry_scheduler.schedule_container(container_name=container_info.container_name,
+                                                node_name=node_name,
+                                                end_date=str_to_date(container_info.end_date))
         except Exception as e:
             backend_logger.error(e)
+            job_manager.set_stage(job_id, 'rollback')
             controller.delete_container(container_name=container_info.container_name,
                                         node_name=node_name)
             network_rollback(session=session,
@@ -96,48 +160,265 @@ def rental(container_info: ContainerCreateRequestDTO):
                              network_name=container_info.network_name,
                              node_name=node_name)
             session.rollback()
-            return ErrorResponse(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
+            raise
+        finally:
+            resource_ledger.release(reservation)
 
-        return ApiResponse(status.HTTP_201_CREATED, None)
 
+@container_router.post("/rental/batch")
+def rental_batch(batch_info: ContainerBatchCreateRequestDTO):
+    """
+    여러 컨테이너를 한 번에 대여합니다.
+    모든 컨테이너의 노드를 먼저 선택해 자원을 선점하며, 하나라도 배치할 수 없으면 아무것도 대여하지 않습니다.
+    노드별로 네트워크를 한 번씩만 준비한 뒤 컨테이너를 병렬로 생성하고, 작업 결과로 컨테이너별 결과를 반환합니다.
+    """
+    backend_logger.info("컨테이너 일괄 대여 요청 수신")
+    containers = batch_info.containers
+    max_items = server_config['batch']['max_items']
+    if not 1 <= len(containers) <= max_items:
+        return ErrorResponse(status.HTTP_400_BAD_REQUEST, f"한 번에 1개 이상 {max_items}개 이하의 컨테이너를 대여할 수 있습니다.")
+
+    container_names = [container_info.container_name for container_info in containers]
+    backend_logger.info("컨테이너 이름 검사")
+    if len(set(container_names)) != len(container_names):
+        return ErrorResponse(status.HTTP_400_BAD_REQUEST, "요청에 같은 컨테이너 이름이 여러 번 포함되어 있습니다.")
+    if not all(alphabet_check(container_name) for container_name in container_names):
+        return ErrorResponse(status.HTTP_400_BAD_REQUEST, "컨테이너 이름은 알파벳과 숫자로만 구성되어야 합니다.")
+    with Session(db_connection) as session:
+        backend_logger.info("컨테이너 중복 여부 검사")
+        duplicated = session.scalars(select(Container.container_name)
+                                     .where(Container.container_name.in_(container_names))).all()
+        if len(duplicated) != 0:
+            return ErrorResponse(status.HTTP_400_BAD_REQUEST, f"컨테이너 이름 중복: {', '.join(duplicated)}")
+
+    for container_info in containers:
+        if container_info.network_name is None:
+            container_info.network_name = openstack_config['external_network']['name']
+        if container_info.cpu is None:
+            container_info.cpu = openstack_config['container']['cpu']
+        if container_info.memory is None:
+            container_info.memory = openstack_config['container']['memory']
+
+    backend_logger.info("노드 선택 및 자원 선점")
+    reservations = {}
+    # 큰 컨테이너부터 배치해야 남은 자원이 작은 조각으로 흩어지지 않음
+    for container_info in sorted(containers,
+                                 key=lambda container_info: (container_info.cpu, container_info.memory),
+                                 reverse=True):
+        reservation = reserve_container_node(cpu=container_info.cpu,
+                                             memory=container_info.memory,
+                                             user_name=container_info.user_name)
+        if reservation is None:
+            for reservation in reservations.values():
+                resource_ledger.release(reservation)
+            return ErrorResponse(status.HTTP_406_NOT_ACCEPTABLE,
+                                 f"시스템의 리소스가 부족합니다. ({container_info.container_name})")
+        reservations[container_info.container_name] = reservation
+    try:
+        admissions = dict(zip(container_names, node_bulkhead.admit_many(
+            [(reservations[container_info.container_name].node_name, container_info.user_name)
+             for container_info in containers])))
+    except BulkheadFullError as e:
+        for reservation in reservations.values():
+            resource_ledger.release(reservation)
+        return too_many_requests(e)
+
+    response = _submit_job(job_type='container_rental_batch',
+                           target_name=containers[0].container_name,
+                           task=_rental_batch_task,
+                           containers=containers,
+                           reservations=reservations,
+                           admissions=admissions)
+    if response.status_code != status.HTTP_202_ACCEPTED:
+        for container_name in container_names:
+            admissions[container_name].release()
+            resource_ledger.release(reservations[container_name])
+    return response
 
-@container_router.put("/extension")
-def container_extension(container_info: ContainerExtensionRequestDTO):
-    backend_logger.info("컨테이너 연장 요청 수신")
-    sha256 = hashlib.sha256()
-    sha256.update(container_info.password.encode('utf-8'))
 
-    with (Session(db_connection) as session):
+def _rental_batch_task(job_id: str,
+                       containers: list[ContainerCreateRequestDTO],
+                       reservations: dict[str, Reservation],
+                       admissions: dict[str, Admission]):
+    # 네트워크 행은 모든 노드가 공유하므로 노드별 준비를 병렬로 실행하기 전에 한 번만 삽입
+    job_manager.set_stage(job_id, 'prepare')
+    with Session(db_connection) as session:
         try:
-            container = session.scalars(
-                select(Container)
-                .where(Container.container_name == container_info.container_name)
-            ).one()
+            for container_info in {container_info.network_name: container_info for container_info in containers}.values():
+                insert_network(session=session,
+                               network_name=container_info.network_name,
+                               subnet_cidr=container_info.subnet_cidr)
+            session.commit()
+        except Exception as e:
+            backend_logger.error(e)
+            for container_info in containers:
+                admissions[container_info.container_name].release()
+                resource_ledger.release(reservations[container_info.container_name])
+            raise
+
+    def prepare(node_name: str, node_containers: list[ContainerCreateRequestDTO]):
+        with Session(db_connection) as session:
+            for container_info in {container_info.network_name: container_info
+                                   for container_info in node_containers}.values():
+                create_network(session=session,
+                               controller=controller,
+                               network_name=container_info.network_name,
+                               subnet_cidr=container_info.subnet_cidr,
+                               node_name=node_name)
+            session.commit()
 
-            backend_logger.info("비밀번호 검사")
-            if sha256.hexdigest() != container.password:
-                return ErrorResponse(status.HTTP_400_BAD_REQUEST, "비밀번호가 맞지 않습니다.")
+    results = run_batch(items=containers,
+                        name_of=lambda container_info: container_info.container_name,
+                        node_of=lambda container_info: reservations[container_info.container_name].node_name,
+                        prepare=prepare,
+                        provision=lambda container_info: admissions[container_info.container_name].bind(
+                            _provision_container)(container_info, reservations[container_info.container_name]),
+                        discard=lambda container_info: _discard_container(container_info,
+                                                                          reservations[container_info.container_name],
+                                                                          admissions[container_info.container_name]),
+                        max_parallel=server_config['batch']['max_parallel'],
+                        on_progress=lambda done, total: job_manager.set_stage(job_id, f'provision {done}/{total}'))
 
-            new_end_date = str_to_date(container_info.end_date)
-            if not extension_date_check(old_end_date=container.end_date, new_end_date=new_end_date):
-                return ErrorResponse(status.HTTP_400_BAD_REQUEST, "현재 대여 종료 일자 이후의 날짜를 선택 해야 합니다.")
+    failed = [container_info for container_info, result in zip(containers, results)
+              if result['status'] != JobStatus.SUCCEEDED]
+    if len(failed) != 0:
+        job_manager.set_stage(job_id, 'cleanup')
+        with Session(db_connection) as session:
+            try:
+                # 같은 네트워크라도 노드마다 따로 만들었으므로 (이름, 노드)별로 정리
+                network_nodes = {}
+                for container_info in failed:
+                    network_nodes.setdefault(container_info.network_name, set()).add(
+                        reservations[container_info.container_name].node_name)
+                for network_name, node_names in network_nodes.items():
+                    node_network_delete(session=session,
+                                        controller=controller,
+                                        network_name=network_name,
+                                        node_names=node_names)
+                session.commit()
+            except Exception as e:
+                backend_logger.error(e)
+                session.rollback()
+    return results
 
+
+def _discard_container(container_info: ContainerCreateRequestDTO, reservation: Reservation, admission: Admission):
+    backend_logger.info(f"[{reservation.node_name}] : 컨테이너 {container_info.container_name} 생성 취소")
+    admission.release()
+    resource_ledger.release(reservation)
+
+
+def _provision_container(container_info: ContainerCreateRequestDTO, reservation: Reservation):
+    node_name = reservation.node_name
+    # 노드 슬롯과 워커를 기다리는 동안 선점이 만료되지 않도록 작업이 시작될 때 만료 시각을 늘림
+    if not resource_ledger.refresh(reservation):
+        raise Exception("시스템의 리소스가 부족합니다.")
+    with Session(db_connection) as session:
+        try:
+            backend_logger.info(f"[{node_name}] : 컨테이너 {container_info.container_name} 생성")
+            container = controller.create_container(container_name=container_info.container_name,
+                                                    node_name=node_name,
+                                                    image_name=container_info.image_name,
+                                                    network_name=container_info.network_name,
+                                                    env=create_env_dict(container_info.env),
+                                                    cmd=create_cmd_list(container_info.cmd),
+                                                    cpu=container_info.cpu,
+                                                    memory=container_info.memory)
+
+            sha256 = hashlib.sha256()
+            sha256.update(container_info.password.encode('utf-8'))
+            session.add(Container(
+                user_name=container_info.user_name,
+                container_name=container_info.container_name,
+                start_date=container_info.start_date,
+                end_date=container_info.end_date,
+                image_name=container_info.image_name,
+                password=sha256.hexdigest(),
+                ip=list(container.addresses.values())[0][0]['addr'],
+                port=str(container.ports),
+                cpu=container_info.cpu,
+                memory=container_info.memory,
+                network_name=container_info.network_name,
+                node_name=node_name
+            ))
+            with resource_ledger.claim(reservation):
+                session.commit()
+            expiry_scheduler.schedule_container(container_name=container_info.container_name,
+                                                node_name=node_name,
+                                                end_date=str_to_date(container_info.end_date))
+        except Exception:
+            session.rollback()
+            controller.delete_container(container_name=container_info.container_name, node_name=node_name)
+            raise
+        finally:
+            resource_ledger.release(reservation)
+
+
+@container_router.put("/extension")
+async def container_extension(container_info: ContainerExtensionRequestDTO):
+    backend_logger.info("컨테이너 연장 요청 수신")
+    async with AsyncSession(async_db_connection) as session:
+        container = (await session.scalars(select(Container)
+                                           .where(Container.container_name == container_info.container_name))).one_or_none()
+        if container is None:
+            return ErrorResponse(status.HTTP_404_NOT_FOUND, "존재하지 않는 컨테이너입니다.")
+
+        backend_logger.info("비밀번호 검사")
+        if not _password_matches(container, container_info.password):
+            return ErrorResponse(status.HTTP_400_BAD_REQUEST, "비밀번호가 맞지 않습니다.")
+
+        new_end_date = str_to_date(container_info.end_date)
+        if not extension_date_check(old_end_date=container.end_date, new_end_date=new_end_date):
+            return ErrorResponse(status.HTTP_400_BAD_REQUEST, "현재 대여 종료 일자 이후의 날짜를 선택 해야 합니다.")
+
+        # 종료 일자만 바꾸는 단일 행 UPDATE이므로 작업으로 등록하지 않고 바로 처리
+        node_name = container.node_name
+        try:
             container.end_date = new_end_date
-            session.add(container)
-            session.commit()
+            await session.commit()
         except Exception as e:
             backend_logger.error(e)
+            await session.rollback()
             return ErrorResponse(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
+    expiry_scheduler.schedule_container(container_name=container_info.container_name,
+                                        node_name=node_name,
+                                        end_date=new_end_date)
     return ApiResponse(status.HTTP_200_OK, None)
 
 
 @container_router.delete("/return")
 def container_return(container_info: ContainerReturnRequestDTO):
     backend_logger.info("컨테이너 반환 요청 수신")
-    sha256 = hashlib.sha256()
-    sha256.update(container_info.password.encode('utf-8'))
+    with Session(db_connection) as session:
+        container = session.scalars(select(Container)
+                                    .where(Container.container_name == container_info.container_name)).one_or_none()
+        if container is None:
+            return ErrorResponse(status.HTTP_404_NOT_FOUND, "존재하지 않는 컨테이너입니다.")
+        # 잘못된 요청이 작업 슬롯과 노드 슬롯을 차지하지 않도록 작업 등록 전에 확인
+        backend_logger.info("비밀번호 검사")
+        if not _password_matches(container, container_info.password):
+            return ErrorResponse(status.HTTP_400_BAD_REQUEST, "비밀번호가 맞지 않습니다.")
+        node_name, user_name = container.node_name, container.user_name
+    try:
+        admission = node_bulkhead.admit(node_name, user_name)
+    except BulkheadFullError as e:
+        return too_many_requests(e)
+
+    response = _submit_job(job_type='container_return',
+                           target_name=container_info.container_name,
+                           task=admission.bind(_container_return_task),
+                           dispatch=admission.dispatch,
+                           container_info=container_info)
+    if response.status_code != status.HTTP_202_ACCEPTED:
+        admission.release()
+    return response
+
 
+def _container_return_task(job_id: str, container_info: ContainerReturnRequestDTO):
+    """
+    비밀번호는 요청 처리 중(container_return)에 확인합니다.
+    """
     with Session(db_connection) as session:
         try:
             container = session.scalars(
@@ -147,23 +428,50 @@ def container_return(container_info: ContainerReturnRequestDTO):
 
             network_name = container.network_name
             node_name = container.node_name
+            user_name = container.user_name
+            cpu = container.cpu if container.cpu is not None else openstack_config['container']['cpu']
+            memory = container.memory if container.memory is not None else openstack_config['container']['memory']
 
-            backend_logger.info("비밀번호 검사")
-            if sha256.hexdigest() != container.password:
-                return ErrorResponse(status.HTTP_400_BAD_REQUEST, "비밀번호가 맞지 않습니다.")
-
+            job_manager.set_stage(job_id, 'delete_container')
             backend_logger.info("컨테이너 삭제")
             controller.delete_container(container_name=container_info.container_name,
                                         node_name=container.node_name)
+            job_manager.set_stage(job_id, 'db_commit')
             backend_logger.info("데이터베이스에 인스턴스 삭제")
             session.delete(container)
             network_delete(session=session,
                            controller=controller,
                            network_name=network_name,
                            node_name=node_name)
-            session.commit()
+            with resource_ledger.change(node_name=node_name,
+                                        vcpu=-cpu,
+                                        ram=-memory,
+                                        disk=0,
+                                        containers=-1,
+                                        user_name=user_name):
+                session.commit()
+            expiry_scheduler.cancel_container(container_info.container_name)
         except Exception as e:
             backend_logger.error(e)
-            return ErrorResponse(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
+            raise
 
-    return ApiResponse(status.HTTP_200_OK, None)
+
+def _password_matches(container: Container, password: str) -> bool:
+    sha256 = hashlib.sha256()
+    sha256.update(password.encode('utf-8'))
+    return sha256.hexdigest() == container.password
+
+
+def _submit_job(job_type: str, target_name: str, task, **kwargs):
+    try:
+        job_id = job_manager.submit(job_type=job_type,
+                                    resource_type='container',
+                                    target_name=target_name,
+                                    task=task,
+                                    **kwargs)
+    except JobConflictError as e:
+        return ErrorResponse(status.HTTP_409_CONFLICT, str(e))
+    except JobQueueFullError as e:
+        return ErrorResponse(status.HTTP_503_SERVICE_UNAVAILABLE, str(e))
+
+    return ApiResponse(status.HTTP_202_ACCEPTED, JobAcceptedResponseDTO(job_id).__dict__)
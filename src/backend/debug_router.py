@@ -0,0 +1,28 @@
+from fastapi import APIRouter, status
+
+from model.api_response_models import ApiResponse, ErrorResponse
+from util.logger import get_logger
+from util.tracing import tracer
+
+debug_router = APIRouter(prefix="/debug")
+backend_logger = get_logger(name='backend', log_level='INFO', save_path="./log/backend")
+
+
+@debug_router.get("/trace")
+def trace_list_show():
+    """
+    메모리에 남아 있는 최근 요청 트레이스 목록 (최신순)
+    """
+    return ApiResponse(status.HTTP_200_OK, tracer.recent())
+
+
+@debug_router.get("/trace/{request_id}")
+def trace_show(request_id: str):
+    """
+    요청 하나의 타임라인, 요청 ID는 응답의 X-Request-ID 헤더 값
+    span의 start_ms는 요청 시작 시점 기준이며 작업(job)으로 실행한 호출도 포함됩니다.
+    """
+    trace = tracer.get(request_id)
+    if trace is None:
+        return ErrorResponse(status.HTTP_404_NOT_FOUND, "존재하지 않거나 오래되어 삭제된 트레이스입니다.")
+    return ApiResponse(status.HTTP_200_OK, trace)
@@ -1,26 +1,51 @@
-from fastapi import APIRouter, status
+import hashlib
+import json
+from fastapi import APIRouter, Header, Response, status
 
-from database.factories import MySQLEngineFactory
 from model.api_response_models import ApiResponse, ImageListResponseDTO, ErrorResponse
+from openStack.executor import run_openstack
 from openStack.openstack_controller import OpenStackController
+from util.cache import TTLCache
 from util.logger import get_logger
-from config.config import node_config
+from config.config import node_config, openstack_config
 
 image_router = APIRouter(prefix="/image")
 controller = OpenStackController()
-db_connection = MySQLEngineFactory().get_instance()
 backend_logger = get_logger(name='backend', log_level='INFO', save_path="./log/backend")
+# 이미지 목록과 ETag를 짧게 캐시하고, 동시에 들어온 조회 요청은 한 번의 Glance 호출로 합침
+image_list_cache = TTLCache(maxsize=1, ttl=openstack_config['image_list']['cache_ttl'])
 
 
 @image_router.get("/list")
-def image_list_show():
+async def image_list_show(if_none_match: str | None = Header(None)):
     try:
         backend_logger.info("이미지 조회 요청 수신")
-        # 이미지는 노드 별로 달라질 수 없으므로 0번째 노드만 탐색
-        images = controller.find_images(node_name=node_config['nodes'][0]['name'])
+        image_list, etag = await image_list_cache.get_or_load_async('images', lambda: run_openstack(_load_image_list))
     except Exception as e:
         backend_logger.error(e)
         return ErrorResponse(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
 
+    # 브라우저는 no-cache 응답을 재사용하기 전에 If-None-Match로 재검증하며, 바뀌지 않았으면 본문 없이 304를 받음
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if if_none_match is not None and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return ApiResponse(status.HTTP_200_OK, image_list, headers=headers)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    If-None-Match는 약한 비교를 사용하므로 W/ 접두사를 무시하고 비교하며, *는 항상 일치합니다.
+    """
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    if '*' in tags:
+        return True
+    return etag.removeprefix('W/') in [tag.removeprefix('W/') for tag in tags]
+
+
+def _load_image_list() -> tuple[list, str]:
+    backend_logger.info("이미지 목록 갱신")
+    # 이미지는 노드 별로 달라질 수 없으므로 0번째 노드만 탐색
+    images = controller.find_images(node_name=node_config['nodes'][0]['name'])
     image_list = [ImageListResponseDTO(image.name).__dict__ for image in images]
-    return ApiResponse(status.HTTP_200_OK, image_list)
+    etag = '"' + hashlib.sha256(json.dumps(image_list, sort_keys=True).encode('utf-8')).hexdigest()[:32] + '"'
+    return image_list, etag
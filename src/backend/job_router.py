@@ -0,0 +1,96 @@
+import asyncio
+import json
+from fastapi import APIRouter, Header, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from model.api_response_models import ApiResponse, ErrorResponse, JobResponseDTO
+from util.job_events import job_events
+from util.job_manager import job_manager, JobStatus
+from util.logger import get_logger
+
+job_router = APIRouter(prefix="/jobs")
+backend_logger = get_logger(name='backend', log_level='INFO', save_path="./log/backend")
+
+KEEPALIVE_INTERVAL = 15
+FINISHED = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+
+@job_router.get("/{job_id}")
+def job_show(job_id: str):
+    """
+    대여 작업의 개인키는 작업이 끝난 뒤 처음 조회할 때 한 번만 결과에 포함됩니다.
+    """
+    backend_logger.info("작업 상태 조회 요청 수신")
+    job = job_manager.get(job_id, reveal_secrets=True)
+    if job is None:
+        return ErrorResponse(status.HTTP_404_NOT_FOUND, "존재하지 않는 작업입니다.")
+
+    return ApiResponse(status.HTTP_200_OK, job.__dict__)
+
+
+@job_router.get("/{job_id}/events")
+async def job_events_stream(job_id: str, last_event_id: int | None = Header(None)):
+    """
+    작업의 상태/단계 변화를 Server-Sent Events(text/event-stream)로 전달합니다.
+    이벤트마다 단계(stage), 작업 등록 후 경과 시간, 직전 단계에 걸린 시간이 포함되며 작업이 끝나면 연결을 닫습니다.
+    재연결 시 Last-Event-ID 헤더를 보내면 그 이후의 이벤트부터 받습니다.
+    """
+    backend_logger.info("작업 진행 상황 구독 요청 수신")
+    job = await run_in_threadpool(job_manager.get, job_id)
+    if job is None:
+        return ErrorResponse(status.HTTP_404_NOT_FOUND, "존재하지 않는 작업입니다.")
+
+    return StreamingResponse(_event_stream(job, last_event_id if last_event_id is not None else 0),
+                             media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+async def _event_stream(job: JobResponseDTO, last_event_id: int):
+    job_id = job.job_id
+    subscription = job_events.subscribe(job_id)
+    if subscription is None:
+        # 이벤트 기록이 남아 있지 않은 작업(재시작 이전, 오래된 작업)은 DB의 현재 상태만 전달
+        yield _format_event(_job_event(job))
+        return
+
+    events, queue = subscription
+    try:
+        for event in events:
+            if event['id'] > last_event_id:
+                yield _format_event(event)
+            if event['status'] in FINISHED:
+                return
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                # 이벤트 기록이 밀려나 더 이상 이벤트가 오지 않는 작업은 DB로 종료 여부 확인
+                job = await run_in_threadpool(job_manager.get, job_id)
+                if job is None or job.status in FINISHED:
+                    if job is not None:
+                        yield _format_event(_job_event(job))
+                    return
+                # 프록시가 유휴 연결을 끊지 않도록 주석 줄 전송
+                yield ": keepalive\n\n"
+                continue
+
+            yield _format_event(event)
+            if event['status'] in FINISHED:
+                return
+    finally:
+        job_events.unsubscribe(job_id, queue)
+
+
+def _job_event(job: JobResponseDTO) -> dict:
+    return {'id': 0,
+            'job_id': job.job_id,
+            'status': job.status,
+            'stage': job.stage,
+            'error': job.error,
+            'timestamp': job.updated_at.isoformat(timespec='milliseconds')}
+
+
+def _format_event(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['status'].lower()}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+
+from util.metrics import metrics
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics")
+def metrics_show():
+    """
+    Prometheus 텍스트 형식의 지표
+    API 라우트별 처리 시간/처리 중인 요청 수, 노드/메서드별 OpenStack 호출 시간과 실패 횟수,
+    서버/컨테이너 상태 대기 시간, DB 커넥션 풀 통계, 예약 작업 실행 시간
+    """
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,29 +1,35 @@
 from fastapi import APIRouter, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.factories import MySQLEngineFactory
+from database.factories import MySQLEngineFactory, AsyncMySQLEngineFactory
 from model.api_response_models import ApiResponse, NetworkResponseDTO
 from openStack.openstack_controller import OpenStackController
 from util.logger import get_logger
+from util.response_cache import response_cache
 from model.db_models import Network
 
 network_router = APIRouter(prefix="/network")
 controller = OpenStackController()
 db_connection = MySQLEngineFactory().get_instance()
+async_db_connection = AsyncMySQLEngineFactory().get_instance()
 backend_logger = get_logger(name='backend', log_level='INFO', save_path="./log/backend")
 
 
 @network_router.get("/list")
-def networks():
-    result = []
+async def networks():
     backend_logger.info("네트워크 조회 요청 수신")
+    result = await response_cache.get_or_load_async('network_list', (Network.__tablename__,), _load_network_list)
+    return ApiResponse(status.HTTP_200_OK, result)
+
 
-    with Session(db_connection) as session, session.begin():
-        networks = session.scalars(select(Network)).all()
+async def _load_network_list() -> list[dict]:
+    result = []
+    async with AsyncSession(async_db_connection) as session:
+        networks = (await session.scalars(select(Network))).all()
         for network in networks:
             result.append(NetworkResponseDTO(name=network.name,
                                              subnet_cidr=network.cidr,
                                              is_external=network.is_external).__dict__)
-
-    return ApiResponse(status.HTTP_200_OK, result)
+    return result
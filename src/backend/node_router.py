@@ -1,94 +1,109 @@
 from fastapi import APIRouter, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.factories import MySQLEngineFactory
-from model.api_response_models import (ApiResponse, UsingResourceDTO, UsingResourcesResponseDTO, NodeUsingResourceDTO,
+from database.factories import MySQLEngineFactory, AsyncMySQLEngineFactory
+from model.api_response_models import (ApiResponse, ErrorResponse, UsingResourceDTO, UsingResourcesResponseDTO, NodeUsingResourceDTO,
                                        NodeSpecDTO, NodesSpecResponseDTO, ResourceResponseDTO, NodeResponseDTO)
-from model.db_models import Node, Server, Flavor
+from model.db_models import Node
+from database.queries import node_usage_query
 from openStack.openstack_controller import OpenStackController
 from util.logger import get_logger
+from util.response_cache import response_cache
+from util.placement import placement_engine, PlacementEngine
 from config.config import node_config
 
 node_router = APIRouter(prefix="/node")
 controller = OpenStackController()
 db_connection = MySQLEngineFactory().get_instance()
+async_db_connection = AsyncMySQLEngineFactory().get_instance()
 backend_logger = get_logger(name='backend', log_level='INFO', save_path="./log/backend")
 
 
 @node_router.get("/list")
-def node_list_show():
-    node_list = []
+async def node_list_show():
     backend_logger.info("노드 목록 요청 수신")
+    node_list = await response_cache.get_or_load_async('node_list', (Node.__tablename__,), _load_node_list)
+    return ApiResponse(status.HTTP_200_OK, node_list)
 
-    with Session(db_connection) as session, session.begin():
-        nodes = session.scalars(select(Node)).all()
+
+async def _load_node_list() -> list[dict]:
+    node_list = []
+    async with AsyncSession(async_db_connection) as session:
+        nodes = (await session.scalars(select(Node))).all()
         for node in nodes:
             node_list.append(NodeResponseDTO(name=node.name,
                                              vcpu=node.vcpu,
                                              ram=node.ram,
                                              disk=node.disk).__dict__)
-    return ApiResponse(status.HTTP_200_OK, node_list)
+    return node_list
 
 
 @node_router.get("/resources")
 def get_resources():
-    with (Session(db_connection) as session, session.begin()):
-        limit_total_resource = {}
-        using_total_resource = {}
-        limit_resource_by_node = []
-        using_resource_by_node = []
-        total_limit_vcpu = 0
-        total_limit_ram = 0
-        total_limit_disk = 0
-        total_using_vcpu = 0
-        total_using_ram = 0
-        total_using_disk = 0
-        total_server_count = 0
-
-        for node in node_config['nodes']:
-            backend_logger.info(f"[{node['name']}] : 리소스 탐색 중")
-            compute_node = session.scalars(select(Node).where(Node.name == node['name'])).one()
-            servers = session.scalars(select(Server).where(Server.node_name == node['name']))
-
-            server_count = 0
-            using_vcpus = 0
-            using_ram = 0
-            using_disk = 0
-            total_limit_vcpu += compute_node.vcpu
-            total_limit_ram += compute_node.ram
-            total_limit_disk += compute_node.disk
-
-            for server in servers:
-                server_count += 1
-                flavor = session.scalars(select(Flavor).where(Flavor.name == server.flavor_name)).one()
-                total_using_vcpu += flavor.vcpu
-                total_using_ram += flavor.ram
-                total_using_disk += flavor.disk
-                using_vcpus += flavor.vcpu
-                using_ram += flavor.ram
-                using_disk += flavor.disk
-
-            total_server_count += server_count
-            using_resource_by_node.append(NodeUsingResourceDTO(name=node['name'],
-                                                               count=server_count,
-                                                               vcpus=using_vcpus,
-                                                               ram=using_ram,
-                                                               disk=using_disk).__dict__)
-            compute_node_dict = compute_node.__dict__
-            del compute_node_dict['id']
-            del compute_node_dict['_sa_instance_state']
-            del compute_node_dict['auth_url']
-            limit_resource_by_node.append(NodeSpecDTO(**compute_node_dict).__dict__)
-
-        limit_total_resource = {'vcpu': total_limit_vcpu, 'ram': total_limit_ram, 'disk': total_limit_disk}
-        using_total_resource = UsingResourceDTO(count=total_server_count,
-                                                vcpus=total_using_vcpu,
-                                                ram=total_using_ram,
-                                                disk=total_using_disk).__dict__
-        limit_resources = NodesSpecResponseDTO(total_spec=limit_total_resource,
-                                               nodes_spec=limit_resource_by_node).__dict__
-        using_resources = UsingResourcesResponseDTO(total_resource=using_total_resource,
-                                                    nodes_resource=using_resource_by_node).__dict__
+    backend_logger.info("리소스 현황 요청 수신")
+    with Session(db_connection) as session:
+        rows = {row.name: row for row in session.execute(node_usage_query()).all()}
+
+    limit_resource_by_node = []
+    using_resource_by_node = []
+    total_limit_vcpu = 0
+    total_limit_ram = 0
+    total_limit_disk = 0
+    total_using_vcpu = 0
+    total_using_ram = 0
+    total_using_disk = 0
+    total_server_count = 0
+
+    for node in node_config['nodes']:
+        row = rows[node['name']]
+        total_limit_vcpu += row.vcpu
+        total_limit_ram += row.ram
+        total_limit_disk += row.disk
+        total_server_count += row.count
+        total_using_vcpu += row.using_vcpu
+        total_using_ram += row.using_ram
+        total_using_disk += row.using_disk
+
+        using_resource_by_node.append(NodeUsingResourceDTO(name=row.name,
+                                                           count=row.count,
+                                                           vcpus=row.using_vcpu,
+                                                           ram=row.using_ram,
+                                                           disk=row.using_disk).__dict__)
+        limit_resource_by_node.append(NodeSpecDTO(name=row.name,
+                                                  vcpu=row.vcpu,
+                                                  ram=row.ram,
+                                                  disk=row.disk).__dict__)
+
+    limit_total_resource = {'vcpu': total_limit_vcpu, 'ram': total_limit_ram, 'disk': total_limit_disk}
+    using_total_resource = UsingResourceDTO(count=total_server_count,
+                                            vcpus=total_using_vcpu,
+                                            ram=total_using_ram,
+                                            disk=total_using_disk).__dict__
+    limit_resources = NodesSpecResponseDTO(total_spec=limit_total_resource,
+                                           nodes_spec=limit_resource_by_node).__dict__
+    using_resources = UsingResourcesResponseDTO(total_resource=using_total_resource,
+                                                nodes_resource=using_resource_by_node).__dict__
     return ApiResponse(status.HTTP_200_OK, ResourceResponseDTO(limit_resources=limit_resources,
                                                                using_resources=using_resources).__dict__)
+
+
+@node_router.get("/placement")
+def placement_dry_run(vcpu: int, ram: int, disk: int, user_name: str = None, strategy: str = None):
+    """
+    실제로 배치하지 않고 전략별 배치 후보 순위를 반환합니다.
+    strategy를 지정하지 않으면 모든 전략의 결과를 반환합니다.
+    """
+    backend_logger.info("배치 시뮬레이션 요청 수신")
+    strategies = [strategy] if strategy is not None else PlacementEngine.STRATEGIES
+
+    try:
+        result = {name: [candidate.__dict__ for candidate in placement_engine.rank(vcpu, ram, disk,
+                                                                                    user_name=user_name,
+                                                                                    strategy=name)]
+                  for name in strategies}
+    except ValueError as e:
+        return ErrorResponse(status.HTTP_400_BAD_REQUEST, str(e))
+
+    return ApiResponse(status.HTTP_200_OK, result)
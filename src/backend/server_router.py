@@ -1,37 +1,62 @@
 import io
-from fastapi import APIRouter, Form, UploadFile, status
+from fastapi import APIRouter, Depends, Form, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.factories import MySQLEngineFactory
+from database.factories import MySQLEngineFactory, AsyncMySQLEngineFactory
 from model.db_models import Server, Flavor, NodeFlavor
-from model.api_request_models import ServerCreateRequestDTO
-from model.api_response_models import ApiResponse, ServerRentalResponseDTO, ErrorResponse, ServersResponseDTO
+from model.api_request_models import ServerCreateRequestDTO, ServerBatchCreateRequestDTO, InstanceListRequestDTO
+from model.api_response_models import (ApiResponse, ServerRentalResponseDTO, ErrorResponse, ServersResponseDTO,
+                                       JobAcceptedResponseDTO)
+from openStack.bulkhead import Admission, BulkheadFullError, node_bulkhead
 from openStack.openstack_controller import OpenStackController
-from util.utils import validate_ssh_key, alphabet_check, str_to_date, extension_date_check
-from util.backend_utils import create_network, network_delete, network_rollback, flavor_delete
+from util.utils import (alphabet_check, str_to_date, extension_date_check, generate_key_pair,
+                        apply_credentials)
+from util.backend_utils import (create_network, insert_network, network_delete, network_rollback, flavor_delete,
+                                node_flavor_delete, node_network_delete, load_instance_list, too_many_requests)
+from util.batch import run_batch
+from util.credentials import credential_fields, credential_verifier
 from util.logger import get_logger
-from util.selector import get_available_node
-from config.config import openstack_config
+from util.selector import reserve_node
+from util.job_manager import job_manager, JobStatus, JobQueueFullError, JobConflictError
+from util.resource_ledger import Reservation, resource_ledger
+from util.response_cache import response_cache
+from util.scheduler import expiry_scheduler
+from util.warm_pool import WarmServer, warm_pool
+from config.config import openstack_config, server_config
 
 server_router = APIRouter(prefix="/server")
 controller = OpenStackController()
 db_connection = MySQLEngineFactory().get_instance()
+async_db_connection = AsyncMySQLEngineFactory().get_instance()
 backend_logger = get_logger(name='backend', log_level='INFO', save_path="./log/backend")
 
 
 @server_router.get("/list")
-def server_show():
-    with Session(db_connection) as session, session.begin():
-        backend_logger.info("서버 목록 요청 수신")
-        servers = session.scalars(select(Server)).all()
-        server_list = []
-        for server in servers:
-            server_dict = server.__dict__
-            del server_dict['id']
-            del server_dict['_sa_instance_state']
-            server_list.append(ServersResponseDTO(**server_dict).__dict__)
-    return ApiResponse(status.HTTP_200_OK, server_list)
+async def server_show(list_request: InstanceListRequestDTO = Depends()):
+    """
+    user_name, node_name, end_date_from/end_date_to(YYYY-MM-DD), name_prefix로 필터링하고
+    fields(쉼표 구분)로 응답 필드를 고를 수 있습니다.
+    limit을 지정하면 limit개씩 나누어 반환하며, 다음 페이지가 있으면 X-Next-Cursor 헤더의 값을 cursor로 전달합니다.
+    """
+    backend_logger.info("서버 목록 요청 수신")
+    try:
+        server_list, next_cursor = await response_cache.get_or_load_async(
+            'server_list',
+            (Server.__tablename__,),
+            lambda: load_instance_list(engine=async_db_connection,
+                                       model=Server,
+                                       name_column=Server.server_name,
+                                       response_fields=ServersResponseDTO.FIELDS,
+                                       list_request=list_request),
+            params=tuple(list_request.model_dump().items()))
+    except ValueError as e:
+        return ErrorResponse(status.HTTP_400_BAD_REQUEST, str(e))
+
+    headers = {'X-Next-Cursor': next_cursor} if next_cursor is not None else None
+    return ApiResponse(status.HTTP_200_OK, server_list, headers=headers)
 
 
 @server_router.post("/rental")
@@ -42,50 +67,79 @@ def server_rent(server_info: ServerCreateRequestDTO):
         if len(session.scalars(select(Server).where(Server.server_name == server_info.server_name)).all()) != 0:
             return ErrorResponse(status.HTTP_400_BAD_REQUEST, "서버 이름 중복")
 
-        backend_logger.info("서버 이름 검사")
-        if not alphabet_check(server_info.server_name):
-            return ErrorResponse(status.HTTP_400_BAD_REQUEST, "서버 이름은 알파벳과 숫자로만 구성되어야 합니다.")
+    backend_logger.info("서버 이름 검사")
+    if not alphabet_check(server_info.server_name):
+        return ErrorResponse(status.HTTP_400_BAD_REQUEST, "서버 이름은 알파벳과 숫자로만 구성되어야 합니다.")
 
-        if server_info.network_name is None:
-            backend_logger.info("기본 내부 네트워크 사용")
-            server_info.network_name = openstack_config['internal_network']['name']
+    if server_info.network_name is None:
+        backend_logger.info("기본 내부 네트워크 사용")
+        server_info.network_name = openstack_config['internal_network']['name']
+
+    if server_info.cloud_init is None and server_info.network_name == openstack_config['internal_network']['name']:
+        warm_server = warm_pool.claim(image_name=server_info.image_name,
+                                      flavor_name=server_info.flavor_name,
+                                      user_name=server_info.user_name)
+        if warm_server is not None:
+            try:
+                admission = node_bulkhead.admit(warm_server.node_name, server_info.user_name)
+            except BulkheadFullError:
+                # 예비 서버가 있는 노드가 붐비면 다른 노드에 새로 생성
+                warm_pool.give_back(warm_server)
+            else:
+                backend_logger.info(f"[{warm_server.node_name}] : 예비 서버 사용")
+                response = _submit_job(job_type='server_rental',
+                                       target_name=server_info.server_name,
+                                       task=admission.bind(_warm_server_rent_task),
+                                       dispatch=admission.dispatch,
+                                       server_info=server_info,
+                                       warm_server=warm_server)
+                if response.status_code != status.HTTP_202_ACCEPTED:
+                    admission.release()
+                    warm_pool.give_back(warm_server)
+                return response
 
-        backend_logger.info("노드 선택")
-        node_name = get_available_node(server_info.vcpus, server_info.ram, server_info.disk)
-        if node_name is None:
-            return ErrorResponse(status.HTTP_406_NOT_ACCEPTABLE, "시스템의 리소스가 부족합니다.")
+    backend_logger.info("노드 선택 및 자원 선점")
+    reservation = reserve_node(server_info.vcpus, server_info.ram, server_info.disk, user_name=server_info.user_name)
+    if reservation is None:
+        return ErrorResponse(status.HTTP_406_NOT_ACCEPTABLE, "시스템의 리소스가 부족합니다.")
+    try:
+        admission = node_bulkhead.admit(reservation.node_name, server_info.user_name)
+    except BulkheadFullError as e:
+        resource_ledger.release(reservation)
+        return too_many_requests(e)
 
+    response = _submit_job(job_type='server_rental',
+                           target_name=server_info.server_name,
+                           task=admission.bind(_server_rent_task),
+                           dispatch=admission.dispatch,
+                           server_info=server_info,
+                           reservation=reservation)
+    if response.status_code != status.HTTP_202_ACCEPTED:
+        admission.release()
+        resource_ledger.release(reservation)
+    return response
+
+
+def _server_rent_task(job_id: str, server_info: ServerCreateRequestDTO, reservation: Reservation):
+    node_name = reservation.node_name
+    # 노드 슬롯과 워커를 기다리는 동안 선점이 만료되지 않도록 작업이 시작될 때 만료 시각을 늘림
+    if not resource_ledger.refresh(reservation):
+        raise Exception("시스템의 리소스가 부족합니다.")
+    with Session(db_connection) as session:
         floating_ip = None
 
         try:
-            backend_logger.info("커스텀 플레이버 생성 여부 검사")
-            if len(session.scalars(select(Flavor).where(Flavor.name == server_info.flavor_name)).all()) == 0:
-                backend_logger.info("시스템에 해당 플레이버 존재하지 않음")
-                backend_logger.info("데이터베이스에 플레이버 삽입")
-                session.add(Flavor(
-                    name=server_info.flavor_name,
-                    vcpu=server_info.vcpus,
-                    ram=server_info.ram,
-                    disk=server_info.disk,
-                    is_default=False
-                ))
-
-            if len(session.scalars(select(NodeFlavor).where(NodeFlavor.flavor_name == server_info.flavor_name,
-                                                            NodeFlavor.node_name == node_name)).all()) == 0:
-                backend_logger.info("커스텀 플레이버 생성 시작")
-                backend_logger.info(f"[{node_name}] : 커스텀 플레이버 생성 시작")
-                controller.create_flavor(flavor_name=server_info.flavor_name,
-                                         node_name=node_name,
-                                         vcpus=server_info.vcpus,
-                                         ram=server_info.ram,
-                                         disk=server_info.disk)
+            job_manager.set_stage(job_id, 'flavor')
+            _create_flavor(session=session, server_info=server_info, node_name=node_name)
 
+            job_manager.set_stage(job_id, 'network')
             create_network(session=session,
                            controller=controller,
                            network_name=server_info.network_name,
                            subnet_cidr=server_info.subnet_cidr,
                            node_name=node_name)
 
+            job_manager.set_stage(job_id, 'boot')
             backend_logger.info("서버 생성")
             server, private_key = controller.create_server(server_name=server_info.server_name,
                                                            image_name=server_info.image_name,
@@ -94,6 +148,7 @@ def server_rent(server_info: ServerCreateRequestDTO):
                                                            password=server_info.password,
                                                            cloud_init=server_info.cloud_init,
                                                            node_name=node_name)
+            job_manager.set_stage(job_id, 'floating_ip')
             backend_logger.info("유동 IP 할당")
             floating_ip = controller.allocate_floating_ip(server=server, node_name=node_name)
 
@@ -106,13 +161,20 @@ def server_rent(server_info: ServerCreateRequestDTO):
                 network_name=server_info.network_name,
                 node_name=node_name,
                 flavor_name=server_info.flavor_name,
-                image_name=server_info.image_name
+                image_name=server_info.image_name,
+                **credential_fields(server_info.password, private_key)
             )
+            job_manager.set_stage(job_id, 'db_commit')
             backend_logger.info("데이터베이스에 인스턴스 저장")
             session.add(server)
-            session.commit()
+            with resource_ledger.claim(reservation):
+                session.commit()
+            expiry_scheduler.schedule_server(server_name=server_info.server_name,
+                                             node_name=node_name,
+                                             end_date=str_to_date(server_info.end_date))
         except Exception as e:
             backend_logger.error(e)
+            job_manager.set_stage(job_id, 'rollback')
             flavor = session.scalars(select(Flavor).where(Flavor.name == server_info.flavor_name)).one()
             if not flavor.is_default:
                 controller.delete_flavor(flavor_name=server_info.flavor_name,
@@ -125,49 +187,371 @@ def server_rent(server_info: ServerCreateRequestDTO):
                              network_name=server_info.network_name,
                              node_name=node_name)
             session.rollback()
-            return ErrorResponse(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
-        
+            raise
+        finally:
+            resource_ledger.release(reservation)
+
     name = f'{server_info.server_name}_keypair.pem' if private_key != "" else ""
-    return ApiResponse(status.HTTP_201_CREATED, ServerRentalResponseDTO(name, private_key).__dict__)
+    return ServerRentalResponseDTO(name, private_key).__dict__
 
 
-@server_router.put("/extension")
-def server_renew(server_name: str = Form(...),
-                 host_ip: str = Form(...),
-                 end_date: str = Form(...),
-                 password: str = Form(""),
-                 key_file: UploadFile = Form("")):
-    backend_logger.info("서버 연장 요청 수신")
-    key_file = io.StringIO(key_file.file.read().decode('utf-8')) \
-        if key_file != "" else key_file
+def _warm_server_rent_task(job_id: str, server_info: ServerCreateRequestDTO, warm_server: WarmServer):
+    """
+    미리 부팅된 서버에 사용자 계정과 접속 정보를 적용하고 이름을 바꿔 대여합니다.
+    인계에 실패하면 예비 서버를 삭제하고 같은 노드에 잡아 둔 자원으로 새 서버를 생성합니다.
+    """
+    node_name = warm_server.node_name
+    reservation = warm_server.reservation
+    private_key, public_key = generate_key_pair() if server_info.password is None else ("", None)
+
+    try:
+        job_manager.set_stage(job_id, 'warm_claim')
+        backend_logger.info("예비 서버에 접속 정보 적용")
+        apply_credentials(host_name=warm_server.floating_ip,
+                          login_user=warm_server.name,
+                          login_key=warm_server.private_key,
+                          user_name=server_info.server_name,
+                          password=server_info.password,
+                          public_key=public_key)
+        controller.delete_key_pair(keypair_name=f"{warm_server.name}_keypair", node_name=node_name)
+        backend_logger.info("예비 서버 이름 변경")
+        controller.rename_server(server_name=warm_server.name, new_name=server_info.server_name, node_name=node_name)
+    except Exception as e:
+        backend_logger.error(e)
+        backend_logger.info("예비 서버 인계 실패, 새 서버 생성")
+        try:
+            controller.delete_server(server_name=warm_server.name,
+                                     node_name=node_name,
+                                     server_ip=warm_server.floating_ip)
+        except Exception as e:
+            backend_logger.error(e)
+        return _server_rent_task(job_id=job_id, server_info=server_info, reservation=reservation)
+
+    with Session(db_connection) as session:
+        try:
+            job_manager.set_stage(job_id, 'db_commit')
+            backend_logger.info("데이터베이스에 인스턴스 저장")
+            session.add(Server(
+                user_name=server_info.user_name,
+                server_name=server_info.server_name,
+                start_date=server_info.start_date,
+                end_date=server_info.end_date,
+                floating_ip=warm_server.floating_ip,
+                network_name=server_info.network_name,
+                node_name=node_name,
+                flavor_name=server_info.flavor_name,
+                image_name=server_info.image_name,
+                **credential_fields(server_info.password, private_key)
+            ))
+            with resource_ledger.claim(reservation):
+                session.commit()
+            expiry_scheduler.schedule_server(server_name=server_info.server_name,
+                                             node_name=node_name,
+                                             end_date=str_to_date(server_info.end_date))
+        except Exception as e:
+            backend_logger.error(e)
+            job_manager.set_stage(job_id, 'rollback')
+            session.rollback()
+            controller.delete_server(server_name=server_info.server_name,
+                                     node_name=node_name,
+                                     server_ip=warm_server.floating_ip)
+            raise
+        finally:
+            resource_ledger.release(reservation)
+
+    name = f'{server_info.server_name}_keypair.pem' if private_key != "" else ""
+    return ServerRentalResponseDTO(name, private_key).__dict__
+
+
+def _insert_flavor(session: Session, server_info: ServerCreateRequestDTO):
+    backend_logger.info("커스텀 플레이버 생성 여부 검사")
+    if len(session.scalars(select(Flavor).where(Flavor.name == server_info.flavor_name)).all()) == 0:
+        backend_logger.info("시스템에 해당 플레이버 존재하지 않음")
+        backend_logger.info("데이터베이스에 플레이버 삽입")
+        session.add(Flavor(
+            name=server_info.flavor_name,
+            vcpu=server_info.vcpus,
+            ram=server_info.ram,
+            disk=server_info.disk,
+            is_default=False
+        ))
+
+
+def _create_flavor(session: Session, server_info: ServerCreateRequestDTO, node_name: str):
+    _insert_flavor(session=session, server_info=server_info)
+    if len(session.scalars(select(NodeFlavor).where(NodeFlavor.flavor_name == server_info.flavor_name,
+                                                    NodeFlavor.node_name == node_name)).all()) == 0:
+        backend_logger.info("커스텀 플레이버 생성 시작")
+        backend_logger.info(f"[{node_name}] : 커스텀 플레이버 생성 시작")
+        controller.create_flavor(flavor_name=server_info.flavor_name,
+                                 node_name=node_name,
+                                 vcpus=server_info.vcpus,
+                                 ram=server_info.ram,
+                                 disk=server_info.disk)
+
+
+@server_router.post("/rental/batch")
+def server_rent_batch(batch_info: ServerBatchCreateRequestDTO):
+    """
+    여러 서버를 한 번에 대여합니다.
+    모든 서버의 노드를 먼저 선택해 자원을 선점하며, 하나라도 배치할 수 없으면 아무것도 대여하지 않습니다.
+    노드별로 플레이버/네트워크를 한 번씩만 준비한 뒤 서버를 병렬로 생성하고, 작업 결과로 서버별 결과를 반환합니다.
+    """
+    backend_logger.info("서버 일괄 대여 요청 수신")
+    servers = batch_info.servers
+    max_items = server_config['batch']['max_items']
+    if not 1 <= len(servers) <= max_items:
+        return ErrorResponse(status.HTTP_400_BAD_REQUEST, f"한 번에 1개 이상 {max_items}개 이하의 서버를 대여할 수 있습니다.")
+
+    server_names = [server_info.server_name for server_info in servers]
+    backend_logger.info("서버 이름 검사")
+    if len(set(server_names)) != len(server_names):
+        return ErrorResponse(status.HTTP_400_BAD_REQUEST, "요청에 같은 서버 이름이 여러 번 포함되어 있습니다.")
+    if not all(alphabet_check(server_name) for server_name in server_names):
+        return ErrorResponse(status.HTTP_400_BAD_REQUEST, "서버 이름은 알파벳과 숫자로만 구성되어야 합니다.")
+    with Session(db_connection) as session:
+        backend_logger.info("서버 이름 중복 여부 검사")
+        duplicated = session.scalars(select(Server.server_name).where(Server.server_name.in_(server_names))).all()
+        if len(duplicated) != 0:
+            return ErrorResponse(status.HTTP_400_BAD_REQUEST, f"서버 이름 중복: {', '.join(duplicated)}")
+
+    for server_info in servers:
+        if server_info.network_name is None:
+            server_info.network_name = openstack_config['internal_network']['name']
 
-    backend_logger.info("정보 유효성 검사 중")
-    if validate_ssh_key(host_name=host_ip,
-                        user_name=server_name,
-                        private_key=key_file,
-                        password=password):
+    backend_logger.info("노드 선택 및 자원 선점")
+    reservations = {}
+    # 큰 서버부터 배치해야 남은 자원이 작은 조각으로 흩어지지 않음
+    for server_info in sorted(servers,
+                              key=lambda server_info: (server_info.vcpus or 0, server_info.ram or 0, server_info.disk or 0),
+                              reverse=True):
+        reservation = reserve_node(server_info.vcpus, server_info.ram, server_info.disk, user_name=server_info.user_name)
+        if reservation is None:
+            for reservation in reservations.values():
+                resource_ledger.release(reservation)
+            return ErrorResponse(status.HTTP_406_NOT_ACCEPTABLE,
+                                 f"시스템의 리소스가 부족합니다. ({server_info.server_name})")
+        reservations[server_info.server_name] = reservation
+    try:
+        admissions = dict(zip(server_names, node_bulkhead.admit_many(
+            [(reservations[server_info.server_name].node_name, server_info.user_name) for server_info in servers])))
+    except BulkheadFullError as e:
+        for reservation in reservations.values():
+            resource_ledger.release(reservation)
+        return too_many_requests(e)
+
+    response = _submit_job(job_type='server_rental_batch',
+                           target_name=servers[0].server_name,
+                           task=_server_batch_rent_task,
+                           servers=servers,
+                           reservations=reservations,
+                           admissions=admissions)
+    if response.status_code != status.HTTP_202_ACCEPTED:
+        for server_name in server_names:
+            admissions[server_name].release()
+            resource_ledger.release(reservations[server_name])
+    return response
+
+
+def _server_batch_rent_task(job_id: str,
+                            servers: list[ServerCreateRequestDTO],
+                            reservations: dict[str, Reservation],
+                            admissions: dict[str, Admission]):
+    # 플레이버/네트워크 행은 모든 노드가 공유하므로 노드별 준비를 병렬로 실행하기 전에 한 번만 삽입
+    job_manager.set_stage(job_id, 'prepare')
+    with Session(db_connection) as session:
+        try:
+            for server_info in {server_info.flavor_name: server_info for server_info in servers}.values():
+                _insert_flavor(session=session, server_info=server_info)
+            for server_info in {server_info.network_name: server_info for server_info in servers}.values():
+                insert_network(session=session, network_name=server_info.network_name, subnet_cidr=server_info.subnet_cidr)
+            session.commit()
+        except Exception as e:
+            backend_logger.error(e)
+            for server_info in servers:
+                admissions[server_info.server_name].release()
+                resource_ledger.release(reservations[server_info.server_name])
+            raise
+
+    def prepare(node_name: str, node_servers: list[ServerCreateRequestDTO]):
         with Session(db_connection) as session:
-            session.begin()
-            try:
-                server = session.scalars(
-                    select(Server)
-                    .where(Server.server_name == server_name)
-                ).one()
+            for server_info in {server_info.flavor_name: server_info for server_info in node_servers}.values():
+                _create_flavor(session=session, server_info=server_info, node_name=node_name)
+            for server_info in {server_info.network_name: server_info for server_info in node_servers}.values():
+                create_network(session=session,
+                               controller=controller,
+                               network_name=server_info.network_name,
+                               subnet_cidr=server_info.subnet_cidr,
+                               node_name=node_name)
+            session.commit()
 
-                new_end_date = str_to_date(end_date)
-                if not extension_date_check(old_end_date=server.end_date, new_end_date=new_end_date):
-                    return ErrorResponse(status.HTTP_400_BAD_REQUEST, "현재 대여 종료 일자 이후의 날짜를 선택 해야 합니다.")
+    results = run_batch(items=servers,
+                        name_of=lambda server_info: server_info.server_name,
+                        node_of=lambda server_info: reservations[server_info.server_name].node_name,
+                        prepare=prepare,
+                        provision=lambda server_info: admissions[server_info.server_name].bind(_provision_server)(
+                            server_info, reservations[server_info.server_name]),
+                        discard=lambda server_info: _discard_server(server_info,
+                                                                    reservations[server_info.server_name],
+                                                                    admissions[server_info.server_name]),
+                        max_parallel=server_config['batch']['max_parallel'],
+                        on_progress=lambda done, total: job_manager.set_stage(job_id, f'provision {done}/{total}'))
 
-                server.end_date = new_end_date
-                session.add(server)
+    failed = [server_info for server_info, result in zip(servers, results) if result['status'] != JobStatus.SUCCEEDED]
+    if len(failed) != 0:
+        job_manager.set_stage(job_id, 'cleanup')
+        with Session(db_connection) as session:
+            try:
+                # 같은 플레이버/네트워크라도 노드마다 따로 만들었으므로 (이름, 노드)별로 정리
+                flavor_nodes, network_nodes = {}, {}
+                for server_info in failed:
+                    node_name = reservations[server_info.server_name].node_name
+                    flavor_nodes.setdefault(server_info.flavor_name, set()).add(node_name)
+                    network_nodes.setdefault(server_info.network_name, set()).add(node_name)
+                for flavor_name, node_names in flavor_nodes.items():
+                    node_flavor_delete(session=session,
+                                       controller=controller,
+                                       flavor_name=flavor_name,
+                                       node_names=node_names)
+                for network_name, node_names in network_nodes.items():
+                    node_network_delete(session=session,
+                                        controller=controller,
+                                        network_name=network_name,
+                                        node_names=node_names)
                 session.commit()
             except Exception as e:
                 backend_logger.error(e)
                 session.rollback()
-                return ErrorResponse(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
-        return ApiResponse(status.HTTP_200_OK, None)
-    else:
-        return ErrorResponse(status.HTTP_400_BAD_REQUEST, "입력한 정보가 잘못됨")
+    return results
+
+
+def _discard_server(server_info: ServerCreateRequestDTO, reservation: Reservation, admission: Admission):
+    backend_logger.info(f"[{reservation.node_name}] : 서버 {server_info.server_name} 생성 취소")
+    admission.release()
+    resource_ledger.release(reservation)
+
+
+def _provision_server(server_info: ServerCreateRequestDTO, reservation: Reservation) -> dict:
+    node_name = reservation.node_name
+    # 노드 슬롯과 워커를 기다리는 동안 선점이 만료되지 않도록 작업이 시작될 때 만료 시각을 늘림
+    if not resource_ledger.refresh(reservation):
+        raise Exception("시스템의 리소스가 부족합니다.")
+    floating_ip = None
+    with Session(db_connection) as session:
+        try:
+            backend_logger.info(f"[{node_name}] : 서버 {server_info.server_name} 생성")
+            server, private_key = controller.create_server(server_name=server_info.server_name,
+                                                           image_name=server_info.image_name,
+                                                           flavor_name=server_info.flavor_name,
+                                                           network_name=server_info.network_name,
+                                                           password=server_info.password,
+                                                           cloud_init=server_info.cloud_init,
+                                                           node_name=node_name)
+            floating_ip = controller.allocate_floating_ip(server=server, node_name=node_name)
+            session.add(Server(
+                user_name=server_info.user_name,
+                server_name=server_info.server_name,
+                start_date=server_info.start_date,
+                end_date=server_info.end_date,
+                floating_ip=floating_ip,
+                network_name=server_info.network_name,
+                node_name=node_name,
+                flavor_name=server_info.flavor_name,
+                image_name=server_info.image_name,
+                **credential_fields(server_info.password, private_key)
+            ))
+            with resource_ledger.claim(reservation):
+                session.commit()
+            expiry_scheduler.schedule_server(server_name=server_info.server_name,
+                                             node_name=node_name,
+                                             end_date=str_to_date(server_info.end_date))
+        except Exception:
+            session.rollback()
+            controller.delete_server(server_name=server_info.server_name, node_name=node_name, server_ip=floating_ip)
+            raise
+        finally:
+            resource_ledger.release(reservation)
+
+    name = f'{server_info.server_name}_keypair.pem' if private_key != "" else ""
+    return ServerRentalResponseDTO(name, private_key).__dict__
+
+
+@server_router.put("/extension")
+async def server_renew(server_name: str = Form(...),
+                       host_ip: str = Form(...),
+                       end_date: str = Form(...),
+                       password: str = Form(""),
+                       key_file: UploadFile = Form("")):
+    backend_logger.info("서버 연장 요청 수신")
+    key_file = io.StringIO((await key_file.read()).decode('utf-8')) \
+        if key_file != "" else key_file
+
+    async with AsyncSession(async_db_connection) as session:
+        server = (await session.scalars(select(Server).where(Server.server_name == server_name))).one_or_none()
+        if server is None:
+            return ErrorResponse(status.HTTP_404_NOT_FOUND, "존재하지 않는 서버입니다.")
+
+        new_end_date = str_to_date(end_date)
+        if not extension_date_check(old_end_date=server.end_date, new_end_date=new_end_date):
+            return ErrorResponse(status.HTTP_400_BAD_REQUEST, "현재 대여 종료 일자 이후의 날짜를 선택 해야 합니다.")
+
+        # 비밀번호 해시 비교는 CPU를 쓰므로 스레드 풀에서 실행
+        verified = await run_in_threadpool(credential_verifier.verify_local,
+                                           server=server, host_ip=host_ip, password=password, key_file=key_file)
+        if verified is False:
+            return ErrorResponse(status.HTTP_400_BAD_REQUEST, "입력한 정보가 잘못됨")
+
+    # 작업 등록은 DB에 동기로 기록하므로 스레드 풀에서 실행
+    return await run_in_threadpool(_submit_job,
+                                   job_type='server_extension',
+                                   target_name=server_name,
+                                   task=_server_renew_task,
+                                   server_name=server_name,
+                                   host_ip=host_ip,
+                                   new_end_date=new_end_date,
+                                   password=password,
+                                   key_file=key_file,
+                                   needs_ssh=verified is None)
+
+
+def _server_renew_task(job_id: str,
+                       server_name: str,
+                       host_ip: str,
+                       new_end_date,
+                       password: str,
+                       key_file,
+                       needs_ssh: bool):
+    """
+    :param needs_ssh: 접속 정보가 저장되지 않은 서버라 요청 처리 중에 확인하지 못한 경우 True, 작업에서 SSH 접속으로 확인
+    """
+    with Session(db_connection) as session:
+        session.begin()
+        try:
+            server = session.scalars(
+                select(Server)
+                .where(Server.server_name == server_name)
+            ).one()
+
+            if needs_ssh:
+                job_manager.set_stage(job_id, 'validation')
+                backend_logger.info("정보 유효성 검사 중")
+                if not credential_verifier.verify(server=server, host_ip=host_ip, password=password, key_file=key_file):
+                    raise Exception("입력한 정보가 잘못됨")
+
+            job_manager.set_stage(job_id, 'db_commit')
+            if not extension_date_check(old_end_date=server.end_date, new_end_date=new_end_date):
+                raise Exception("현재 대여 종료 일자 이후의 날짜를 선택 해야 합니다.")
+
+            server.end_date = new_end_date
+            session.add(server)
+            session.commit()
+            expiry_scheduler.schedule_server(server_name=server_name,
+                                             node_name=server.node_name,
+                                             end_date=new_end_date)
+        except Exception as e:
+            backend_logger.error(e)
+            session.rollback()
+            raise
 
 
 @server_router.delete("/return")
@@ -179,42 +563,98 @@ def server_return(server_name: str = Form(...),
     key_file = io.StringIO(key_file.file.read().decode('utf-8')) \
         if key_file != "" else key_file
 
-    backend_logger.info("정보 유효성 검사 중")
-    if validate_ssh_key(host_name=host_ip,
-                        user_name=server_name,
-                        private_key=key_file,
-                        password=password):
-        with Session(db_connection) as session:
-            session.begin()
+    with Session(db_connection) as session:
+        server = session.scalars(select(Server).where(Server.server_name == server_name)).one_or_none()
+        if server is None:
+            return ErrorResponse(status.HTTP_404_NOT_FOUND, "존재하지 않는 서버입니다.")
+        verified = credential_verifier.verify_local(server=server, host_ip=host_ip, password=password, key_file=key_file)
+        if verified is False:
+            return ErrorResponse(status.HTTP_400_BAD_REQUEST, "입력한 정보가 잘못됨")
+        node_name, user_name = server.node_name, server.user_name
+    try:
+        admission = node_bulkhead.admit(node_name, user_name)
+    except BulkheadFullError as e:
+        return too_many_requests(e)
 
-            try:
-                server = session.scalars(
-                    select(Server)
-                    .where(Server.server_name == server_name)
-                ).one()
-                network_name = server.network_name
-                flavor_name = server.flavor_name
-                node_name = server.node_name
-
-                backend_logger.info("서버 삭제")
-                controller.delete_server(server_name=server_name, node_name=server.node_name, server_ip=host_ip)
-                backend_logger.info("데이터베이스에 서버 삭제")
-                session.delete(server)
-                session.commit()
+    response = _submit_job(job_type='server_return',
+                           target_name=server_name,
+                           task=admission.bind(_server_return_task),
+                           dispatch=admission.dispatch,
+                           server_name=server_name,
+                           host_ip=host_ip,
+                           password=password,
+                           key_file=key_file,
+                           needs_ssh=verified is None)
+    if response.status_code != status.HTTP_202_ACCEPTED:
+        admission.release()
+    return response
 
-                flavor_delete(session=session,
-                              controller=controller,
-                              flavor_name=flavor_name,
-                              node_name=node_name)
-                network_delete(session=session,
-                               controller=controller,
-                               network_name=network_name,
-                               node_name=node_name)
+
+def _server_return_task(job_id: str, server_name: str, host_ip: str, password: str, key_file, needs_ssh: bool):
+    """
+    :param needs_ssh: 접속 정보가 저장되지 않은 서버라 요청 처리 중에 확인하지 못한 경우 True, 작업에서 SSH 접속으로 확인
+    """
+    with Session(db_connection) as session:
+        session.begin()
+
+        try:
+            server = session.scalars(
+                select(Server)
+                .where(Server.server_name == server_name)
+            ).one()
+
+            if needs_ssh:
+                job_manager.set_stage(job_id, 'validation')
+                backend_logger.info("정보 유효성 검사 중")
+                if not credential_verifier.verify(server=server, host_ip=host_ip, password=password, key_file=key_file):
+                    raise Exception("입력한 정보가 잘못됨")
+
+            network_name = server.network_name
+            flavor_name = server.flavor_name
+            node_name = server.node_name
+            flavor = server.flavor
+            user_name = server.user_name
+
+            job_manager.set_stage(job_id, 'delete_server')
+            backend_logger.info("서버 삭제")
+            controller.delete_server(server_name=server_name, node_name=server.node_name, server_ip=host_ip)
+            job_manager.set_stage(job_id, 'db_commit')
+            backend_logger.info("데이터베이스에 서버 삭제")
+            session.delete(server)
+            with resource_ledger.change(node_name=node_name,
+                                        vcpu=-flavor.vcpu,
+                                        ram=-flavor.ram,
+                                        disk=-flavor.disk,
+                                        servers=-1,
+                                        user_name=user_name):
                 session.commit()
-            except Exception as e:
-                backend_logger.error(e)
-                return ErrorResponse(status.HTTP_500_INTERNAL_SERVER_ERROR, str(e))
+            expiry_scheduler.cancel_server(server_name)
+
+            job_manager.set_stage(job_id, 'cleanup')
+            flavor_delete(session=session,
+                          controller=controller,
+                          flavor_name=flavor_name,
+                          node_name=node_name)
+            network_delete(session=session,
+                           controller=controller,
+                           network_name=network_name,
+                           node_name=node_name)
+            session.commit()
+        except Exception as e:
+            backend_logger.error(e)
+            raise
+
+
+def _submit_job(job_type: str, target_name: str, task, **kwargs):
+    try:
+        job_id = job_manager.submit(job_type=job_type,
+                                    resource_type='server',
+                                    target_name=target_name,
+                                    task=task,
+                                    **kwargs)
+    except JobConflictError as e:
+        return ErrorResponse(status.HTTP_409_CONFLICT, str(e))
+    except JobQueueFullError as e:
+        return ErrorResponse(status.HTTP_503_SERVICE_UNAVAILABLE, str(e))
 
-        return ApiResponse(status.HTTP_200_OK, None)
-    else:
-        return ErrorResponse(status.HTTP_400_BAD_REQUEST, "입력한 정보가 잘못됨")
+    return ApiResponse(status.HTTP_202_ACCEPTED, JobAcceptedResponseDTO(job_id).__dict__)
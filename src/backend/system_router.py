@@ -0,0 +1,81 @@
+from fastapi import APIRouter, status
+
+from database.factories import MySQLEngineFactory, AsyncMySQLEngineFactory
+from database.pool import pool_stats, async_pool_stats
+from model.api_response_models import (ApiResponse, NodeConnectionResponseDTO, CacheStatsResponseDTO,
+                                       WarmPoolResponseDTO, DBPoolResponseDTO, BulkheadResponseDTO)
+from openStack.bulkhead import node_bulkhead
+from openStack.connection import connection_registry
+from openStack.openstack_controller import OpenStackController
+from util.logger import get_logger
+from util.response_cache import response_cache
+from util.warm_pool import warm_pool
+from config.config import db_config
+
+system_router = APIRouter(prefix="/system")
+controller = OpenStackController()
+db_connection = MySQLEngineFactory().get_instance()
+async_db_connection = AsyncMySQLEngineFactory().get_instance()
+backend_logger = get_logger(name='backend', log_level='INFO', save_path="./log/backend")
+
+
+@system_router.get("/connections")
+def connection_list_show():
+    backend_logger.info("노드 커넥션 상태 요청 수신")
+    connections = []
+    for node_name in connection_registry:
+        connections.append(NodeConnectionResponseDTO(name=node_name,
+                                                     connected=connection_registry.is_connected(node_name),
+                                                     healthy=connection_registry.is_healthy(node_name),
+                                                     connect_latency=connection_registry.connect_latency(node_name),
+                                                     error=connection_registry.last_error(node_name)).__dict__)
+    return ApiResponse(status.HTTP_200_OK, connections)
+
+
+@system_router.get("/lookup-cache")
+def lookup_cache_show():
+    backend_logger.info("오픈스택 조회 캐시 통계 요청 수신")
+    stats = [CacheStatsResponseDTO(name=node_name, **node_stats).__dict__
+             for node_name, node_stats in controller.lookup_cache_stats().items()]
+    return ApiResponse(status.HTTP_200_OK, stats)
+
+
+@system_router.get("/response-cache")
+def response_cache_show():
+    backend_logger.info("목록 응답 캐시 통계 요청 수신")
+    return ApiResponse(status.HTTP_200_OK, CacheStatsResponseDTO(name='response', **response_cache.stats()).__dict__)
+
+
+@system_router.get("/warm-pool")
+def warm_pool_show():
+    backend_logger.info("예비 서버 풀 상태 요청 수신")
+    return ApiResponse(status.HTTP_200_OK, [WarmPoolResponseDTO(**pool).__dict__ for pool in warm_pool.stats()])
+
+
+@system_router.get("/db-pool")
+def db_pool_show():
+    """
+    sync: 동기 핸들러와 작업 워커가 사용하는 풀, async: async 핸들러가 사용하는 풀
+    in_use: 사용 중인 커넥션 수, peak_in_use: 실행 후 최대 동시 사용 수
+    wait_*_ms: 최근 checkout들의 커넥션 대기 시간, timeouts: pool_timeout 안에 커넥션을 얻지 못한 횟수
+    """
+    backend_logger.info("DB 커넥션 풀 상태 요청 수신")
+    pools = [('sync', db_config['pool'], db_connection.pool, pool_stats),
+             ('async', db_config['async_pool'], async_db_connection.pool, async_pool_stats)]
+    return ApiResponse(status.HTTP_200_OK, [DBPoolResponseDTO(name=name,
+                                                              pool_size=config['pool_size'],
+                                                              max_overflow=config['max_overflow'],
+                                                              checked_in=pool.checkedin(),
+                                                              **stats.snapshot()).__dict__
+                                            for name, config, pool, stats in pools])
+
+
+@system_router.get("/bulkhead")
+def bulkhead_show():
+    """
+    active: 실행 중인 생성/삭제 호출 수, waiting: 슬롯을 기다리는 호출 수(waiting_users명)
+    admitted: 등록되어 끝나지 않은 대여/반납 요청 수, hold_seconds: 최근 슬롯 점유 시간 평균
+    """
+    backend_logger.info("노드 동시 실행 제한 상태 요청 수신")
+    return ApiResponse(status.HTTP_200_OK, [BulkheadResponseDTO(name=node_name, **node_stats).__dict__
+                                            for node_name, node_stats in node_bulkhead.stats().items()])
@@ -0,0 +1,19 @@
+import sys
+
+from util.benchmark import run_benchmark
+
+"""
+보조 인덱스 유무에 따른 주요 쿼리의 실행 시간을 비교합니다.
+서버/컨테이너 각 10만 건을 삽입한 뒤 만료 조회, 노드 자원 집계, 목록 조회, 네트워크/플레이버 연결 조회를 측정합니다.
+
+python benchmark.py [DB URL]
+DB URL을 지정하지 않으면 현재 디렉터리의 benchmark.db(SQLite)를 사용합니다.
+
+주의! 지정한 DB의 테이블을 모두 삭제 후 다시 생성하므로 운영 DB를 지정하지 마세요.
+"""
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        run_benchmark(db_url=sys.argv[1])
+    else:
+        run_benchmark()
@@ -1,13 +1,22 @@
+import threading
+
 from config.config import db_config
 
 from abc import *
 from sqlalchemy import create_engine, Engine
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+
+from database.pool import MeteredQueuePool, MeteredAsyncAdaptedQueuePool
+from database.tracing import trace_queries
 
 
 class EngineFactory(metaclass=ABCMeta):
+    _lock = threading.Lock()
+
     def __new__(cls):
-        if not hasattr(cls, 'instance'):
-            cls.instance = super().__new__(cls)
+        with EngineFactory._lock:
+            if not hasattr(cls, 'instance'):
+                cls.instance = super().__new__(cls)
         return cls.instance
 
     @abstractmethod
@@ -16,11 +25,53 @@ class EngineFactory(metaclass=ABCMeta):
 
 
 class MySQLEngineFactory(EngineFactory):
+    """
+    프로세스 전체가 하나의 엔진(커넥션 풀)을 공유합니다.
+    MySQLEngineFactory()는 항상 같은 인스턴스를 반환하며 엔진은 처음 호출될 때 한 번만 생성됩니다.
+    풀 크기와 커넥션 재사용 시간, 사용 전 연결 확인(pre-ping)은 db_config의 pool 항목으로 지정합니다.
+    """
     def __init__(self):
-        self._engine = create_engine(
-            f"mysql+pymysql://{db_config['id']}:{db_config['passwd']}@{db_config['ip']}"
-            f":{db_config['port']}/{db_config['name']}"
-        )
+        with EngineFactory._lock:
+            if hasattr(self, '_engine'):
+                return
+            pool_config = db_config['pool']
+            self._engine = create_engine(
+                f"mysql+pymysql://{db_config['id']}:{db_config['passwd']}@{db_config['ip']}"
+                f":{db_config['port']}/{db_config['name']}",
+                poolclass=MeteredQueuePool,
+                pool_size=pool_config['pool_size'],
+                max_overflow=pool_config['max_overflow'],
+                pool_timeout=pool_config['pool_timeout'],
+                pool_recycle=pool_config['pool_recycle'],
+                pool_pre_ping=pool_config['pool_pre_ping']
+            )
+            trace_queries(self._engine)
 
     def get_instance(self) -> Engine:
         return self._engine
+
+
+class AsyncMySQLEngineFactory(EngineFactory):
+    """
+    async 핸들러에서 사용하는 비동기 엔진(aiomysql)입니다.
+    MySQLEngineFactory와 마찬가지로 프로세스 전체가 하나의 엔진을 공유하며 풀 설정은 db_config의 async_pool 항목으로 지정합니다.
+    """
+    def __init__(self):
+        with EngineFactory._lock:
+            if hasattr(self, '_engine'):
+                return
+            pool_config = db_config['async_pool']
+            self._engine = create_async_engine(
+                f"mysql+aiomysql://{db_config['id']}:{db_config['passwd']}@{db_config['ip']}"
+                f":{db_config['port']}/{db_config['name']}",
+                poolclass=MeteredAsyncAdaptedQueuePool,
+                pool_size=pool_config['pool_size'],
+                max_overflow=pool_config['max_overflow'],
+                pool_timeout=pool_config['pool_timeout'],
+                pool_recycle=pool_config['pool_recycle'],
+                pool_pre_ping=pool_config['pool_pre_ping']
+            )
+            trace_queries(self._engine.sync_engine)
+
+    def get_instance(self) -> AsyncEngine:
+        return self._engine
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import deque
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from util.metrics import metrics
+
+
+class PoolStats:
+    """
+    커넥션 풀에서 커넥션을 꺼내는(checkout) 데 걸린 대기 시간과 사용 중인 커넥션 수를 기록합니다.
+    대기 시간 통계는 최근 window번의 checkout 기준입니다.
+    """
+    def __init__(self, name: str, window: int = 1024):
+        self.name = name
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)
+        self._checkouts = 0
+        self._timeouts = 0
+        self._in_use = 0
+        self._peak_in_use = 0
+
+    def record_checkout(self, wait: float):
+        pool_wait_seconds.observe(wait, pool=self.name)
+        with self._lock:
+            self._waits.append(wait)
+            self._checkouts += 1
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+
+    def record_checkin(self):
+        with self._lock:
+            self._in_use -= 1
+
+    def record_timeout(self):
+        with self._lock:
+            self._timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            return {'checkouts': self._checkouts,
+                    'timeouts': self._timeouts,
+                    'in_use': self._in_use,
+                    'peak_in_use': self._peak_in_use,
+                    'wait_avg_ms': round(sum(waits) / len(waits) * 1000, 3) if len(waits) != 0 else None,
+                    'wait_p95_ms': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 3)
+                    if len(waits) != 0 else None,
+                    'wait_max_ms': round(waits[-1] * 1000, 3) if len(waits) != 0 else None}
+
+
+pool_wait_seconds = metrics.histogram('kws_db_pool_checkout_wait_seconds', 'DB 커넥션 checkout 대기 시간', ('pool',))
+pool_stats = PoolStats('sync')
+async_pool_stats = PoolStats('async')
+
+
+def _pool_metric(field: str):
+    return lambda: {(stats.name,): stats.snapshot()[field] for stats in (pool_stats, async_pool_stats)}
+
+
+metrics.callback('kws_db_pool_checkouts_total', 'DB 커넥션 checkout 횟수', 'counter', ('pool',), _pool_metric('checkouts'))
+metrics.callback('kws_db_pool_timeouts_total', 'pool_timeout 안에 커넥션을 얻지 못한 횟수', 'counter', ('pool',),
+                 _pool_metric('timeouts'))
+metrics.callback('kws_db_pool_in_use', '사용 중인 DB 커넥션 수', 'gauge', ('pool',), _pool_metric('in_use'))
+metrics.callback('kws_db_pool_peak_in_use', '실행 후 최대 동시 사용 DB 커넥션 수', 'gauge', ('pool',), _pool_metric('peak_in_use'))
+
+
+class _MeteredPoolMixin:
+    """
+    checkout 대기 시간과 사용 중인 커넥션 수를 stats에 기록합니다.
+    dispose() 등으로 풀이 다시 만들어져도 같은 stats에 이어서 기록합니다.
+    """
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_checkout(time.perf_counter() - start)
+        return connection
+
+    def _do_return_conn(self, record):
+        self.stats.record_checkin()
+        super()._do_return_conn(record)
+
+
+class MeteredQueuePool(_MeteredPoolMixin, QueuePool):
+    stats = pool_stats
+
+
+class MeteredAsyncAdaptedQueuePool(_MeteredPoolMixin, AsyncAdaptedQueuePool):
+    stats = async_pool_stats
@@ -0,0 +1,102 @@
+from datetime import date
+from sqlalchemy import select, func, cast, Integer, Float, Select, CompoundSelect
+
+from model.db_models import Node, Server, Flavor, Container
+from config.config import openstack_config
+
+
+def node_usage_query() -> Select:
+    """
+    노드별 자원 한도와 해당 노드에서 실행 중인 서버들의 플레이버 사용량 합계를
+    한 번의 GROUP BY 조인으로 조회하는 쿼리를 반환합니다.
+
+    결과 행: name, vcpu, ram, disk, count, using_vcpu, using_ram, using_disk
+    """
+    return (select(Node.name,
+                   Node.vcpu,
+                   Node.ram,
+                   Node.disk,
+                   func.count(Server.id).label('count'),
+                   cast(func.coalesce(func.sum(Flavor.vcpu), 0), Integer).label('using_vcpu'),
+                   cast(func.coalesce(func.sum(Flavor.ram), 0), Integer).label('using_ram'),
+                   cast(func.coalesce(func.sum(Flavor.disk), 0), Integer).label('using_disk'))
+            .outerjoin(Server, Server.node_name == Node.name)
+            .outerjoin(Flavor, Flavor.name == Server.flavor_name)
+            .group_by(Node.id, Node.name, Node.vcpu, Node.ram, Node.disk))
+
+
+def node_user_count_query() -> CompoundSelect:
+    """
+    노드별, 사용자별 서버/컨테이너 수를 조회하는 쿼리를 반환합니다.
+    같은 (node_name, user_name)이 서버와 컨테이너로 두 번 나올 수 있습니다.
+
+    결과 행: node_name, user_name, count
+    """
+    servers = (select(Server.node_name,
+                      Server.user_name,
+                      func.count(Server.id).label('count'))
+               .group_by(Server.node_name, Server.user_name))
+    containers = (select(Container.node_name,
+                         Container.user_name,
+                         func.count(Container.id).label('count'))
+                  .group_by(Container.node_name, Container.user_name))
+    return servers.union_all(containers)
+
+
+def node_container_usage_query() -> Select:
+    """
+    노드별 컨테이너 수와 선언된 cpu, memory(MB) 합계를 조회하는 쿼리를 반환합니다.
+    cpu, memory가 기록되지 않은 컨테이너는 openstack_config의 container 기본값으로 계산합니다.
+
+    결과 행: node_name, count, using_cpu, using_memory
+    """
+    return (select(Container.node_name,
+                   func.count(Container.id).label('count'),
+                   cast(func.sum(func.coalesce(Container.cpu, openstack_config['container']['cpu'])), Float)
+                   .label('using_cpu'),
+                   cast(func.sum(func.coalesce(Container.memory, openstack_config['container']['memory'])), Integer)
+                   .label('using_memory'))
+            .group_by(Container.node_name))
+
+
+def instance_list_query(model,
+                        fields: list[str],
+                        name_column,
+                        user_name: str = None,
+                        node_name: str = None,
+                        end_date_from: date = None,
+                        end_date_to: date = None,
+                        name_prefix: str = None,
+                        after_id: int = None,
+                        limit: int = None) -> Select:
+    """
+    서버/컨테이너 목록을 조건에 맞게 id 순으로 조회하는 쿼리를 반환합니다.
+    after_id보다 큰 id부터 조회하는 커서 방식이므로 (필터 컬럼, id) 인덱스를 타고 limit만큼만 읽습니다.
+    다음 페이지가 있는지 확인하기 위해 limit보다 한 행 더 조회합니다.
+
+    :param model: Server 또는 Container
+    :param fields: 조회할 컬럼 이름
+    :param name_column: name_prefix로 검색할 이름 컬럼
+    :param end_date_from: 대여 종료 일자 하한(포함)
+    :param end_date_to: 대여 종료 일자 상한(포함)
+    :param after_id: 이전 페이지의 마지막 id
+    :param limit: 페이지 크기, None일 경우 전체
+    결과 행: id, *fields
+    """
+    query = select(model.id, *[getattr(model, field) for field in fields])
+    if user_name is not None:
+        query = query.where(model.user_name == user_name)
+    if node_name is not None:
+        query = query.where(model.node_name == node_name)
+    if end_date_from is not None:
+        query = query.where(model.end_date >= end_date_from)
+    if end_date_to is not None:
+        query = query.where(model.end_date <= end_date_to)
+    if name_prefix is not None:
+        query = query.where(name_column.startswith(name_prefix, autoescape=True))
+    if after_id is not None:
+        query = query.where(model.id > after_id)
+    query = query.order_by(model.id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return query
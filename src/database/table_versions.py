@@ -0,0 +1,55 @@
+import itertools
+import threading
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class TableVersions:
+    """
+    테이블별 세대(generation) 번호를 관리합니다.
+    세션이 테이블을 변경하고 커밋에 성공할 때마다 해당 테이블의 번호가 1씩 증가하므로,
+    번호가 같으면 그 사이에 테이블 내용이 바뀌지 않은 것입니다.
+
+    모든 Session의 flush/ORM DML(update, delete)에서 변경된 테이블을 모아 두었다가
+    커밋 후에 번호를 올리며, 롤백되면 모아 둔 테이블을 버립니다.
+    """
+    def __init__(self):
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def bump(self, *table_names: str):
+        with self._lock:
+            for table_name in table_names:
+                self._versions[table_name] = self._versions.get(table_name, 0) + 1
+
+    def get(self, *table_names: str) -> tuple:
+        with self._lock:
+            return tuple(self._versions.get(table_name, 0) for table_name in table_names)
+
+
+table_versions = TableVersions()
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_flushed_tables(session, flush_context):
+    changed_tables = session.info.setdefault('changed_tables', set())
+    for instance in itertools.chain(session.new, session.dirty, session.deleted):
+        changed_tables.add(instance.__table__.name)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_executed_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info.setdefault('changed_tables', set()).add(orm_execute_state.statement.table.name)
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_committed_tables(session):
+    changed_tables = session.info.pop('changed_tables', None)
+    if changed_tables:
+        table_versions.bump(*changed_tables)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back_tables(session):
+    session.info.pop('changed_tables', None)
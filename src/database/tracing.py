@@ -0,0 +1,43 @@
+import re
+import time
+from sqlalchemy import event, Engine
+
+from util.tracing import tracer
+
+# span에 기록할 SQL 문 최대 길이
+MAX_STATEMENT_LENGTH = 200
+
+
+def trace_queries(engine: Engine):
+    """
+    엔진에서 실행하는 쿼리를 현재 요청의 트레이스에 db.query span으로 기록합니다.
+    비동기 엔진은 sync_engine을 넘깁니다.
+    """
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if tracer.is_active():
+        context._trace_start = time.time()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_trace_start', None)
+    if start is not None:
+        tracer.record('db.query', start, statement=_shorten(statement))
+
+
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    start = getattr(context, '_trace_start', None) if context is not None else None
+    if start is not None:
+        tracer.record('db.query', start,
+                      error=f"{type(exception_context.original_exception).__name__}: {exception_context.original_exception}",
+                      statement=_shorten(exception_context.statement))
+
+
+def _shorten(statement: str | None) -> str:
+    statement = re.sub(r'\s+', ' ', statement or '').strip()
+    return statement if len(statement) <= MAX_STATEMENT_LENGTH else statement[:MAX_STATEMENT_LENGTH] + '...'
@@ -0,0 +1,12 @@
+from util.database_init import upgrade_schema
+
+"""
+모델에 새로 선언된 테이블, 컬럼과 인덱스를 기존 데이터베이스에 추가합니다.
+연결되는 데이터베이스는 db_config으로 지정된 데이터베이스입니다.
+
+이미 존재하는 테이블, 컬럼과 인덱스는 건너뛰며 기존 데이터는 변경하지 않습니다.
+모델의 스키마를 바꾸는 변경을 배포하기 전에 실행합니다.
+"""
+
+if __name__ == '__main__':
+    upgrade_schema()
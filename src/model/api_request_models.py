@@ -17,6 +17,10 @@ class ServerCreateRequestDTO(BaseModel):
     cloud_init: str | None
 
 
+class ServerBatchCreateRequestDTO(BaseModel):
+    servers: list[ServerCreateRequestDTO]
+
+
 class ContainerCreateRequestDTO(BaseModel):
     user_name: str
     container_name: str
@@ -28,6 +32,12 @@ class ContainerCreateRequestDTO(BaseModel):
     subnet_cidr: str | None
     env: str | None
     cmd: str | None
+    cpu: float | None = None
+    memory: int | None = None
+
+
+class ContainerBatchCreateRequestDTO(BaseModel):
+    containers: list[ContainerCreateRequestDTO]
 
 
 class ContainerReturnRequestDTO(BaseModel):
@@ -39,3 +49,14 @@ class ContainerExtensionRequestDTO(BaseModel):
     container_name: str
     password: str
     end_date: str
+
+
+class InstanceListRequestDTO(BaseModel):
+    user_name: str | None = None
+    node_name: str | None = None
+    end_date_from: str | None = None
+    end_date_to: str | None = None
+    name_prefix: str | None = None
+    fields: str | None = None
+    cursor: str | None = None
+    limit: int | None = None
@@ -5,19 +5,21 @@ from fastapi import Response
 
 
 class ApiResponse(Response):
-    def __init__(self, code: int, data: object):
+    def __init__(self, code: int, data: object, headers: dict = None):
         super().__init__(
             media_type="application/json",
             status_code=code,
-            content=json.dumps(data, default=str)
+            content=json.dumps(data, default=str),
+            headers=headers
         )
 
 
 class ErrorResponse(Response):
-    def __init__(self, code: int, message: str):
+    def __init__(self, code: int, message: str, headers: dict = None):
         super().__init__(
             status_code=code,
-            content=json.dumps({"data": message}, default=str)
+            content=json.dumps({"data": message}, default=str),
+            headers=headers
         )
 
 
@@ -41,6 +43,9 @@ class FlavorListResponseDTO:
 
 
 class ServersResponseDTO:
+    FIELDS = ('user_name', 'server_name', 'floating_ip', 'start_date', 'end_date',
+              'network_name', 'node_name', 'flavor_name', 'image_name')
+
     def __init__(self,
                  user_name: str,
                  server_name: str,
@@ -63,6 +68,9 @@ class ServersResponseDTO:
 
 
 class ContainersResponseDTO:
+    FIELDS = ('user_name', 'container_name', 'start_date', 'end_date', 'image_name',
+              'ip', 'port', 'network_name', 'node_name', 'cpu', 'memory')
+
     def __init__(self,
                  user_name: str,
                  container_name: str,
@@ -72,7 +80,9 @@ class ContainersResponseDTO:
                  ip: str,
                  port: str,
                  network_name: str,
-                 node_name: str):
+                 node_name: str,
+                 cpu: float | None = None,
+                 memory: int | None = None):
         self.user_name = user_name
         self.container_name = container_name
         self.start_date = start_date
@@ -82,6 +92,8 @@ class ContainersResponseDTO:
         self.port = port
         self.network_name = network_name
         self.node_name = node_name
+        self.cpu = cpu
+        self.memory = memory
 
 
 class UsingResourceDTO:
@@ -140,3 +152,130 @@ class NodeResponseDTO:
         self.vcpu = vcpu
         self.ram = ram
         self.disk = disk
+
+
+class JobAcceptedResponseDTO:
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+
+
+class JobResponseDTO:
+    def __init__(self,
+                 job_id: str,
+                 job_type: str,
+                 target_name: str,
+                 status: str,
+                 stage: str,
+                 result: object,
+                 error: str | None,
+                 created_at: datetime,
+                 updated_at: datetime):
+        self.job_id = job_id
+        self.job_type = job_type
+        self.target_name = target_name
+        self.status = status
+        self.stage = stage
+        self.result = result
+        self.error = error
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+
+class BatchItemResultDTO:
+    def __init__(self, name: str, status: str, result=None, error: str = None):
+        self.name = name
+        self.status = status
+        self.result = result
+        self.error = error
+
+
+class NodeConnectionResponseDTO:
+    def __init__(self, name: str, connected: bool, healthy: bool, connect_latency: float | None, error: str | None):
+        self.name = name
+        self.connected = connected
+        self.healthy = healthy
+        self.connect_latency = connect_latency
+        self.error = error
+
+
+class CacheStatsResponseDTO:
+    def __init__(self,
+                 name: str,
+                 size: int,
+                 maxsize: int,
+                 hits: int,
+                 misses: int,
+                 evictions: int,
+                 hit_ratio: float | None):
+        self.name = name
+        self.size = size
+        self.maxsize = maxsize
+        self.hits = hits
+        self.misses = misses
+        self.evictions = evictions
+        self.hit_ratio = hit_ratio
+
+
+class WarmPoolResponseDTO:
+    def __init__(self, image: str, flavor: str, node: str, size: int, ready: int, booting: int):
+        self.image = image
+        self.flavor = flavor
+        self.node = node
+        self.size = size
+        self.ready = ready
+        self.booting = booting
+
+
+class DBPoolResponseDTO:
+    def __init__(self,
+                 name: str,
+                 pool_size: int,
+                 max_overflow: int,
+                 checked_in: int,
+                 in_use: int,
+                 peak_in_use: int,
+                 checkouts: int,
+                 timeouts: int,
+                 wait_avg_ms: float | None,
+                 wait_p95_ms: float | None,
+                 wait_max_ms: float | None):
+        self.name = name
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.checked_in = checked_in
+        self.in_use = in_use
+        self.peak_in_use = peak_in_use
+        self.checkouts = checkouts
+        self.timeouts = timeouts
+        self.wait_avg_ms = wait_avg_ms
+        self.wait_p95_ms = wait_p95_ms
+        self.wait_max_ms = wait_max_ms
+
+
+class BulkheadResponseDTO:
+    def __init__(self,
+                 name: str,
+                 active: int,
+                 waiting: int,
+                 waiting_users: int,
+                 admitted: int,
+                 max_concurrent: int,
+                 max_queued: int,
+                 hold_seconds: float | None):
+        self.name = name
+        self.active = active
+        self.waiting = waiting
+        self.waiting_users = waiting_users
+        self.admitted = admitted
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.hold_seconds = hold_seconds
+
+
+class PlacementCandidateDTO:
+    def __init__(self, name: str, leftover_ratio: float, remaining: dict, stranded: dict, user_servers: int):
+        self.name = name
+        self.leftover_ratio = leftover_ratio
+        self.remaining = remaining
+        self.stranded = stranded
+        self.user_servers = user_servers
@@ -1,14 +1,21 @@
 import datetime
-from sqlalchemy import Integer, String, Date, Boolean, ForeignKey
+from sqlalchemy import Integer, Float, String, Date, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
 class Base(DeclarativeBase):
+    # 테이블/컬럼/인덱스를 추가하면 기존 DB에는 index.py(upgrade_schema)로 반영, 추가하는 컬럼은 nullable이어야 함
     pass
 
 
 class Server(Base):
     __tablename__ = "server"
+    # 목록 조회의 필터 + id 커서 페이지네이션용 인덱스
+    __table_args__ = (
+        Index('ix_server_user_name_id', 'user_name', 'id'),
+        Index('ix_server_node_name_id', 'node_name', 'id'),
+        Index('ix_server_end_date_id', 'end_date', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_name: Mapped[str] = mapped_column(String(45))
@@ -23,6 +30,9 @@ class Server(Base):
     flavor_name: Mapped[int] = mapped_column(ForeignKey('flavor.name'))
     flavor: Mapped['Flavor'] = relationship(back_populates='servers')
     image_name: Mapped[str] = mapped_column(String(45))
+    # 연장/반납 시 접속 정보 확인용, 키페어로 대여하면 공개키 지문, 비밀번호로 대여하면 솔트 해시
+    key_fingerprint: Mapped[str] = mapped_column(String(64), nullable=True)
+    password_hash: Mapped[str] = mapped_column(String(160), nullable=True)
 
 
 class Node(Base):
@@ -42,6 +52,12 @@ class Node(Base):
 
 class Container(Base):
     __tablename__ = "container"
+    # 목록 조회의 필터 + id 커서 페이지네이션용 인덱스
+    __table_args__ = (
+        Index('ix_container_user_name_id', 'user_name', 'id'),
+        Index('ix_container_node_name_id', 'node_name', 'id'),
+        Index('ix_container_end_date_id', 'end_date', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_name: Mapped[str] = mapped_column(String(45))
@@ -52,6 +68,8 @@ class Container(Base):
     password: Mapped[str] = mapped_column(String(100))
     ip: Mapped[str] = mapped_column(String(45))
     port: Mapped[str] = mapped_column(String(45))
+    cpu: Mapped[float] = mapped_column(Float, nullable=True)
+    memory: Mapped[int] = mapped_column(Integer, nullable=True)
     network_name: Mapped[int] = mapped_column(ForeignKey('network.name'))
     network: Mapped['Network'] = relationship(back_populates='containers')
     node_name: Mapped[int] = mapped_column(ForeignKey('node.name'))
@@ -86,6 +104,9 @@ class Network(Base):
 
 class NodeNetwork(Base):
     __tablename__ = "node_network"
+    __table_args__ = (
+        Index('ix_node_network_network_name_node_name', 'network_name', 'node_name'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     node_name: Mapped[int] = mapped_column(ForeignKey('node.name'))
@@ -96,9 +117,26 @@ class NodeNetwork(Base):
 
 class NodeFlavor(Base):
     __tablename__ = 'node_flavor'
+    __table_args__ = (
+        Index('ix_node_flavor_flavor_name_node_name', 'flavor_name', 'node_name'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     node_name: Mapped[int] = mapped_column(ForeignKey('node.name'))
     node: Mapped['Node'] = relationship(back_populates='node_flavors')
     flavor_name: Mapped[int] = mapped_column(ForeignKey('flavor.name'))
     flavor: Mapped['Flavor'] = relationship(back_populates='node_flavors')
+
+
+class Job(Base):
+    __tablename__ = 'job'
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    job_type: Mapped[str] = mapped_column(String(45))
+    target_name: Mapped[str] = mapped_column(String(45))
+    status: Mapped[str] = mapped_column(String(45))
+    stage: Mapped[str] = mapped_column(String(45))
+    result: Mapped[str] = mapped_column(Text, nullable=True)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+    updated_at: Mapped[datetime] = mapped_column(DateTime)
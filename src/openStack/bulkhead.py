@@ -0,0 +1,293 @@
+import functools
+import inspect
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+
+from util.logger import get_logger
+from util.tracing import tracer
+from config.config import openstack_config
+
+SYSTEM_USER = 'system'
+# 슬롯 점유 시간 이동 평균의 가중치
+HOLD_TIME_ALPHA = 0.2
+
+_current_user: ContextVar[str] = ContextVar('bulkhead_user', default=SYSTEM_USER)
+# 작업 전체가 슬롯을 잡고 실행 중인 노드, 이 노드의 guard는 슬롯을 다시 기다리지 않음
+_held_nodes: ContextVar[frozenset] = ContextVar('bulkhead_held_nodes', default=frozenset())
+
+
+class BulkheadFullError(Exception):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class BulkheadTimeout(Exception):
+    pass
+
+
+class _NodeGate:
+    def __init__(self):
+        self.active = 0
+        self.admitted = 0
+        # 사용자별 대기열, 순서가 곧 다음 슬롯을 받을 사용자 순서(라운드 로빈)
+        # 대기자는 스레드가 기다리는 Event 또는 슬롯을 받으면 작업을 워커 풀에 넣을 Admission
+        self.waiters: OrderedDict[str, deque] = OrderedDict()
+        self.hold_seconds = None
+
+
+class Admission:
+    """
+    노드 하나에 대한 대여/반납 요청의 입장권입니다.
+    작업이 끝나거나(bind한 함수 종료) 작업 등록에 실패해 release()할 때까지 노드의 대기열 한 칸을 차지합니다.
+    """
+    def __init__(self, bulkhead: 'NodeBulkhead', node_name: str, user_name: str):
+        self.node_name = node_name
+        self.user_name = user_name
+        self._bulkhead = bulkhead
+        self._released = False
+        self._start = None
+        self._slot_acquired = None
+        self._lock = threading.Lock()
+
+    def dispatch(self, start):
+        """
+        JobManager.submit(dispatch=...)에 넘기면 노드 슬롯을 user_name의 차례로 받은 뒤에 start()로 작업을 워커 풀에 넣습니다.
+        슬롯을 기다리는 동안 작업은 워커 스레드를 차지하지 않고 PENDING 상태로 남으며,
+        슬롯은 작업이 끝날 때까지 유지되므로 작업 안의 guard 메서드는 슬롯을 다시 기다리지 않습니다.
+        """
+        self._start = start
+        self._bulkhead._acquire_later(self)
+
+    def bind(self, func):
+        """
+        func를 실행하는 동안 노드 슬롯을 user_name의 차례로 기다리게 하고, 끝나면 입장권을 반납하는 함수를 반환합니다.
+        dispatch()로 이미 슬롯을 받은 경우 func 전체가 그 슬롯 안에서 실행됩니다.
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            user_token = _current_user.set(self.user_name)
+            held_token = _held_nodes.set(_held_nodes.get() | {self.node_name}) \
+                if self._slot_acquired is not None else None
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if held_token is not None:
+                    _held_nodes.reset(held_token)
+                _current_user.reset(user_token)
+                self.release()
+        return wrapper
+
+    def release(self):
+        """
+        입장권을 반납합니다. dispatch()로 받은 슬롯이 있으면 함께 반납하고, 아직 슬롯을 기다리는 중이면 대기열에서 빠집니다.
+        """
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+            slot_acquired, self._slot_acquired = self._slot_acquired, None
+        if slot_acquired is not None:
+            self._bulkhead._release(self.node_name, time.monotonic() - slot_acquired)
+        else:
+            self._bulkhead._cancel(self)
+        self._bulkhead._leave(self.node_name)
+
+    def _grant(self):
+        # 슬롯을 받은 시점, self._bulkhead._lock 밖에서 호출
+        with self._lock:
+            if self._released:
+                released = True
+            else:
+                released = False
+                self._slot_acquired = time.monotonic()
+        if released:
+            self._bulkhead._release(self.node_name, 0)
+            return
+        try:
+            self._start()
+        except Exception as e:
+            # 워커 풀이 종료된 경우 등, 슬롯을 넘겨준 쪽으로 예외를 전파하지 않음
+            self._bulkhead._logger.error(f"[{self.node_name}] : 작업 시작 실패 {e}")
+            self.release()
+
+
+class NodeBulkhead:
+    """
+    노드별로 서버/컨테이너 생성·삭제처럼 무거운 OpenStack 호출이 동시에 max_concurrent개까지만 실행되도록 제한합니다.
+
+    슬롯을 기다리는 호출은 사용자별 대기열에 들어가며, 슬롯이 나면 사용자를 돌아가며(라운드 로빈) 한 건씩 넘겨주므로
+    한 사용자가 많은 요청을 몰아 보내도 다른 사용자의 요청이 그 뒤로 밀리지 않습니다.
+    사용자는 Admission.bind()로 실행 중인 작업의 사용자이며, 만료 삭제나 예비 서버처럼 요청 없이 실행되는 호출은 system으로 취급합니다.
+
+    API는 작업을 등록하기 전에 admit()으로 노드의 입장권을 받아야 하며,
+    노드에 등록된 작업이 max_concurrent + max_queued개를 넘으면 BulkheadFullError가 발생합니다.
+    입장권으로 등록한 작업은 Admission.dispatch()로 슬롯을 받은 뒤에야 워커 풀에 들어가므로
+    한 노드가 붐벼도 공유 워커가 슬롯 대기로 묶이지 않습니다. 스레드가 직접 기다리는 guard 대기는 자체 스레드에서 실행되는
+    호출(만료 삭제, 예비 서버, 일괄 대여 항목)만 사용합니다.
+    retry_after는 최근 슬롯 점유 시간으로 추정한 대기열이 빠지는 데 걸리는 시간(초)입니다.
+    """
+    def __init__(self, max_concurrent: int, max_queued: int, wait_timeout: float, default_retry_after: int):
+        self._max_concurrent = max_concurrent
+        self._max_queued = max_queued
+        self._wait_timeout = wait_timeout
+        self._default_retry_after = default_retry_after
+        self._gates: dict[str, _NodeGate] = {}
+        self._lock = threading.Lock()
+        self._logger = get_logger(name='openstack_controller', log_level='INFO', save_path="./log/openStack")
+
+    def admit(self, node_name: str, user_name: str) -> Admission:
+        return self.admit_many([(node_name, user_name)])[0]
+
+    def admit_many(self, requests: list[tuple[str, str]]) -> list[Admission]:
+        """
+        여러 입장권을 한 번에 받습니다. 하나라도 받을 수 없으면 아무것도 받지 않습니다.
+        일괄 대여처럼 한 노드에 한도보다 많은 요청을 넣어도 노드가 비어 있으면 받아들입니다.
+
+        :param requests: [(노드명, 사용자명)]
+        :return: requests 순서의 입장권
+        """
+        counts = {}
+        for node_name, _ in requests:
+            counts[node_name] = counts.get(node_name, 0) + 1
+
+        with self._lock:
+            for node_name, count in counts.items():
+                gate = self._gate(node_name)
+                if gate.admitted != 0 and gate.admitted + count > self._max_concurrent + self._max_queued:
+                    retry_after = self._retry_after(gate, count)
+                    self._logger.info(f"[{node_name}] : 대기열 초과로 요청 거절 ({gate.admitted}건 진행 중)")
+                    raise BulkheadFullError(f"{node_name} 노드에 요청이 몰려 있습니다. {retry_after}초 후 다시 시도하세요.",
+                                            retry_after)
+            for node_name, count in counts.items():
+                self._gates[node_name].admitted += count
+        return [Admission(self, node_name, user_name) for node_name, user_name in requests]
+
+    def is_saturated(self, node_name: str) -> bool:
+        """
+        노드의 대기열이 가득 차 새 요청을 받을 수 없는지 여부
+        """
+        with self._lock:
+            gate = self._gates.get(node_name)
+            return gate is not None and gate.admitted >= self._max_concurrent + self._max_queued
+
+    def guard(self, func):
+        """
+        node_name 인자를 받는 메서드를 노드 슬롯 안에서 실행하도록 감쌉니다.
+        """
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            node_name = signature.bind(*args, **kwargs).arguments['node_name']
+            if node_name in _held_nodes.get():
+                return func(*args, **kwargs)
+            with tracer.span('bulkhead.wait', node=node_name):
+                self._acquire(node_name)
+            start = time.monotonic()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._release(node_name, time.monotonic() - start)
+        return wrapper
+
+    def stats(self) -> dict[str, dict]:
+        with self._lock:
+            return {node_name: {'active': gate.active,
+                                'waiting': sum(len(waiters) for waiters in gate.waiters.values()),
+                                'waiting_users': len(gate.waiters),
+                                'admitted': gate.admitted,
+                                'max_concurrent': self._max_concurrent,
+                                'max_queued': self._max_queued,
+                                'hold_seconds': round(gate.hold_seconds, 3) if gate.hold_seconds is not None else None}
+                    for node_name, gate in self._gates.items()}
+
+    def _gate(self, node_name: str) -> _NodeGate:
+        # self._lock을 잡은 상태에서 호출
+        if node_name not in self._gates:
+            self._gates[node_name] = _NodeGate()
+        return self._gates[node_name]
+
+    def _acquire(self, node_name: str):
+        user_name = _current_user.get()
+        with self._lock:
+            gate = self._gate(node_name)
+            if gate.active < self._max_concurrent and len(gate.waiters) == 0:
+                gate.active += 1
+                return
+            event = threading.Event()
+            gate.waiters.setdefault(user_name, deque()).append(event)
+
+        if event.wait(self._wait_timeout):
+            return
+        with self._lock:
+            if event.is_set():
+                # 시간 초과 직후 슬롯을 넘겨받음
+                return
+            waiters = gate.waiters[user_name]
+            waiters.remove(event)
+            if len(waiters) == 0:
+                del gate.waiters[user_name]
+        raise BulkheadTimeout(f"{node_name} 노드의 작업 슬롯 대기 시간 초과")
+
+    def _acquire_later(self, admission: Admission):
+        with self._lock:
+            gate = self._gate(admission.node_name)
+            if gate.active < self._max_concurrent and len(gate.waiters) == 0:
+                gate.active += 1
+            else:
+                gate.waiters.setdefault(admission.user_name, deque()).append(admission)
+                return
+        admission._grant()
+
+    def _cancel(self, admission: Admission):
+        # 슬롯을 받기 전에 입장권을 반납한 경우 대기열에서 제거
+        with self._lock:
+            gate = self._gates[admission.node_name]
+            waiters = gate.waiters.get(admission.user_name)
+            if waiters is not None and admission in waiters:
+                waiters.remove(admission)
+                if len(waiters) == 0:
+                    del gate.waiters[admission.user_name]
+
+    def _release(self, node_name: str, held: float):
+        with self._lock:
+            gate = self._gates[node_name]
+            if held > 0:
+                gate.hold_seconds = held if gate.hold_seconds is None \
+                    else gate.hold_seconds + HOLD_TIME_ALPHA * (held - gate.hold_seconds)
+            if len(gate.waiters) == 0:
+                gate.active -= 1
+                return
+            # 슬롯을 반납하지 않고 다음 차례 사용자의 가장 오래된 대기자에게 넘김
+            user_name, waiters = next(iter(gate.waiters.items()))
+            waiter = waiters.popleft()
+            if len(waiters) == 0:
+                del gate.waiters[user_name]
+            else:
+                gate.waiters.move_to_end(user_name)
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+                return
+        # 작업을 워커 풀에 넣는 일은 락 밖에서 처리
+        waiter._grant()
+
+    def _leave(self, node_name: str):
+        with self._lock:
+            self._gates[node_name].admitted -= 1
+
+    def _retry_after(self, gate: _NodeGate, count: int) -> int:
+        # self._lock을 잡은 상태에서 호출, 앞선 작업이 count건 끝날 때까지 걸릴 시간
+        if gate.hold_seconds is None:
+            return self._default_retry_after
+        overflow = gate.admitted + count - self._max_concurrent - self._max_queued
+        return max(1, math.ceil(gate.hold_seconds * overflow / self._max_concurrent))
+
+
+node_bulkhead = NodeBulkhead(max_concurrent=openstack_config['bulkhead']['max_concurrent'],
+                             max_queued=openstack_config['bulkhead']['max_queued'],
+                             wait_timeout=openstack_config['bulkhead']['wait_timeout'],
+                             default_retry_after=openstack_config['bulkhead']['default_retry_after'])
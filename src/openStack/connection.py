@@ -1,4 +1,7 @@
+import threading
+import time
 import openstack
+from concurrent.futures import ThreadPoolExecutor
 from zunclient import client
 
 from config.config import node_config, openstack_config
@@ -11,18 +14,108 @@ class Connection:
                                             password=openstack_config['password'],
                                             project_name=openstack_config['project_name'],
                                             domain_name=openstack_config['domain_name'])
-        self.zun_connection = client.Client(1,
-                                            auth_url=auth_url,
-                                            username=openstack_config['username'],
-                                            password=openstack_config['password'],
-                                            project_name=openstack_config['project_name'],
-                                            user_domain_name=openstack_config['domain_name'],
-                                            project_domain_name=openstack_config['domain_name'])
+        # 토큰 발급은 한 번만 하고 준 클라이언트도 같은 keystone 세션(토큰)을 재사용
+        self.connection.authorize()
+        self.zun_connection = client.Client(1, session=self.connection.session)
+
+
+class ConnectionRegistry:
+    """
+    프로세스 전체에서 노드별 Connection을 하나씩만 생성해 공유합니다.
+
+    커넥션은 해당 노드에 처음 접근할 때 생성되며, connect_all로 모든 노드를 병렬로 미리 연결할 수도 있습니다.
+    노드별 연결 소요 시간과 마지막 연결 실패 정보를 기록하며,
+    연결에 실패한 노드는 retry_interval(초) 동안 비정상(is_healthy = False)으로 취급됩니다.
+
+    {'노드명': Connection} 딕셔너리처럼 노드명으로 접근합니다.
+    """
+    def __init__(self, auth_urls: dict[str, str], retry_interval: float):
+        self._auth_urls = auth_urls
+        self._retry_interval = retry_interval
+        self._connections: dict[str, Connection] = {}
+        self._locks = {node_name: threading.Lock() for node_name in auth_urls}
+        self._latencies: dict[str, float] = {}
+        self._failures: dict[str, tuple[float, str]] = {}
+
+    def __getitem__(self, node_name: str) -> Connection:
+        connection = self._connections.get(node_name)
+        if connection is not None:
+            return connection
+        if node_name not in self._auth_urls:
+            raise KeyError(node_name)
+
+        with self._locks[node_name]:
+            connection = self._connections.get(node_name)
+            if connection is None:
+                connection = self._connect(node_name)
+        return connection
+
+    def __contains__(self, node_name: str) -> bool:
+        return node_name in self._auth_urls
+
+    def __iter__(self):
+        return iter(self._auth_urls)
+
+    def __len__(self) -> int:
+        return len(self._auth_urls)
+
+    def keys(self):
+        return self._auth_urls.keys()
+
+    def items(self):
+        return [(node_name, self[node_name]) for node_name in self._auth_urls]
+
+    def connect_all(self) -> dict[str, str]:
+        """
+        연결되지 않은 모든 노드를 병렬로 연결합니다.
+
+        :return: 연결에 실패한 노드의 {'노드명': '에러 메시지'}
+        """
+        targets = [node_name for node_name in self._auth_urls if node_name not in self._connections]
+        if len(targets) == 0:
+            return {}
+
+        errors = {}
+        with ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix='connect') as executor:
+            futures = {node_name: executor.submit(self.__getitem__, node_name) for node_name in targets}
+            for node_name, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    errors[node_name] = str(e)
+        return errors
+
+    def is_connected(self, node_name: str) -> bool:
+        return node_name in self._connections
+
+    def is_healthy(self, node_name: str) -> bool:
+        failure = self._failures.get(node_name)
+        return failure is None or time.monotonic() - failure[0] > self._retry_interval
+
+    def connect_latency(self, node_name: str) -> float | None:
+        return self._latencies.get(node_name)
+
+    def last_error(self, node_name: str) -> str | None:
+        failure = self._failures.get(node_name)
+        return failure[1] if failure is not None else None
+
+    def _connect(self, node_name: str) -> Connection:
+        start = time.perf_counter()
+        try:
+            connection = Connection(self._auth_urls[node_name])
+        except Exception as e:
+            self._failures[node_name] = (time.monotonic(), str(e))
+            raise
+
+        self._latencies[node_name] = time.perf_counter() - start
+        self._failures.pop(node_name, None)
+        self._connections[node_name] = connection
+        return connection
+
 
+connection_registry = ConnectionRegistry(auth_urls={node['name']: node['auth_url'] for node in node_config['nodes']},
+                                         retry_interval=openstack_config['connection']['retry_interval'])
 
-def get_connections() -> dict[str, Connection]:
-    connections = {}
-    for node in node_config['nodes']:
-        connections[node['name']] = Connection(node['auth_url'])
 
-    return connections
+def get_connections() -> ConnectionRegistry:
+    return connection_registry
@@ -0,0 +1,21 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from config.config import openstack_config
+
+# async 핸들러에서 OpenStack/Zun 호출처럼 블로킹되는 작업을 실행하는 전용 스레드 풀
+# 동기 핸들러가 사용하는 기본 스레드 풀과 분리되어 OpenStack 응답이 느려도 다른 요청 처리에 영향을 주지 않음
+openstack_executor = ThreadPoolExecutor(max_workers=openstack_config['executor']['max_workers'],
+                                        thread_name_prefix='openstack')
+
+
+async def run_openstack(func, *args, **kwargs):
+    """
+    func(*args, **kwargs)를 openstack_executor에서 실행하고 결과를 기다립니다.
+    run_in_threadpool과 같이 현재 컨텍스트(요청의 트레이스 등)를 복사해 실행합니다.
+    """
+    return await asyncio.get_running_loop().run_in_executor(openstack_executor,
+                                                            functools.partial(contextvars.copy_context().run,
+                                                                              func, *args, **kwargs))
@@ -1,14 +1,29 @@
-import time
+import threading
 import openstack
 
 from util.utils import cloud_init_creator
 from util.logger import get_logger
-from openStack.connection import get_connections, Connection
+from util.cache import TTLCache
+from util.metrics import metered, metered_node_calls
+from util import job_context
+from util.tracing import tracer
+from openStack.bulkhead import node_bulkhead
+from openStack.connection import get_connections, ConnectionRegistry
+from openStack.waiter import ResourceWaiter
+from config.config import openstack_config
 
 
+@metered_node_calls
 class OpenStackController:
     def __init__(self):
+        # 싱글톤이므로 모듈마다 OpenStackController()를 호출해도 초기화는 한 번만 수행
+        if hasattr(self, '_connections'):
+            return
         self._connections = get_connections()
+        self._waiters: dict[str, ResourceWaiter] = {}
+        self._waiters_lock = threading.Lock()
+        self._lookup_caches: dict[str, TTLCache] = {}
+        self._lookup_caches_lock = threading.Lock()
         self._logger = get_logger(name='openstack_controller', log_level='INFO', save_path="./log/openStack")
 
     def __new__(cls):
@@ -16,6 +31,52 @@ class OpenStackController:
             cls.instance = super().__new__(cls)
         return cls.instance
 
+    def _get_waiter(self, node_name: str) -> ResourceWaiter:
+        with self._waiters_lock:
+            if node_name not in self._waiters:
+                self._waiters[node_name] = ResourceWaiter(node_name=node_name,
+                                                          connection=self._connections[node_name],
+                                                          min_interval=openstack_config['waiter']['min_interval'],
+                                                          max_interval=openstack_config['waiter']['max_interval'],
+                                                          backoff=openstack_config['waiter']['backoff'])
+            return self._waiters[node_name]
+
+    def _get_lookup_cache(self, node_name: str) -> TTLCache:
+        with self._lookup_caches_lock:
+            if node_name not in self._lookup_caches:
+                self._lookup_caches[node_name] = TTLCache(maxsize=openstack_config['lookup_cache']['maxsize'],
+                                                          ttl=openstack_config['lookup_cache']['ttl'])
+            return self._lookup_caches[node_name]
+
+    def _cached_find(self, kind: str, name: str, node_name: str, finder):
+        """
+        노드별 조회 캐시에서 (자원 종류, 이름)으로 자원을 찾고, 없으면 finder(name)로 조회해 캐시에 저장합니다.
+        같은 자원을 동시에 조회하면 finder는 한 번만 호출되며, 존재하지 않는 자원(None)은 캐시하지 않습니다.
+        """
+        return self._get_lookup_cache(node_name).get_or_load((kind, name), lambda: finder(name))
+
+    def _invalidate_lookup(self, kind: str, node_name: str, *names: str, resource=None):
+        """
+        생성/수정/삭제한 자원을 조회 캐시에서 제거합니다.
+        이름과 ID 어느 쪽으로 조회했든 제거되도록 resource를 넘기면 자원의 이름과 ID도 함께 제거합니다.
+        """
+        cache = self._get_lookup_cache(node_name)
+        if resource is not None:
+            names = names + (resource.name, resource.id)
+        for name in names:
+            if name is not None:
+                cache.invalidate((kind, name))
+
+    def lookup_cache_stats(self) -> dict[str, dict]:
+        """
+        노드별 조회 캐시의 적중/미스 통계를 반환합니다.
+
+        :return: {'노드명': {'size', 'maxsize', 'hits', 'misses', 'evictions', 'hit_ratio'}}
+        """
+        with self._lookup_caches_lock:
+            caches = dict(self._lookup_caches)
+        return {node_name: cache.stats() for node_name, cache in caches.items()}
+
     def monitoring_resources(self, node_name, logger_on: bool = True) -> dict:
         """
         UC- 서버 자원 현황 조회
@@ -55,20 +116,20 @@ class OpenStackController:
 
         return result
 
-    def get_connections(self, logger_on: bool = True) -> dict[str, Connection]:
+    def get_connections(self, logger_on: bool = True) -> ConnectionRegistry:
         """
         어댑터 클래스 내부 Connection 객체를 반환합니다.
         Openstack SDK에 직접 접근할 필요가 있을 때 사용합니다.
         Openstack SDK의 자세한 내용은 아래 문서를 참고하세요.
         https://docs.openstack.org/openstacksdk/rocky/user/index.html#api-documentation
 
-        오픈스택 컨트롤러는 내부에서 노드들의 커넥션을 딕셔너리로 관리합니다.
-        {'노드명': '커넥션 객체'}로 저장되어 노드명으로 접근하면 됩니다.
+        오픈스택 컨트롤러는 프로세스 전체에서 공유되는 ConnectionRegistry로 노드들의 커넥션을 관리합니다.
+        {'노드명': '커넥션 객체'} 딕셔너리처럼 노드명으로 접근하면 되며, 커넥션은 처음 접근할 때 생성됩니다.
         커넥션 객체 내부는 nova, neutron 등 오픈스택의 기본 모듈에 접근하기 위한
         오픈스택 커넥션(connection)과 컨테이너를 담당하는 zun에 접근하기 위한
         준 커넥션(zun_connection)이 존재합니다.
 
-        :return: dict[str, Connection]
+        :return: ConnectionRegistry
         """
         if logger_on:
             self._logger.info(f'get_connections 실행')
@@ -87,6 +148,8 @@ class OpenStackController:
             self._logger.info(f'[{node_name}] : find_server 실행')
         return self._connections[node_name].connection.compute.find_server(server_name)
 
+    @node_bulkhead.guard
+    @metered
     def create_server(self,
                       server_name: str,
                       image_name: str,
@@ -141,22 +204,53 @@ class OpenStackController:
 
         if logger_on:
             self._logger.info(f"[{node_name}] : 서버 생성 중")
-        server = self._connections[node_name].connection.create_server(**kwargs)
+        with tracer.span('nova.create_server', node=node_name):
+            server = self._connections[node_name].connection.create_server(**kwargs)
         if logger_on:
             self._logger.info(f"[{node_name}] : 서버 가동 대기 중")
-        self._connections[node_name].connection.compute.wait_for_server(server)
+        job_context.report_stage('boot_wait')
+        with tracer.span('wait_for_server_active', node=node_name):
+            self._get_waiter(node_name).wait_for_server_active(server_name=server_name,
+                                                               timeout=openstack_config['waiter']['server_active_timeout']).result()
 
         return server, private_key
 
+    def find_servers(self, node_name: str, logger_on: bool = True):
+        """
+        노드에 존재하는 모든 서버 조회
+
+        :return: 서버 제너레이터
+        """
+        if logger_on:
+            self._logger.info(f'[{node_name}] : find_servers 실행')
+        return self._connections[node_name].connection.compute.servers()
+
+    def rename_server(self, server_name: str, new_name: str, node_name: str, logger_on: bool = True) -> None:
+        """
+        서버 이름 변경
+
+        :param server_name: 변경할 서버 이름
+        :param new_name: 새 서버 이름
+        :param node_name: 접근할 노드명
+        :param logger_on: 로그 온/오프
+        :return: 없음
+        """
+        if logger_on:
+            self._logger.info(f'[{node_name}] : rename_server 실행')
+        server = self._connections[node_name].connection.compute.find_server(server_name, ignore_missing=False)
+        self._connections[node_name].connection.compute.update_server(server, name=new_name)
+
     def allocate_floating_ip(self, server, node_name: str, logger_on: bool = True) -> str:
         if logger_on:
             self._logger.info(f'[{node_name}] : allocate_floating_ip 실행')
         return self._connections[node_name].connection.add_auto_ip(server, wait=True)
 
+    @node_bulkhead.guard
+    @metered
     def delete_server(self,
                       server_name: str,
                       node_name: str,
-                      timeout: int = 10,
+                      timeout: int = None,
                       server_ip: str = None,
                       logger_on: bool = True) -> None:
         """
@@ -165,7 +259,7 @@ class OpenStackController:
 
         :param server_name: 삭제할 서버 이름
         :param server_ip: 삭제할 서버의 유동 아이피
-        :param timeout: 서버 삭제 대기 타임아웃
+        :param timeout: 서버 삭제 대기 타임아웃(초), None일 경우 openstack_config의 waiter.server_delete_timeout 사용
         :param node_name: 접근할 노드명
         :param logger_on: 로그 온/오프
         :return: 없음
@@ -191,13 +285,11 @@ class OpenStackController:
                 self._connections[node_name].connection.compute.delete_keypair(key_pair)
 
             self._connections[node_name].connection.compute.delete_server(server)
-            timeout_count = 0
             if logger_on:
                 self._logger.info(f'[{node_name}] : 서버 삭제 대기 중')
-            while server is not None or timeout_count <= timeout:
-                server = self.find_server(server_name=server_name, node_name=node_name, logger_on=False)
-                time.sleep(1)
-                timeout_count += 1
+            self._get_waiter(node_name).wait_for_server_deleted(server_name=server_name,
+                                                                timeout=timeout if timeout is not None
+                                                                else openstack_config['waiter']['server_delete_timeout']).result()
 
     def find_image(self, image_name: str, node_name: str, logger_on: bool = True) -> openstack.compute.v2.image.Image:
         """
@@ -210,7 +302,8 @@ class OpenStackController:
         """
         if logger_on:
             self._logger.info(f'[{node_name}] : find_image 실행')
-        return self._connections[node_name].connection.compute.find_image(image_name)
+        return self._cached_find('image', image_name, node_name,
+                                 self._connections[node_name].connection.compute.find_image)
 
     def find_images(self, node_name: str, logger_on: bool = True):
         """
@@ -237,6 +330,7 @@ class OpenStackController:
         image = self.find_image(image_name=image_name, node_name=node_name, logger_on=False)
         if image is not None:
             self._connections[node_name].connection.compute.delete_image(image)
+            self._invalidate_lookup('image', node_name, image_name, resource=image)
     
     def find_network(self, network_name: str, node_name: str, logger_on: bool = True) -> openstack.network.v2.network.Network:
         """
@@ -247,7 +341,8 @@ class OpenStackController:
         """
         if logger_on:
             self._logger.info(f'[{node_name}] : find_network 실행')
-        return self._connections[node_name].connection.network.find_network(network_name)
+        return self._cached_find('network', network_name, node_name,
+                                 self._connections[node_name].connection.network.find_network)
 
     def find_networks(self, node_name: str, logger_on: bool = True) -> list[openstack.network.v2.network.Network]:
         """
@@ -275,7 +370,9 @@ class OpenStackController:
         """
         if logger_on:
             self._logger.info(f'[{node_name}] : create_network 실행')
-        return self._connections[node_name].connection.network.create_network(name=network_name, is_router_external=external)
+        network = self._connections[node_name].connection.network.create_network(name=network_name, is_router_external=external)
+        self._invalidate_lookup('network', node_name, network_name)
+        return network
 
     def update_network(self,
                        network_name: str,
@@ -296,10 +393,12 @@ class OpenStackController:
         if logger_on:
             self._logger.info(f'[{node_name}] : update_network 실행')
         target_network = self.find_network(network_name=network_name, node_name=node_name, logger_on=False)
-        return self._connections[node_name].connection.network.update_network(network=target_network,
-                                                                              name=new_name if new_name is not None else network_name,
-                                                                              is_router_external=external if external is not None
-                                                                              else target_network.is_router_external)
+        network = self._connections[node_name].connection.network.update_network(network=target_network,
+                                                                                 name=new_name if new_name is not None else network_name,
+                                                                                 is_router_external=external if external is not None
+                                                                                 else target_network.is_router_external)
+        self._invalidate_lookup('network', node_name, network_name, new_name, resource=target_network)
+        return network
 
     def delete_network(self, network_name: str, node_name: str, logger_on: bool = True) -> None:
         """
@@ -315,6 +414,9 @@ class OpenStackController:
         network = self.find_network(network_name=network_name, node_name=node_name, logger_on=False)
         if network is not None:
             self._connections[node_name].connection.network.delete_network(network)
+            self._invalidate_lookup('network', node_name, network_name, resource=network)
+            # 네트워크를 삭제하면 네트워크에 속한 서브넷도 함께 삭제됨
+            self._get_lookup_cache(node_name).invalidate_if(lambda key: key[0] == 'subnet')
     
     def find_subnet(self, subnet_name: str, node_name: str, logger_on: bool = True) -> openstack.network.v2.subnet.Subnet:
         """
@@ -327,7 +429,8 @@ class OpenStackController:
         """
         if logger_on:
             self._logger.info(f'[{node_name}] : find_subnet 실행')
-        return self._connections[node_name].connection.network.find_subnet(subnet_name)
+        return self._cached_find('subnet', subnet_name, node_name,
+                                 self._connections[node_name].connection.network.find_subnet)
 
     def create_subnet(self,
                       subnet_name: str,
@@ -349,14 +452,16 @@ class OpenStackController:
         """
         if logger_on:
             self._logger.info(f'[{node_name}] : create_subnet 실행')
-        return self._connections[node_name].connection.network.create_subnet(name=subnet_name,
-                                                                             ip_version=ip_version,
-                                                                             cidr=subnet_address,
-                                                                             gateway_ip=subnet_gateway,
-                                                                             network_id=self.find_network(network_name=network_name,
-                                                                                                          node_name=node_name,
-                                                                                                          logger_on=False).id,
-                                                                             dns_nameservers=['8.8.8.8'])
+        subnet = self._connections[node_name].connection.network.create_subnet(name=subnet_name,
+                                                                               ip_version=ip_version,
+                                                                               cidr=subnet_address,
+                                                                               gateway_ip=subnet_gateway,
+                                                                               network_id=self.find_network(network_name=network_name,
+                                                                                                            node_name=node_name,
+                                                                                                            logger_on=False).id,
+                                                                               dns_nameservers=['8.8.8.8'])
+        self._invalidate_lookup('subnet', node_name, subnet_name)
+        return subnet
 
     def update_subnet(self,
                       subnet_name: str,
@@ -381,12 +486,14 @@ class OpenStackController:
         if logger_on:
             self._logger.info(f'[{node_name}] : update_subnet 실행')
         target_subnet = self.find_subnet(subnet_name=subnet_name, node_name=node_name, logger_on=False)
-        return self._connections[node_name].connection.network.update_subnet(subnet=target_subnet,
-                                                                             name=new_name if new_name is not None else subnet_name,
-                                                                             ip_version=ip_version if ip_version is not None
-                                                                             else target_subnet.ip_version,
-                                                                             gateway_ip=subnet_gateway if subnet_gateway is not None
-                                                                             else target_subnet.gateway_ip)
+        subnet = self._connections[node_name].connection.network.update_subnet(subnet=target_subnet,
+                                                                               name=new_name if new_name is not None else subnet_name,
+                                                                               ip_version=ip_version if ip_version is not None
+                                                                               else target_subnet.ip_version,
+                                                                               gateway_ip=subnet_gateway if subnet_gateway is not None
+                                                                               else target_subnet.gateway_ip)
+        self._invalidate_lookup('subnet', node_name, subnet_name, new_name, resource=target_subnet)
+        return subnet
 
     def delete_subnet(self, subnet_name: str, node_name: str, logger_on: bool = True) -> None:
         """
@@ -402,6 +509,7 @@ class OpenStackController:
         subnet = self.find_subnet(subnet_name=subnet_name, node_name=node_name, logger_on=False)
         if subnet is not None:
             self._connections[node_name].connection.network.delete_subnet(subnet)
+            self._invalidate_lookup('subnet', node_name, subnet_name, resource=subnet)
 
     def find_router(self, router_name: str, node_name: str, logger_on: bool = True) -> openstack.network.v2.router.Router:
         """
@@ -414,7 +522,8 @@ class OpenStackController:
         """
         if logger_on:
             self._logger.info(f'[{node_name}] : find_router 실행')
-        return self._connections[node_name].connection.network.find_router(router_name)
+        return self._cached_find('router', router_name, node_name,
+                                 self._connections[node_name].connection.network.find_router)
 
     def create_router(self,
                       router_name: str,
@@ -459,6 +568,7 @@ class OpenStackController:
         else:
             router = self._connections[node_name].connection.network.create_router(name=router_name)
 
+        self._invalidate_lookup('router', node_name, router_name)
         return router
 
     def add_interface_to_router(self, router_name: str,
@@ -523,10 +633,10 @@ class OpenStackController:
         """
         if logger_on:
             self._logger.info(f'[{node_name}] : update_router 실행')
-        return self._connections[node_name].connection.network.update_router(router=self.find_router(router_name=router_name,
-                                                                                                     node_name=node_name,
-                                                                                                     logger_on=False),
-                                                                             name=new_name)
+        target_router = self.find_router(router_name=router_name, node_name=node_name, logger_on=False)
+        router = self._connections[node_name].connection.network.update_router(router=target_router, name=new_name)
+        self._invalidate_lookup('router', node_name, router_name, new_name, resource=target_router)
+        return router
 
     def delete_router(self, router_name: str, node_name: str, logger_on: bool = True) -> None:
         """
@@ -542,6 +652,7 @@ class OpenStackController:
         router = self.find_router(router_name=router_name, node_name=node_name, logger_on=False)
         if router is not None:
             self._connections[node_name].connection.network.delete_router(router)
+            self._invalidate_lookup('router', node_name, router_name, resource=router)
     
     def find_flavor(self,
                     flavor_name: str,
@@ -557,7 +668,8 @@ class OpenStackController:
         """
         if logger_on:
             self._logger.info(f'[{node_name}] : find_flavor 실행')
-        return self._connections[node_name].connection.compute.find_flavor(flavor_name)
+        return self._cached_find('flavor', flavor_name, node_name,
+                                 self._connections[node_name].connection.compute.find_flavor)
 
     def find_flavors(self, node_name: str, logger_on: bool = True) -> list[openstack.compute.v2.flavor.Flavor]:
         """
@@ -591,10 +703,12 @@ class OpenStackController:
             self._logger.info(f'[{node_name}] : create_flavor 실행')
 
         if self.find_flavor(flavor_name=flavor_name, node_name=node_name, logger_on=False) is None:
-            return self._connections[node_name].connection.compute.create_flavor(name=flavor_name,
-                                                                                 vcpus=vcpus,
-                                                                                 ram=ram,
-                                                                                 disk=disk)
+            flavor = self._connections[node_name].connection.compute.create_flavor(name=flavor_name,
+                                                                                   vcpus=vcpus,
+                                                                                   ram=ram,
+                                                                                   disk=disk)
+            self._invalidate_lookup('flavor', node_name, flavor_name)
+            return flavor
         else:
             return None
 
@@ -612,6 +726,7 @@ class OpenStackController:
         flavor = self.find_flavor(flavor_name=flavor_name, node_name=node_name, logger_on=False)
         if flavor is not None:
             self._connections[node_name].connection.compute.delete_flavor(flavor)
+            self._invalidate_lookup('flavor', node_name, flavor_name, resource=flavor)
 
     def create_key_pair(self,
                         keypair_name: str,
@@ -652,6 +767,19 @@ class OpenStackController:
 
         return keypair
 
+    def delete_key_pair(self, keypair_name: str, node_name: str, logger_on: bool = True) -> None:
+        """
+        키 페어 삭제, 서버에 이미 등록된 공개키에는 영향을 주지 않습니다.
+
+        :param keypair_name: 삭제할 키 페어 이름
+        :param node_name: 접근할 노드명
+        :param logger_on: 로그 온/오프
+        :return: 없음
+        """
+        if logger_on:
+            self._logger.info(f'[{node_name}] : delete_key_pair 실행')
+        self._connections[node_name].connection.compute.delete_keypair(keypair_name, ignore_missing=True)
+
     def find_ports(self, network_id: str, node_name: str, logger_on: bool = True):
         """
         네트워크에 존재하는 모든 포트 조회
@@ -665,6 +793,8 @@ class OpenStackController:
             self._logger.info(f'[{node_name}] : find_ports 실행')
         return self._connections[node_name].connection.network.ports(network_id=network_id)
 
+    @node_bulkhead.guard
+    @metered
     def create_container(self,
                          container_name: str,
                          image_name: str,
@@ -672,6 +802,8 @@ class OpenStackController:
                          node_name: str,
                          env: dict = None,
                          cmd: list = None,
+                         cpu: float = None,
+                         memory: int = None,
                          logger_on: bool = True):
         """
         컨테이너를 생성합니다.
@@ -681,6 +813,8 @@ class OpenStackController:
         :param network_name: 컨테이너에 연결될 네트워크 이름
         :param env: 덮어 씌울 환경변수
         :param cmd: 덮어 씌울 명령어
+        :param cpu: 컨테이너에 할당할 cpu 수, None일 경우 zun 기본값
+        :param memory: 컨테이너에 할당할 메모리(MB), None일 경우 zun 기본값
         :param node_name: 접근할 노드명
         :param logger_on: 로그 온/오프
         :return: 생성된 컨테이너 인스턴스
@@ -690,17 +824,29 @@ class OpenStackController:
         if self.find_container(container_name=container_name, node_name=node_name, logger_on=False) is not None:
             return None
 
-        container = self._connections[node_name].zun_connection.containers.run(name=container_name,
-                                                                               image=image_name,
-                                                                               environment=env,
-                                                                               command=cmd,
-                                                                               nets=[{'network': network_name}])
+        kwargs = {
+            "name": container_name,
+            "image": image_name,
+            "environment": env,
+            "command": cmd,
+            "nets": [{'network': network_name}]
+        }
+        if cpu is not None:
+            kwargs["cpu"] = cpu
+        if memory is not None:
+            kwargs["memory"] = str(memory)
+
+        with tracer.span('zun.run_container', node=node_name):
+            container = self._connections[node_name].zun_connection.containers.run(**kwargs)
 
         if logger_on:
             self._logger.info(f'[{node_name}] : 컨테이너 준비 대기 중')
-        while container.status == 'Creating' or container.status == 'Created':
+        job_context.report_stage('boot_wait')
+        if container.status == 'Creating' or container.status == 'Created':
+            with tracer.span('wait_for_container_ready', node=node_name):
+                self._get_waiter(node_name).wait_for_container_ready(container_name=container_name,
+                                                                     timeout=openstack_config['waiter']['container_timeout']).result()
             container = self.find_container(container_name=container_name, node_name=node_name, logger_on=False)
-            time.sleep(1)
 
         self._logger.info(f'컨테이너 상태: {container.status}')
         if container.status == 'Stopped' or container.status == 'Error':
@@ -724,6 +870,8 @@ class OpenStackController:
         except:
             return None
 
+    @node_bulkhead.guard
+    @metered
     def delete_container(self, container_name: str, node_name: str, logger_on: bool = True):
         """
         컨테이너를 삭제합니다.
@@ -742,6 +890,5 @@ class OpenStackController:
 
             if logger_on:
                 self._logger.info(f'[{node_name}] : 컨테이너 삭제 대기 중')
-            while container is not None:
-                container = self.find_container(container_name=container_name, node_name=node_name, logger_on=False)
-                time.sleep(1)
+            self._get_waiter(node_name).wait_for_container_deleted(container_name=container_name,
+                                                                   timeout=openstack_config['waiter']['container_timeout']).result()
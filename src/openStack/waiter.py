@@ -0,0 +1,197 @@
+import threading
+import time
+from concurrent.futures import Future
+
+from util.logger import get_logger
+from util.metrics import metrics, openstack_call_seconds, openstack_call_errors, LONG_BUCKETS
+from openStack.connection import Connection
+
+
+wait_seconds = metrics.histogram('kws_openstack_wait_duration_seconds',
+                                 '서버/컨테이너 상태 변화(가동, 삭제) 대기 시간',
+                                 ('node', 'kind', 'outcome'),
+                                 LONG_BUCKETS)
+
+
+class ResourceWaitTimeout(Exception):
+    pass
+
+
+class _Wait:
+    def __init__(self, kind: str, name: str, timeout: float):
+        self.kind = kind
+        self.name = name
+        self.timeout = timeout
+        self.started = time.monotonic()
+        self.deadline = self.started + timeout
+        self.future = Future()
+
+
+class ResourceWaiter:
+    """
+    노드 하나에 대한 서버/컨테이너 상태 대기를 처리합니다.
+
+    대기 요청들을 모아 틱마다 자원 종류별로 목록 조회(servers, containers.list)를 한 번씩만 호출하고,
+    조건을 만족한 요청의 Future를 완료시킵니다.
+    조회 간격은 min_interval에서 시작해 변화가 없을 때마다 backoff 배수로 max_interval까지 늘어나며,
+    완료된 요청이 있거나 새 요청이 들어오면 다시 min_interval로 돌아갑니다.
+    timeout이 지난 요청은 ResourceWaitTimeout으로 완료됩니다.
+
+    새 요청이 들어오면 대기 중인 스레드를 깨워 min_interval 안에 조회하며, 다음 틱에 함께 조회되므로 동시에 들어온 요청들이 한 번의 목록 조회로 처리됩니다.
+    대기 스레드는 첫 요청이 들어올 때 시작되고 대기 중인 요청이 없으면 종료됩니다.
+    """
+    SERVER_ACTIVE = 'server_active'
+    SERVER_DELETED = 'server_deleted'
+    CONTAINER_READY = 'container_ready'
+    CONTAINER_DELETED = 'container_deleted'
+
+    def __init__(self,
+                 node_name: str,
+                 connection: Connection,
+                 min_interval: float,
+                 max_interval: float,
+                 backoff: float):
+        self._node_name = node_name
+        self._connection = connection
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._backoff = backoff
+        self._interval = min_interval
+        # 다음 목록 조회 시각 (time.monotonic())
+        self._next_poll = 0.0
+        self._waits: list[_Wait] = []
+        self._condition = threading.Condition()
+        self._thread = None
+        self._logger = get_logger(name='openstack_controller', log_level='INFO', save_path="./log/openStack")
+
+    def wait_for_server_active(self, server_name: str, timeout: float) -> Future:
+        return self._register(self.SERVER_ACTIVE, server_name, timeout)
+
+    def wait_for_server_deleted(self, server_name: str, timeout: float) -> Future:
+        return self._register(self.SERVER_DELETED, server_name, timeout)
+
+    def wait_for_container_ready(self, container_name: str, timeout: float) -> Future:
+        return self._register(self.CONTAINER_READY, container_name, timeout)
+
+    def wait_for_container_deleted(self, container_name: str, timeout: float) -> Future:
+        return self._register(self.CONTAINER_DELETED, container_name, timeout)
+
+    def _register(self, kind: str, name: str, timeout: float) -> Future:
+        wait = _Wait(kind, name, timeout)
+        with self._condition:
+            self._waits.append(wait)
+            self._interval = self._min_interval
+            first_poll = time.monotonic() + self._min_interval
+            if self._thread is None:
+                self._next_poll = first_poll
+                self._thread = threading.Thread(target=self._run,
+                                                name=f'waiter-{self._node_name}',
+                                                daemon=True)
+                self._thread.start()
+            else:
+                # max_interval까지 늘어난 대기 중이어도 새 요청은 min_interval 안에 조회되도록 대기 스레드를 깨움
+                self._next_poll = min(self._next_poll, first_poll)
+                self._condition.notify()
+        return wait.future
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if len(self._waits) == 0:
+                    self._thread = None
+                    return
+                while True:
+                    wake_at = min(self._next_poll, min(wait.deadline for wait in self._waits))
+                    now = time.monotonic()
+                    if now >= wake_at:
+                        break
+                    self._condition.wait(wake_at - now)
+                waits = list(self._waits)
+
+            done = self._poll(waits)
+
+            with self._condition:
+                self._waits = [wait for wait in self._waits if wait not in done]
+                if len(done) != 0:
+                    self._interval = self._min_interval
+                else:
+                    self._interval = min(self._interval * self._backoff, self._max_interval)
+                self._next_poll = time.monotonic() + self._interval
+
+    def _poll(self, waits: list[_Wait]) -> set[_Wait]:
+        kinds = {wait.kind for wait in waits}
+        servers = None
+        containers = None
+
+        try:
+            if kinds & {self.SERVER_ACTIVE, self.SERVER_DELETED}:
+                servers = {server.name: server
+                           for server in self._list('list_servers', self._connection.connection.compute.servers)}
+            if kinds & {self.CONTAINER_READY, self.CONTAINER_DELETED}:
+                containers = {container.name: container
+                              for container in self._list('list_containers', self._connection.zun_connection.containers.list)}
+        except Exception as e:
+            self._logger.error(f'[{self._node_name}] : 자원 목록 조회 실패 {e}')
+
+        done = set()
+        now = time.monotonic()
+        for wait in waits:
+            try:
+                finished = self._check(wait, servers, containers)
+            except Exception as e:
+                wait.future.set_exception(e)
+                done.add(wait)
+                continue
+
+            if finished:
+                done.add(wait)
+                wait_seconds.observe(now - wait.started, node=self._node_name, kind=wait.kind, outcome='done')
+            elif now >= wait.deadline:
+                wait.future.set_exception(ResourceWaitTimeout(
+                    f'[{self._node_name}] : {wait.name} {wait.kind} 대기 시간 초과({wait.timeout}초)'))
+                done.add(wait)
+                wait_seconds.observe(now - wait.started, node=self._node_name, kind=wait.kind, outcome='timeout')
+
+        return done
+
+    def _list(self, method: str, list_func) -> list:
+        start = time.perf_counter()
+        try:
+            return list(list_func())
+        except Exception:
+            openstack_call_errors.inc(node=self._node_name, method=method)
+            raise
+        finally:
+            openstack_call_seconds.observe(time.perf_counter() - start, node=self._node_name, method=method)
+
+    def _check(self, wait: _Wait, servers: dict | None, containers: dict | None) -> bool:
+        if wait.kind in (self.SERVER_ACTIVE, self.SERVER_DELETED):
+            if servers is None:
+                return False
+            server = servers.get(wait.name)
+            if wait.kind == self.SERVER_DELETED:
+                if server is None:
+                    wait.future.set_result(None)
+                    return True
+                return False
+            if server is not None and server.status == 'ACTIVE':
+                wait.future.set_result(server)
+                return True
+            if server is not None and server.status == 'ERROR':
+                raise Exception(f'[{self._node_name}] : {wait.name} 서버가 ERROR 상태입니다.')
+            return False
+
+        if containers is None:
+            return False
+        container = containers.get(wait.name)
+        if wait.kind == self.CONTAINER_DELETED:
+            if container is None:
+                wait.future.set_result(None)
+                return True
+            return False
+        if container is None:
+            raise Exception(f'[{self._node_name}] : {wait.name} 컨테이너를 찾을 수 없습니다.')
+        if container.status not in ('Creating', 'Created'):
+            wait.future.set_result(container)
+            return True
+        return False
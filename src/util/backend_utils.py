@@ -1,9 +1,17 @@
+import sqlalchemy
 import sqlalchemy.orm
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from fastapi import status
 
 import openStack.openstack_controller
-from util.utils import gateway_extractor, subnet_name_creator
-from config.config import openstack_config
+from database.queries import instance_list_query
+from model.api_request_models import InstanceListRequestDTO
+from model.api_response_models import ErrorResponse
+from openStack.bulkhead import BulkheadFullError
+from util.utils import gateway_extractor, subnet_name_creator, str_to_date, encode_cursor, decode_cursor
+from config.config import openstack_config, server_config
 from util.logger import get_logger
+from util.tracing import tracer
 from sqlalchemy import select
 from model.db_models import Network, NodeNetwork, Flavor, NodeFlavor
 
@@ -18,24 +26,20 @@ def _network_isolation(controller: openStack.openstack_controller.OpenStackContr
     backend_logger.info(f"[{node_name}]: 네트워크 분리 중")
     subnet_name = f'{network_name}_subnet'
 
-    controller.create_network(network_name=network_name, node_name=node_name, external=False)
-    controller.create_subnet(subnet_name=subnet_name,
-                             node_name=node_name,
-                             ip_version=4,
-                             subnet_address=subnet_cidr,
-                             subnet_gateway=gateway_extractor(subnet_cidr),
-                             network_name=network_name)
-    controller.add_interface_to_router(router_name=openstack_config['router'],
-                                       node_name=node_name,
-                                       internal_subnet_name=subnet_name)
+    with tracer.span('network_isolation', node=node_name, network=network_name):
+        controller.create_network(network_name=network_name, node_name=node_name, external=False)
+        controller.create_subnet(subnet_name=subnet_name,
+                                 node_name=node_name,
+                                 ip_version=4,
+                                 subnet_address=subnet_cidr,
+                                 subnet_gateway=gateway_extractor(subnet_cidr),
+                                 network_name=network_name)
+        controller.add_interface_to_router(router_name=openstack_config['router'],
+                                           node_name=node_name,
+                                           internal_subnet_name=subnet_name)
 
 
-def create_network(session: sqlalchemy.orm.Session,
-                   controller: openStack.openstack_controller.OpenStackController,
-                   network_name: str,
-                   subnet_cidr: str,
-                   node_name: str):
-    backend_logger.info("네트워크 분리 여부 검사")
+def insert_network(session: sqlalchemy.orm.Session, network_name: str, subnet_cidr: str):
     if len(session.scalars(select(Network).where(Network.name == network_name)).all()) == 0:
         backend_logger.info("시스템에 해당 네트워크 존재하지 않음")
         backend_logger.info("데이터베이스에 네트워크 삽입")
@@ -46,6 +50,15 @@ def create_network(session: sqlalchemy.orm.Session,
             is_external=False,
         ))
 
+
+def create_network(session: sqlalchemy.orm.Session,
+                   controller: openStack.openstack_controller.OpenStackController,
+                   network_name: str,
+                   subnet_cidr: str,
+                   node_name: str):
+    backend_logger.info("네트워크 분리 여부 검사")
+    insert_network(session=session, network_name=network_name, subnet_cidr=subnet_cidr)
+
     # 해당 노드의 네트워크가 없다면
     if len(session.scalars(select(NodeNetwork).where(NodeNetwork.network_name == network_name,
                                                      NodeNetwork.node_name == node_name)).all()) == 0:
@@ -104,6 +117,67 @@ def flavor_delete(session: sqlalchemy.orm.Session,
         session.delete(flavor)
 
 
+def node_flavor_delete(session: sqlalchemy.orm.Session,
+                       controller: openStack.openstack_controller.OpenStackController,
+                       flavor_name: str,
+                       node_names: set[str]):
+    """
+    일괄 대여 정리용, 커스텀 플레이버를 node_names의 각 노드에서 그 노드의 서버가 사용하지 않으면 삭제합니다.
+    사용 중인 서버가 하나도 없으면 플레이버 행도 삭제합니다.
+    """
+    flavor = session.scalars(select(Flavor).where(Flavor.name == flavor_name)).one_or_none()
+    if flavor is None or flavor.is_default:
+        return
+
+    for node_name in node_names:
+        if any(server.node_name == node_name for server in flavor.servers):
+            continue
+        backend_logger.info(f"[{node_name}] : 커스텀 플레이버 삭제")
+        controller.delete_flavor(flavor_name=flavor_name, node_name=node_name)
+        for node_flavor in session.scalars(select(NodeFlavor).where(NodeFlavor.flavor_name == flavor_name,
+                                                                    NodeFlavor.node_name == node_name)).all():
+            session.delete(node_flavor)
+    session.flush()
+
+    if len(flavor.servers) == 0 and \
+            len(session.scalars(select(NodeFlavor).where(NodeFlavor.flavor_name == flavor_name)).all()) == 0:
+        backend_logger.info("데이터베이스에 플레이버 삭제")
+        session.delete(flavor)
+
+
+def node_network_delete(session: sqlalchemy.orm.Session,
+                        controller: openStack.openstack_controller.OpenStackController,
+                        network_name: str,
+                        node_names: set[str]):
+    """
+    일괄 대여 정리용, 내부 네트워크를 node_names의 각 노드에서 그 노드의 서버/컨테이너가 사용하지 않으면 삭제합니다.
+    어느 노드에도 남지 않고 사용 중인 서버/컨테이너도 없으면 네트워크 행도 삭제합니다.
+    """
+    network = session.scalars(select(Network).where(Network.name == network_name)).one_or_none()
+    if network is None or network.is_default:
+        return
+
+    for node_name in node_names:
+        if any(instance.node_name == node_name for instance in network.servers + network.containers):
+            continue
+        node_network = session.scalars(select(NodeNetwork).where(NodeNetwork.network_name == network_name,
+                                                                 NodeNetwork.node_name == node_name)).one_or_none()
+        if node_network is None:
+            continue
+        backend_logger.info(f"[{node_name}] : 내부 네트워크 삭제")
+        controller.remove_interface_from_router(router_name=openstack_config['router'],
+                                                node_name=node_name,
+                                                internal_subnet_name=subnet_name_creator(network_name))
+        controller.delete_network(network_name=network_name, node_name=node_name)
+        session.delete(node_network)
+    session.flush()
+
+    if len(network.servers) + len(network.containers) == 0 and \
+            len(session.scalars(select(NodeNetwork).where(NodeNetwork.network_name == network_name)).all()) == 0:
+        backend_logger.info("데이터베이스에 네트워크 삭제")
+        session.delete(network)
+
+
 def network_rollback(session: sqlalchemy.orm.Session,
                      controller: openStack.openstack_controller.OpenStackController,
                      network_name: str,
@@ -114,3 +188,68 @@ def network_rollback(session: sqlalchemy.orm.Session,
                                                 node_name=node_name,
                                                 internal_subnet_name=subnet_name_creator(network_name))
         controller.delete_network(network_name=network_name, node_name=node_name)
+
+
+async def load_instance_list(engine: AsyncEngine,
+                             model,
+                             name_column,
+                             response_fields: tuple[str, ...],
+                             list_request: InstanceListRequestDTO) -> tuple[list[dict], str | None]:
+    """
+    서버/컨테이너 목록을 필터, 커서 페이지네이션, 필드 선택(fields)을 적용해 비동기로 조회합니다.
+    limit이 없으면 조건에 맞는 전체 목록을 반환합니다.
+
+    :param engine: 비동기 엔진
+    :param model: Server 또는 Container
+    :param name_column: name_prefix로 검색할 이름 컬럼
+    :param response_fields: 응답에 포함할 수 있는 필드 (fields가 없으면 전체)
+    :param list_request: 목록 조회 조건
+    :return: (목록, 다음 페이지 커서), 마지막 페이지이면 커서는 None
+    :raise ValueError: 조회 조건이 잘못된 경우
+    """
+    if list_request.fields is not None:
+        fields = [field.strip() for field in list_request.fields.split(',') if field.strip() != '']
+        unknown_fields = [field for field in fields if field not in response_fields]
+        if len(unknown_fields) != 0:
+            raise ValueError(f"조회할 수 없는 필드입니다: {', '.join(unknown_fields)}")
+        fields = [field for field in response_fields if field in fields]
+    else:
+        fields = list(response_fields)
+
+    limit = list_request.limit
+    if limit is not None and not 1 <= limit <= server_config['list_page']['max_limit']:
+        raise ValueError(f"limit은 1 이상 {server_config['list_page']['max_limit']} 이하여야 합니다.")
+
+    try:
+        end_date_from = str_to_date(list_request.end_date_from) if list_request.end_date_from is not None else None
+        end_date_to = str_to_date(list_request.end_date_to) if list_request.end_date_to is not None else None
+    except (ValueError, IndexError):
+        raise ValueError("날짜는 YYYY-MM-DD 형식이어야 합니다.")
+
+    async with AsyncSession(engine) as session:
+        rows = (await session.execute(instance_list_query(model,
+                                                          fields=fields,
+                                                          name_column=name_column,
+                                                          user_name=list_request.user_name,
+                                                          node_name=list_request.node_name,
+                                                          end_date_from=end_date_from,
+                                                          end_date_to=end_date_to,
+                                                          name_prefix=list_request.name_prefix,
+                                                          after_id=decode_cursor(list_request.cursor)
+                                                          if list_request.cursor is not None else None,
+                                                          limit=limit))).all()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].id)
+    return [{field: getattr(row, field) for field in fields} for row in rows], next_cursor
+
+
+def too_many_requests(error: BulkheadFullError) -> ErrorResponse:
+    """
+    노드의 요청 대기열이 가득 찼을 때의 응답, Retry-After로 다시 시도할 시점(초)을 알려줍니다.
+    """
+    return ErrorResponse(status.HTTP_429_TOO_MANY_REQUESTS,
+                         str(error),
+                         headers={'Retry-After': str(error.retry_after)})
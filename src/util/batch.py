@@ -0,0 +1,68 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from model.api_response_models import BatchItemResultDTO
+from util.job_manager import JobStatus
+from util.logger import get_logger
+
+backend_logger = get_logger(name='backend', log_level='INFO', save_path="./log/backend")
+
+
+def run_batch(items: list,
+              name_of,
+              node_of,
+              prepare,
+              provision,
+              discard,
+              max_parallel: int,
+              on_progress=None) -> list[dict]:
+    """
+    일괄 대여 항목들을 노드별로 묶어 노드마다 한 번씩 prepare를 실행한 뒤 항목별 provision을 병렬로 실행합니다.
+    노드 준비가 끝나는 대로 그 노드의 항목을 시작하므로 전체 소요 시간은 가장 느린 노드의 준비와 생성 시간에 가깝습니다.
+    하나의 항목이 실패해도 나머지 항목은 계속 진행되며 결과는 항목별로 반환됩니다.
+
+    :param items: 일괄 대여 항목 목록
+    :param name_of: name_of(item) -> 항목 이름
+    :param node_of: node_of(item) -> 배치된 노드명
+    :param prepare: prepare(node_name, node_items), 노드에서 공유하는 플레이버/네트워크 준비
+    :param provision: provision(item) -> 항목 결과, 항목 생성 (실패 시 스스로 정리 후 예외를 던짐)
+    :param discard: discard(item), 노드 준비에 실패해 시작하지 못한 항목 정리 (자원 선점 해제 등)
+    :param max_parallel: 동시에 실행할 최대 작업 수
+    :param on_progress: on_progress(끝난 항목 수, 전체 항목 수)
+    :return: items 순서의 항목별 결과 (BatchItemResultDTO)
+    """
+    nodes = {}
+    for item in items:
+        nodes.setdefault(node_of(item), []).append(item)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(items))), thread_name_prefix='batch') as executor:
+        preparing = {executor.submit(contextvars.copy_context().run, prepare, node_name, node_items): node_name
+                     for node_name, node_items in nodes.items()}
+        provisioning = {}
+        for future in as_completed(preparing):
+            node_name = preparing[future]
+            try:
+                future.result()
+            except Exception as e:
+                backend_logger.error(f"[{node_name}] : 일괄 대여 노드 준비 실패 {e}")
+                for item in nodes[node_name]:
+                    discard(item)
+                    results[name_of(item)] = BatchItemResultDTO(name_of(item), JobStatus.FAILED, error=str(e))
+                continue
+            for item in nodes[node_name]:
+                provisioning[executor.submit(contextvars.copy_context().run, provision, item)] = item
+
+        done = len(results)
+        for future in as_completed(provisioning):
+            name = name_of(provisioning[future])
+            try:
+                results[name] = BatchItemResultDTO(name, JobStatus.SUCCEEDED, result=future.result())
+            except Exception as e:
+                backend_logger.error(f"[{name}] : 일괄 대여 항목 실패 {e}")
+                results[name] = BatchItemResultDTO(name, JobStatus.FAILED, error=str(e))
+            done += 1
+            if on_progress is not None:
+                on_progress(done, len(items))
+
+    return [results[name_of(item)].__dict__ for item in items]
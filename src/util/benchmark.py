@@ -0,0 +1,160 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from sqlalchemy import create_engine, insert, select, Engine
+from sqlalchemy.orm import Session
+
+from database.queries import node_usage_query, instance_list_query
+from model.db_models import Base, Node, Network, Flavor, NodeNetwork, NodeFlavor, Server, Container
+from config.config import node_config
+
+SEED_CHUNK_SIZE = 5000
+
+
+def seed(engine: Engine, servers: int, containers: int, networks: int, flavors: int, users: int):
+    """
+    벤치마크용 데이터를 삽입합니다.
+    대여 종료 일자는 오늘 기준 -7일 ~ +730일에 고르게 분포하므로 만료 대상은 전체의 약 1%입니다.
+    """
+    today = date.today()
+    node_names = [node['name'] for node in node_config['nodes']]
+    network_names = [f'bench_net{i}' for i in range(networks)]
+    flavor_names = [f'bench_flavor{i}' for i in range(flavors)]
+    rng = random.Random(0)
+
+    def end_date():
+        return today + timedelta(days=rng.randint(-7, 730))
+
+    with Session(engine) as session, session.begin():
+        session.execute(insert(Node), [{'name': node['name'],
+                                        'vcpu': node['vcpu'],
+                                        'ram': node['ram'],
+                                        'disk': node['disk'],
+                                        'auth_url': node['auth_url']} for node in node_config['nodes']])
+        session.execute(insert(Network), [{'name': name,
+                                           'cidr': f'10.{i // 256}.{i % 256}.0/24',
+                                           'is_default': False,
+                                           'is_external': False} for i, name in enumerate(network_names)])
+        session.execute(insert(Flavor), [{'name': name,
+                                          'vcpu': 1 + i % 4,
+                                          'ram': 1024 * (1 + i % 4),
+                                          'disk': 10 * (1 + i % 4),
+                                          'is_default': False} for i, name in enumerate(flavor_names)])
+        session.execute(insert(NodeNetwork), [{'node_name': node_name, 'network_name': network_name}
+                                              for network_name in network_names for node_name in node_names])
+        session.execute(insert(NodeFlavor), [{'node_name': node_name, 'flavor_name': flavor_name}
+                                             for flavor_name in flavor_names for node_name in node_names])
+
+        for start in range(0, servers, SEED_CHUNK_SIZE):
+            session.execute(insert(Server), [{'user_name': f'user{rng.randrange(users)}',
+                                              'server_name': f'bench_server{i}',
+                                              'start_date': today - timedelta(days=30),
+                                              'end_date': end_date(),
+                                              'floating_ip': f'172.16.{i // 256 % 256}.{i % 256}',
+                                              'network_name': rng.choice(network_names),
+                                              'node_name': rng.choice(node_names),
+                                              'flavor_name': rng.choice(flavor_names),
+                                              'image_name': 'ubuntu'}
+                                             for i in range(start, min(start + SEED_CHUNK_SIZE, servers))])
+        for start in range(0, containers, SEED_CHUNK_SIZE):
+            session.execute(insert(Container), [{'user_name': f'user{rng.randrange(users)}',
+                                                 'container_name': f'bench_container{i}',
+                                                 'start_date': today - timedelta(days=30),
+                                                 'end_date': end_date(),
+                                                 'image_name': 'nginx',
+                                                 'password': '',
+                                                 'ip': f'172.17.{i // 256 % 256}.{i % 256}',
+                                                 'port': '[80]',
+                                                 'cpu': 1,
+                                                 'memory': 512,
+                                                 'network_name': rng.choice(network_names),
+                                                 'node_name': rng.choice(node_names)}
+                                                for i in range(start, min(start + SEED_CHUNK_SIZE, containers))])
+
+
+def hot_queries() -> dict:
+    """
+    스케줄러, 노드 선택, 목록 조회, 네트워크/플레이버 연결에서 반복적으로 실행되는 쿼리들입니다.
+    """
+    today = date.today()
+    node_name = node_config['nodes'][0]['name']
+    return {
+        'expired_servers': select(Server).where(Server.end_date < today),
+        'expired_containers': select(Container).where(Container.end_date < today),
+        'node_usage': node_usage_query(),
+        'node_servers_page': instance_list_query(Server, fields=['server_name'], name_column=Server.server_name,
+                                                 node_name=node_name, limit=50),
+        'user_servers_page': instance_list_query(Server, fields=['server_name'], name_column=Server.server_name,
+                                                 user_name='user7', limit=50),
+        'user_containers_page': instance_list_query(Container, fields=['container_name'],
+                                                    name_column=Container.container_name,
+                                                    user_name='user7', limit=50),
+        'node_network': select(NodeNetwork).where(NodeNetwork.network_name == 'bench_net42',
+                                                  NodeNetwork.node_name == node_name),
+        'node_flavor': select(NodeFlavor).where(NodeFlavor.flavor_name == 'bench_flavor42',
+                                                NodeFlavor.node_name == node_name),
+    }
+
+
+def time_queries(engine: Engine, queries: dict, repeat: int) -> dict[str, float]:
+    """
+    :return: {'쿼리 이름': 실행 시간 중앙값(ms)}
+    """
+    timings = {}
+    with Session(engine) as session:
+        for name, query in queries.items():
+            session.execute(query).all()
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                session.execute(query).all()
+                samples.append((time.perf_counter() - start) * 1000)
+            timings[name] = statistics.median(samples)
+    return timings
+
+
+def run_benchmark(db_url: str = 'sqlite:///./benchmark.db',
+                  servers: int = 100000,
+                  containers: int = 100000,
+                  networks: int = 2000,
+                  flavors: int = 500,
+                  users: int = 300,
+                  repeat: int = 5) -> dict[str, tuple[float, float]]:
+    """
+    빈 벤치마크용 DB에 데이터를 채우고 모델에 선언된 보조 인덱스를 제거한 상태와 다시 생성한 상태에서
+    주요 쿼리의 실행 시간을 비교합니다.
+    운영 DB가 아닌 별도의 DB를 지정하세요. 기존 테이블은 모두 삭제됩니다.
+
+    :param db_url: 벤치마크에 사용할 DB URL (ex. mysql+pymysql://id:pw@ip:port/kws_bench)
+    :return: {'쿼리 이름': (인덱스 없을 때(ms), 인덱스 있을 때(ms))}
+    """
+    engine = create_engine(db_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    print(f'데이터 삽입 중 (서버 {servers}, 컨테이너 {containers})')
+    seed(engine, servers=servers, containers=containers, networks=networks, flavors=flavors, users=users)
+
+    indexes = [index for table in Base.metadata.sorted_tables for index in table.indexes]
+    print('보조 인덱스 제거 후 측정')
+    for index in indexes:
+        try:
+            index.drop(engine)
+        except Exception as e:
+            # MySQL은 외래 키가 사용 중인 인덱스를 제거할 수 없음
+            print(f'{index.name} 제거 실패: {e.__class__.__name__}')
+    queries = hot_queries()
+    before = time_queries(engine, queries, repeat)
+
+    print('보조 인덱스 생성 후 측정')
+    for index in indexes:
+        index.create(engine, checkfirst=True)
+    after = time_queries(engine, queries, repeat)
+
+    print(f"{'query':<24}{'before(ms)':>12}{'after(ms)':>12}{'speedup':>10}")
+    for name in queries:
+        print(f"{name:<24}{before[name]:>12.2f}{after[name]:>12.2f}{before[name] / max(after[name], 1e-6):>9.1f}x")
+
+    engine.dispose()
+    return {name: (before[name], after[name]) for name in queries}
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class TTLCache:
+    """
+    TTL(초)이 지나면 만료되고, maxsize를 넘으면 가장 오래 사용되지 않은 항목부터 제거되는(LRU) 캐시입니다.
+    여러 스레드에서 동시에 사용할 수 있으며 적중/미스/제거 횟수를 기록합니다.
+    get()은 값이 없을 때 None을 반환하므로 None은 저장하지 않습니다.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._loading: dict = {}
+        self._async_loading: dict = {}
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[1] <= time.monotonic():
+                if item is not None:
+                    del self._items[key]
+                self._misses += 1
+                return default
+            self._items.move_to_end(key)
+            self._hits += 1
+            return item[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + self._ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > self._maxsize:
+                self._items.popitem(last=False)
+                self._evictions += 1
+
+    def get_or_load(self, key, loader):
+        """
+        캐시에 값이 없으면 loader()로 불러와 저장합니다.
+        같은 키를 동시에 불러오는 요청들은 하나로 합쳐져(single-flight) loader는 한 번만 호출되고,
+        나머지 요청은 그 결과를 기다렸다가 함께 받습니다.
+        loader가 예외를 던지면 기다리던 요청 모두에 같은 예외가 전달되며 캐시에는 저장되지 않습니다.
+
+        :param key: 캐시 키
+        :param loader: 값을 불러올 함수
+        :return: 캐시된 값 또는 loader()의 반환값
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            future = self._loading.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._loading[key] = future
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            value = loader()
+            if value is not None:
+                self.set(key, value)
+            future.set_result(value)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+        return value
+
+    async def get_or_load_async(self, key, loader):
+        """
+        get_or_load()의 비동기 버전입니다. loader는 코루틴 함수이며,
+        같은 키를 동시에 불러오는 코루틴들은 한 번의 loader 호출 결과를 함께 기다립니다.
+        기다리던 요청이 취소되어도(연결 종료) 공유 중인 loader는 취소되지 않습니다.
+        이벤트 루프 스레드에서만 호출해야 합니다.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        task = self._async_loading.get(key)
+        if task is None:
+            async def load():
+                try:
+                    loaded = await loader()
+                    if loaded is not None:
+                        self.set(key, loaded)
+                    return loaded
+                finally:
+                    self._async_loading.pop(key, None)
+
+            task = asyncio.ensure_future(load())
+            self._async_loading[key] = task
+        return await asyncio.shield(task)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def invalidate_if(self, predicate):
+        """
+        predicate(key)가 True인 항목을 모두 제거합니다.
+        """
+        with self._lock:
+            for key in [key for key in self._items if predicate(key)]:
+                del self._items[key]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self._hits + self._misses
+            return {'size': len(self._items),
+                    'maxsize': self._maxsize,
+                    'hits': self._hits,
+                    'misses': self._misses,
+                    'evictions': self._evictions,
+                    'hit_ratio': round(self._hits / requests, 4) if requests != 0 else None}
@@ -0,0 +1,137 @@
+import base64
+import hashlib
+import hmac
+import io
+import os
+import paramiko
+
+from util.cache import TTLCache
+from util.logger import get_logger
+from util.utils import validate_ssh_key
+from config.config import server_config
+
+backend_logger = get_logger(name='backend', log_level='INFO', save_path="./log/backend")
+
+HASH_ALGORITHM = 'pbkdf2_sha256'
+
+
+def hash_password(password: str, iterations: int = None) -> str:
+    """
+    솔트를 붙인 PBKDF2-SHA256 해시
+
+    :return: pbkdf2_sha256$반복 횟수$솔트(hex)$해시(hex)
+    """
+    iterations = iterations if iterations is not None else server_config['credentials']['pbkdf2_iterations']
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+    return f"{HASH_ALGORITHM}${iterations}${salt.hex()}${digest.hex()}"
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    try:
+        algorithm, iterations, salt, digest = password_hash.split('$')
+    except ValueError:
+        return False
+    if algorithm != HASH_ALGORITHM:
+        return False
+    candidate = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), bytes.fromhex(salt), int(iterations))
+    return hmac.compare_digest(candidate.hex(), digest)
+
+
+def key_fingerprint(private_key) -> str | None:
+    """
+    개인키에 대응하는 공개키의 OpenSSH 형식 SHA256 지문 (ssh-keygen -l과 같은 값)
+
+    :param private_key: PEM 형식 개인키 문자열 또는 파일 객체
+    :return: SHA256:..., 개인키를 읽을 수 없으면 None
+    """
+    if isinstance(private_key, str):
+        private_key = io.StringIO(private_key)
+    try:
+        key = paramiko.RSAKey.from_private_key(private_key)
+    except Exception as e:
+        backend_logger.error(f"개인키를 읽을 수 없음 {e}")
+        return None
+    finally:
+        private_key.seek(0)
+    return "SHA256:" + base64.b64encode(hashlib.sha256(key.asbytes()).digest()).decode('ascii').rstrip('=')
+
+
+def credential_fields(password: str | None, private_key: str) -> dict:
+    """
+    대여 시 DB에 저장할 접속 정보 검증용 값, Server(**credential_fields(...))로 사용합니다.
+
+    :param password: 서버 비밀번호, 키페어로 대여한 경우 None
+    :param private_key: 발급한 개인키, 비밀번호로 대여한 경우 ""
+    """
+    return {'key_fingerprint': key_fingerprint(private_key) if private_key != "" else None,
+            'password_hash': hash_password(password) if password is not None else None}
+
+
+class CredentialVerifier:
+    """
+    서버 연장/반납 시 요청자가 서버의 접속 정보(개인키 또는 비밀번호)를 가지고 있는지 확인합니다.
+
+    대여 시 저장한 공개키 지문과 솔트 해시로 서버에 접속하지 않고 확인하며,
+    저장된 값이 없는 서버(이 기능 이전에 대여한 서버)만 ssh_fallback이 켜져 있을 때 실제 SSH 접속으로 확인합니다.
+    SSH 접속은 ssh_timeout(초) 안에 끝나지 않으면 실패로 처리하고, 성공한 결과는 cache_ttl(초) 동안 재사용합니다.
+    """
+    def __init__(self, ssh_fallback: bool, ssh_timeout: float, cache_ttl: float):
+        self._ssh_fallback = ssh_fallback
+        self._ssh_timeout = ssh_timeout
+        self._verified = TTLCache(maxsize=1024, ttl=cache_ttl)
+
+    def verify(self, server, host_ip: str, password: str, key_file) -> bool:
+        """
+        :param server: 대상 서버 (model.db_models.Server)
+        :param host_ip: 요청에 입력한 서버 IP
+        :param password: 요청에 입력한 비밀번호, 키 파일을 올린 경우 ""
+        :param key_file: 요청에 올린 개인키 파일 객체, 비밀번호를 입력한 경우 ""
+        """
+        verified = self.verify_local(server, host_ip, password, key_file)
+        if verified is not None:
+            return verified
+        return self._verify_ssh(server.server_name, host_ip, password, key_file)
+
+    def verify_local(self, server, host_ip: str, password: str, key_file) -> bool | None:
+        """
+        서버에 접속하지 않고 확인합니다. 요청 처리 중에 바로 호출할 수 있습니다.
+
+        :return: 확인 결과, SSH 접속으로 확인해야 하는 서버(저장된 접속 정보가 없는 서버)는 None
+        """
+        if host_ip != server.floating_ip:
+            return False
+
+        if server.key_fingerprint is not None or server.password_hash is not None:
+            if key_file != "":
+                return server.key_fingerprint is not None and key_fingerprint(key_file) == server.key_fingerprint
+            return server.password_hash is not None and verify_password(password, server.password_hash)
+
+        if not self._ssh_fallback:
+            backend_logger.info(f"[{server.server_name}] : 저장된 접속 정보가 없어 확인할 수 없음")
+            return False
+        return None
+
+    def _verify_ssh(self, server_name: str, host_ip: str, password: str, key_file) -> bool:
+        secret = key_file.read() if key_file != "" else password
+        if key_file != "":
+            key_file.seek(0)
+        # 비밀번호/개인키 원문 대신 해시를 키로 사용
+        cache_key = (server_name, host_ip, hashlib.sha256(secret.encode('utf-8')).hexdigest())
+        if self._verified.get(cache_key) is not None:
+            return True
+
+        backend_logger.info(f"[{server_name}] : SSH 접속으로 접속 정보 확인")
+        if not validate_ssh_key(host_name=host_ip,
+                                user_name=server_name,
+                                private_key=key_file,
+                                password=password,
+                                timeout=self._ssh_timeout):
+            return False
+        self._verified.set(cache_key, True)
+        return True
+
+
+credential_verifier = CredentialVerifier(ssh_fallback=server_config['credentials']['ssh_fallback'],
+                                         ssh_timeout=server_config['credentials']['ssh_timeout'],
+                                         cache_ttl=server_config['credentials']['cache_ttl'])
@@ -1,4 +1,4 @@
-from sqlalchemy import select, create_engine
+from sqlalchemy import select, create_engine, inspect, text, Engine
 from sqlalchemy.orm import Session
 
 from model.db_models import Base, Node, Network, Flavor, NodeNetwork, NodeFlavor, Server, Container
@@ -12,10 +12,60 @@ def drop_tables():
     Base.metadata.drop_all(engine)
 
 
-def create_tables():
+def create_tables(engine: Engine = None):
+    """
+    모델에 선언된 테이블 중 DB에 없는 테이블만 생성합니다. 이미 존재하는 테이블은 변경하지 않습니다.
+
+    :param engine: 대상 DB 엔진, None일 경우 db_config으로 지정된 데이터베이스
+    """
     print('테이블 생성')
-    engine = MySQLEngineFactory().get_instance()
-    Base.metadata.create_all(engine)
+    engine = engine if engine is not None else MySQLEngineFactory().get_instance()
+    Base.metadata.create_all(engine, checkfirst=True)
+
+
+def upgrade_schema(engine: Engine = None):
+    """
+    모델에 새로 선언된 테이블, 컬럼, 인덱스를 순서대로 기존 DB에 추가합니다. 기존 데이터는 변경하지 않습니다.
+    모델의 스키마를 바꾸는 변경은 배포 전에 이 함수(index.py)로 DB에 반영해야 합니다.
+
+    :param engine: 대상 DB 엔진, None일 경우 db_config으로 지정된 데이터베이스
+    """
+    create_tables(engine)
+    create_columns(engine)
+    create_indexes(engine)
+
+
+def create_indexes(engine: Engine = None):
+    """
+    모델에 선언된 인덱스 중 DB에 없는 인덱스만 생성합니다.
+    create_tables는 이미 존재하는 테이블에 인덱스를 추가하지 않으므로 기존 DB에 새 인덱스를 반영할 때 사용합니다.
+    """
+    print('인덱스 생성')
+    engine = engine if engine is not None else MySQLEngineFactory().get_instance()
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
+def create_columns(engine: Engine = None):
+    """
+    모델에 선언된 컬럼 중 DB 테이블에 없는 컬럼을 추가합니다.
+    create_tables는 이미 존재하는 테이블에 컬럼을 추가하지 않으므로 기존 DB에 새 컬럼을 반영할 때 사용합니다.
+    추가되는 컬럼은 기존 행에 값이 없으므로 nullable이어야 합니다.
+    """
+    print('컬럼 생성')
+    engine = engine if engine is not None else MySQLEngineFactory().get_instance()
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    print(f'{table.name}.{column.name} 추가')
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type} NULL'))
 
 
 def insert_default_value():
@@ -83,6 +133,10 @@ def db_migration(from_db_id: str,
         f":{to_db_port}/{to_db_name}"
     )
 
+    # 이전 버전의 DB에는 모델에 새로 추가된 컬럼이 없어 조회가 실패하므로 먼저 스키마를 갱신
+    print('기존 데이터베이스 스키마 갱신 중')
+    upgrade_schema(from_db_engine)
+
     print('목표 데이터베이스 초기화 중')
     Base.metadata.drop_all(to_db_engine)
     Base.metadata.create_all(to_db_engine)
@@ -0,0 +1,40 @@
+from contextvars import ContextVar
+
+_current_job: ContextVar[str | None] = ContextVar('current_job', default=None)
+# report_stage로 알린 단계를 받을 함수 (job_id, stage), JobManager가 등록
+_stage_sink = None
+
+
+def set_stage_sink(sink):
+    """
+    :param sink: sink(job_id, stage) 형태로 호출됩니다.
+    """
+    global _stage_sink
+    _stage_sink = sink
+
+
+def enter(job_id: str):
+    """
+    현재 컨텍스트를 job_id 작업으로 지정합니다.
+
+    :return: leave()에 넘길 토큰
+    """
+    return _current_job.set(job_id)
+
+
+def leave(token):
+    _current_job.reset(token)
+
+
+def current_job() -> str | None:
+    return _current_job.get()
+
+
+def report_stage(stage: str):
+    """
+    작업 안에서 호출된 하위 함수(ex. OpenStackController)가 현재 작업의 단계를 알립니다.
+    작업 스레드가 아닌 곳에서 호출되거나 등록된 sink가 없으면 아무것도 하지 않습니다.
+    """
+    job_id = _current_job.get()
+    if job_id is not None and _stage_sink is not None:
+        _stage_sink(job_id, stage)
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from config.config import server_config
+
+
+class JobEventBus:
+    """
+    작업의 상태/단계 변화를 메모리에 기록하고 구독자(SSE 연결)에게 전달합니다.
+
+    작업 스레드에서 publish()하면 구독자의 이벤트 루프에 call_soon_threadsafe로 전달되므로
+    구독자는 스레드를 점유하지 않고 asyncio.Queue에서 기다립니다.
+    각 이벤트에는 작업 등록 후 경과 시간과 직전 단계에 걸린 시간이 포함됩니다.
+    최근 max_jobs개 작업의 이벤트만 유지하며, 그보다 오래된 작업은 DB의 최종 상태로 대신합니다.
+    """
+    def __init__(self, max_jobs: int):
+        self._max_jobs = max_jobs
+        self._jobs: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def publish(self, job_id: str, status: str, stage: str = None, error: str = None):
+        """
+        :param stage: 진입한 단계, None일 경우 직전 단계 (작업 종료 시)
+        """
+        now = time.monotonic()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                job = {'created': now, 'last': now, 'last_stage': None, 'events': [], 'subscribers': []}
+                self._jobs[job_id] = job
+                while len(self._jobs) > self._max_jobs:
+                    self._jobs.popitem(last=False)
+
+            event = {'id': len(job['events']) + 1,
+                     'job_id': job_id,
+                     'status': status,
+                     'stage': stage if stage is not None else job['last_stage'],
+                     'error': error,
+                     'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+                     'elapsed_seconds': round(now - job['created'], 3),
+                     'previous_stage': job['last_stage'],
+                     'previous_stage_seconds': round(now - job['last'], 3) if job['last_stage'] is not None else None}
+            job['events'].append(event)
+            job['last'] = now
+            job['last_stage'] = event['stage']
+            for loop, queue in job['subscribers']:
+                try:
+                    loop.call_soon_threadsafe(queue.put_nowait, event)
+                except RuntimeError:
+                    # 구독자의 이벤트 루프가 이미 종료됨
+                    pass
+
+    def subscribe(self, job_id: str) -> tuple[list[dict], asyncio.Queue] | None:
+        """
+        이벤트 루프 안에서 호출합니다.
+
+        :return: (지금까지의 이벤트, 이후 이벤트를 받을 큐), 기록이 없는 작업이면 None
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job['subscribers'].append((loop, queue))
+            return list(job['events']), queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job['subscribers'] = [subscriber for subscriber in job['subscribers'] if subscriber[1] is not queue]
+
+
+job_events = JobEventBus(max_jobs=server_config['job']['event_history'])
@@ -0,0 +1,240 @@
+import contextvars
+import functools
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+
+from database.factories import MySQLEngineFactory
+from model.db_models import Job
+from model.api_response_models import JobResponseDTO
+from util import job_context
+from util.job_events import JobEventBus, job_events
+from util.logger import get_logger
+from util.tracing import tracer
+from config.config import server_config
+
+db_connection = MySQLEngineFactory().get_instance()
+backend_logger = get_logger(name='backend', log_level='INFO', save_path="./log/backend")
+
+# 작업 결과 중 DB에 저장하지 않고 메모리에만 두었다가 한 번만 돌려주는 값
+SECRET_FIELDS = ('private_key',)
+
+
+class JobStatus:
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    SUCCEEDED = 'SUCCEEDED'
+    FAILED = 'FAILED'
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+class JobConflictError(Exception):
+    pass
+
+
+class JobManager:
+    """
+    서버/컨테이너 대여, 연장, 반납처럼 오래 걸리는 작업을 백그라운드 워커 풀에서 실행합니다.
+    작업은 DB의 job 테이블에 기록되며 /jobs/{id}로 진행 단계와 결과를 조회할 수 있습니다.
+
+    워커 수(max_workers)와 대기 가능한 작업 수(max_pending)는 server_config의 job 항목으로 지정합니다.
+    대기열이 가득 차면 JobQueueFullError, 같은 자원에 대한 작업이 이미 진행 중이면 JobConflictError가 발생합니다.
+    상태/단계가 바뀔 때마다 events에도 기록되어 /jobs/{id}/events로 실시간으로 받아볼 수 있습니다.
+
+    결과의 개인키(SECRET_FIELDS)는 DB에 저장하지 않고 메모리에 secret_ttl(초) 동안만 두며, 처음 조회할 때 한 번만 돌려줍니다.
+    끝난 작업은 retention_days일이 지나면 purge()로 삭제합니다.
+    """
+    def __init__(self, max_workers: int, max_pending: int, events: JobEventBus, secret_ttl: float, retention_days: int):
+        self._events = events
+        self._secret_ttl = secret_ttl
+        self._retention_days = retention_days
+        # 작업 ID: (만료 시각, 개인키가 포함된 결과)
+        self._secrets: dict[str, tuple[float, object]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._active_targets = set()
+        self._lock = threading.Lock()
+
+    def submit(self, job_type: str, resource_type: str, target_name: str, task, dispatch=None, **kwargs) -> str:
+        """
+        작업을 등록하고 워커 풀에 제출합니다.
+        task는 task(job_id=job_id, **kwargs) 형태로 호출되며 반환값이 작업 결과로 저장됩니다.
+
+        :param job_type: 작업 종류 (ex. server_rental)
+        :param resource_type: 작업 대상 자원 종류 (ex. server), 같은 자원에 대한 동시 작업을 막는 데 사용
+        :param target_name: 작업 대상 자원 이름
+        :param task: 실행할 함수
+        :param dispatch: dispatch(start) 형태로 호출되며 start()를 호출하는 시점에 작업이 워커 풀에 들어갑니다.
+                         None일 경우 바로 제출 (ex. Admission.dispatch로 노드 슬롯을 받을 때까지 미루기)
+        :return: 작업 ID
+        """
+        target = (resource_type, target_name)
+        with self._lock:
+            if target in self._active_targets:
+                raise JobConflictError(f"{target_name}에 대한 작업이 이미 진행 중입니다.")
+            if not self._slots.acquire(blocking=False):
+                raise JobQueueFullError("작업 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.")
+            self._active_targets.add(target)
+
+        job_id = str(uuid.uuid4())
+        try:
+            now = datetime.now()
+            with Session(db_connection) as session, session.begin():
+                session.add(Job(id=job_id,
+                                job_type=job_type,
+                                target_name=target_name,
+                                status=JobStatus.PENDING,
+                                stage='queued',
+                                created_at=now,
+                                updated_at=now))
+            self._events.publish(job_id, JobStatus.PENDING, 'queued')
+            # 요청의 트레이스가 작업 워커에서도 이어지도록 현재 컨텍스트를 복사해 실행
+            start = functools.partial(self._executor.submit,
+                                      contextvars.copy_context().run, self._run, job_id, target, task, kwargs)
+            if dispatch is None:
+                start()
+            else:
+                dispatch(start)
+        except Exception:
+            self._finish(target)
+            raise
+
+        backend_logger.info(f"[{job_id}] : {job_type} 작업 등록")
+        return job_id
+
+    def set_stage(self, job_id: str, stage: str):
+        backend_logger.info(f"[{job_id}] : {stage} 단계 진입")
+        self._update(job_id, stage=stage)
+        self._events.publish(job_id, JobStatus.RUNNING, stage)
+
+    def get(self, job_id: str, reveal_secrets: bool = False) -> JobResponseDTO | None:
+        """
+        :param reveal_secrets: True일 경우 메모리에 남아 있는 개인키를 결과에 포함해 돌려주고 메모리에서 지웁니다.
+                               이후 조회에서는 개인키가 null로 보입니다.
+        """
+        with Session(db_connection) as session:
+            job = session.scalars(select(Job).where(Job.id == job_id)).one_or_none()
+            if job is None:
+                return None
+
+            result = json.loads(job.result) if job.result is not None else None
+            if reveal_secrets and job.status == JobStatus.SUCCEEDED:
+                with self._lock:
+                    expires, secret_result = self._secrets.pop(job_id, (0, None))
+                if expires > time.monotonic():
+                    result = json.loads(json.dumps(secret_result, default=str))
+
+            return JobResponseDTO(job_id=job.id,
+                                  job_type=job.job_type,
+                                  target_name=job.target_name,
+                                  status=job.status,
+                                  stage=job.stage,
+                                  result=result,
+                                  error=job.error,
+                                  created_at=job.created_at,
+                                  updated_at=job.updated_at)
+
+    def recover(self):
+        """
+        서버가 재시작되면 이전 프로세스에서 실행 중이던 작업은 더 이상 진행되지 않으므로 실패로 기록합니다.
+        """
+        with Session(db_connection) as session, session.begin():
+            jobs = session.scalars(select(Job).where(Job.status.in_([JobStatus.PENDING, JobStatus.RUNNING]))).all()
+            for job in jobs:
+                job.status = JobStatus.FAILED
+                job.error = "서버 재시작으로 작업이 중단되었습니다."
+                job.updated_at = datetime.now()
+        if len(jobs) != 0:
+            backend_logger.info(f"중단된 작업 {len(jobs)}건 실패 처리")
+
+        # 개인키를 결과에 저장하던 이전 버전의 작업 기록 정리
+        with Session(db_connection) as session, session.begin():
+            jobs = session.scalars(select(Job).where(Job.result.contains('"private_key"'))).all()
+            for job in jobs:
+                job.result = json.dumps(_redact(json.loads(job.result)), default=str)
+        if len(jobs) != 0:
+            backend_logger.info(f"작업 결과 {len(jobs)}건에서 개인키 삭제")
+
+    def purge(self):
+        """
+        만료된 개인키를 메모리에서 지우고, 끝난 지 retention_days일이 지난 작업 기록을 삭제합니다.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for job_id in [job_id for job_id, (expires, _) in self._secrets.items() if expires <= now]:
+                del self._secrets[job_id]
+
+        cutoff = datetime.now() - timedelta(days=self._retention_days)
+        with Session(db_connection) as session, session.begin():
+            deleted = session.execute(delete(Job).where(Job.status.in_([JobStatus.SUCCEEDED, JobStatus.FAILED]),
+                                                        Job.updated_at < cutoff)).rowcount
+        if deleted != 0:
+            backend_logger.info(f"보관 기간이 지난 작업 {deleted}건 삭제")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job_id: str, target: tuple, task, kwargs: dict):
+        token = job_context.enter(job_id)
+        try:
+            self._update(job_id, status=JobStatus.RUNNING, stage='started')
+            self._events.publish(job_id, JobStatus.RUNNING, 'started')
+            # 작업 ID는 개인키 조회에 쓰이므로 span에 기록하지 않음
+            with tracer.span('job', resource_type=target[0]):
+                result = task(job_id=job_id, **kwargs)
+            redacted = _redact(result)
+            if redacted != result:
+                with self._lock:
+                    self._secrets[job_id] = (time.monotonic() + self._secret_ttl, result)
+            self._update(job_id,
+                         status=JobStatus.SUCCEEDED,
+                         stage='done',
+                         result=json.dumps(redacted, default=str) if redacted is not None else None)
+            self._events.publish(job_id, JobStatus.SUCCEEDED, 'done')
+        except Exception as e:
+            backend_logger.error(f"[{job_id}] : {e}")
+            self._update(job_id, status=JobStatus.FAILED, error=str(e))
+            self._events.publish(job_id, JobStatus.FAILED, error=str(e))
+        finally:
+            job_context.leave(token)
+            self._finish(target)
+
+    def _finish(self, target: tuple):
+        with self._lock:
+            self._active_targets.discard(target)
+        self._slots.release()
+
+    def _update(self, job_id: str, **values):
+        with Session(db_connection) as session, session.begin():
+            job = session.scalars(select(Job).where(Job.id == job_id)).one()
+            for key, value in values.items():
+                setattr(job, key, value)
+            job.updated_at = datetime.now()
+
+
+def _redact(value):
+    """
+    결과(일괄 대여의 항목별 결과 포함)에서 비어 있지 않은 SECRET_FIELDS 값을 None으로 바꾼 사본
+    """
+    if isinstance(value, dict):
+        return {key: None if key in SECRET_FIELDS and item else _redact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    return value
+
+
+job_manager = JobManager(max_workers=server_config['job']['max_workers'],
+                         max_pending=server_config['job']['max_pending'],
+                         events=job_events,
+                         secret_ttl=server_config['job']['secret_ttl'],
+                         retention_days=server_config['job']['retention_days'])
+# 하위 함수가 job_context.report_stage로 알린 단계를 작업 단계로 기록
+job_context.set_stage_sink(job_manager.set_stage)
@@ -1,27 +1,138 @@
+import atexit
+import json
 import logging
 import logging.handlers
 import os
+import queue
+import random
+import threading
+from datetime import datetime
+
+from util.tracing import current_request_id
+from config.config import server_config
+
+log_config = server_config['logging']
+
+_queue = queue.Queue(maxsize=log_config['queue_size'])
+# 로거 이름별 출력 핸들러, 백그라운드 스레드(QueueListener)에서만 사용
+_handlers: dict[str, list[logging.Handler]] = {}
+_lock = threading.Lock()
+_listener = None
+_stream_handler = None
 
 
 def get_logger(name: str = 'log',
                log_level: any = logging.INFO,
                save_path: str = None):
+    """
+    로그는 호출한 스레드에서 큐에 넣기만 하고, 콘솔/파일 출력은 백그라운드 스레드 하나가 처리합니다.
+    같은 이름으로 여러 번 호출하면 처음 호출할 때의 save_path로 파일 출력이 설정됩니다.
+
+    :param name: 로거 이름, save_path 아래의 로그 파일 이름
+    :param log_level: 로그 레벨, server_config의 logging.level이 지정되어 있으면 그 값을 사용
+    :param save_path: 로그 파일을 저장할 디렉토리, None일 경우 콘솔에만 출력
+    """
     logger = logging.getLogger(name)
-    logger.setLevel(log_level)
+    logger.setLevel(log_config['level'] if log_config['level'] is not None else log_level)
 
-    formatter = logging.Formatter('%(asctime)s | %(name)s | %(levelname)s: %(message)s')
+    with _lock:
+        if name not in _handlers:
+            handlers = [_get_stream_handler()]
+            if save_path is not None:
+                _init_path(save_path)
+                handlers.append(_get_file_handler(save_path, name, _get_formatter()))
+            _handlers[name] = handlers
+            logger.addHandler(_queue_handler)
+            _start_listener()
 
-    stream_handler = _get_stream_handler(formatter)
-    if len(logger.handlers) == 0:
-        logger.addHandler(stream_handler)
+    return logger
 
-    if save_path is not None:
-        _init_path(save_path)
-        file_handler = _get_file_handler(save_path, name, formatter)
-        if len(logger.handlers) == 0:
-            logger.addHandler(file_handler)
 
-    return logger
+def logging_stats() -> dict:
+    """
+    :return: {'queued': 출력 대기 중인 레코드 수, 'dropped': 큐가 가득 차 버린 레코드 수}
+    """
+    return {'queued': _queue.qsize(), 'dropped': _queue_handler.dropped}
+
+
+def shutdown_logging():
+    """
+    큐에 남은 로그를 모두 출력하고 백그라운드 스레드를 종료합니다.
+    """
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    큐가 가득 차면 로그를 호출한 스레드를 멈추지 않고 레코드를 버립니다.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord):
+        # 요청 ID는 로그를 호출한 스레드의 컨텍스트에서만 알 수 있으므로 큐에 넣기 전에 기록
+        record.request_id = current_request_id()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class _DebugSampler(logging.Filter):
+    """
+    DEBUG 레코드는 rate 비율만 남깁니다. INFO 이상은 모두 남깁니다.
+    """
+    def __init__(self, rate: float):
+        super().__init__()
+        self._rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or random.random() < self._rate
+
+
+class _Dispatcher(logging.Handler):
+    """
+    큐에서 꺼낸 레코드를 로거 이름별 출력 핸들러로 전달합니다.
+    """
+    def emit(self, record: logging.LogRecord):
+        for handler in _handlers.get(record.name, ()):
+            handler.handle(record)
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps({'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+                           'logger': record.name,
+                           'level': record.levelname,
+                           'message': record.getMessage(),
+                           'module': record.module,
+                           'request_id': getattr(record, 'request_id', None),
+                           'thread': record.threadName}, ensure_ascii=False)
+
+
+_queue_handler = _DroppingQueueHandler(_queue)
+_queue_handler.addFilter(_DebugSampler(log_config['debug_sample_rate']))
+
+
+def _start_listener():
+    # _lock을 잡은 상태에서 호출
+    global _listener
+    if _listener is None:
+        _listener = logging.handlers.QueueListener(_queue, _Dispatcher())
+        _listener.start()
+
+
+def _get_formatter():
+    if log_config['json']:
+        return _JsonFormatter()
+    return logging.Formatter('%(asctime)s | %(name)s | %(levelname)s: %(message)s')
 
 
 def _get_file_handler(path: str, name: str, formatter):
@@ -34,13 +145,19 @@ def _get_file_handler(path: str, name: str, formatter):
     return handler
 
 
-def _get_stream_handler(formatter):
-    handler = logging.StreamHandler()
-    handler.setFormatter(formatter)
+def _get_stream_handler():
+    # 모든 로거가 콘솔 핸들러 하나를 공유
+    global _stream_handler
+    if _stream_handler is None:
+        _stream_handler = logging.StreamHandler()
+        _stream_handler.setFormatter(_get_formatter())
 
-    return handler
+    return _stream_handler
 
 
 def _init_path(path: str):
     if not os.path.exists(path):
         os.makedirs(path)
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,214 @@
+import functools
+import inspect
+import math
+import threading
+import time
+from bisect import bisect_left
+
+from util.tracing import tracer
+
+# 초 단위 기본 버킷, API 응답처럼 짧은 작업용
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# 서버 생성/삭제 대기처럼 수 분까지 걸리는 작업용
+LONG_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def _samples(self) -> list[tuple[str, tuple, float]]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            return [('', key, value) for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    type = 'gauge'
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def _samples(self):
+        with self._lock:
+            return [('', key, value) for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def _samples(self):
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        samples = []
+        for key, (counts, total) in values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append(('_bucket', key + (_format_value(bound),), cumulative))
+            samples.append(('_sum', key, total))
+            samples.append(('_count', key, cumulative))
+        return samples
+
+
+class _Callback(_Metric):
+    """
+    노출할 때마다 func()를 호출해 값을 읽는 지표입니다. func는 {라벨 값 튜플: 값}을 반환합니다.
+    """
+    def __init__(self, name: str, help: str, type: str, labels: tuple, func):
+        super().__init__(name, help, labels)
+        self.type = type
+        self._func = func
+
+    def _samples(self):
+        return [('', key, value) for key, value in self._func().items()]
+
+
+class MetricsRegistry:
+    """
+    Prometheus 텍스트 형식(0.0.4)으로 노출할 지표들을 모아 둡니다.
+    """
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: tuple = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def callback(self, name: str, help: str, type: str, labels: tuple, func):
+        """
+        다른 모듈이 이미 집계하고 있는 값(커넥션 풀 통계 등)을 노출할 때 사용합니다.
+        """
+        return self._register(_Callback(name, help, type, labels, func))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            try:
+                samples = metric._samples()
+            except Exception:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            labels = metric.labels + (('le',) if metric.type == 'histogram' else ())
+            for suffix, key, value in samples:
+                names = labels if suffix == '_bucket' else metric.labels
+                label_text = ','.join(f'{label}="{_escape(value)}"' for label, value in zip(names, key))
+                label_text = '{' + label_text + '}' if label_text != '' else ''
+                lines.append(f"{metric.name}{suffix}{label_text} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, metric: _Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"이미 등록된 지표입니다: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+metrics = MetricsRegistry()
+
+openstack_call_seconds = metrics.histogram('kws_openstack_call_duration_seconds',
+                                           'OpenStack/Zun 호출 소요 시간',
+                                           ('node', 'method'),
+                                           LONG_BUCKETS)
+openstack_call_errors = metrics.counter('kws_openstack_call_errors_total',
+                                        'OpenStack/Zun 호출 실패 횟수',
+                                        ('node', 'method'))
+
+
+def metered(func):
+    """
+    node_name 인자를 받는 메서드의 소요 시간과 실패 횟수를 노드/메서드별로 기록합니다.
+    요청 처리 중에 호출되면 요청의 트레이스에도 openstack.<메서드명> span으로 기록합니다.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        node_name = signature.bind(*args, **kwargs).arguments['node_name']
+        start = time.perf_counter()
+        try:
+            with tracer.span(f"openstack.{func.__name__}", node=node_name):
+                return func(*args, **kwargs)
+        except Exception:
+            openstack_call_errors.inc(node=node_name, method=func.__name__)
+            raise
+        finally:
+            openstack_call_seconds.observe(time.perf_counter() - start, node=node_name, method=func.__name__)
+    wrapper.__metered__ = True
+    return wrapper
+
+
+def metered_node_calls(cls):
+    """
+    클래스의 node_name 인자를 받는 모든 공개 메서드에 metered를 적용합니다.
+    다른 데코레이터(ex. 노드 슬롯 대기) 안쪽을 측정하려면 그 메서드에 직접 @metered를 붙이면 건너뜁니다.
+    """
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith('_') or not inspect.isfunction(attribute) or getattr(attribute, '__metered__', False):
+            continue
+        if 'node_name' in inspect.signature(attribute).parameters:
+            setattr(cls, name, metered(attribute))
+    return cls
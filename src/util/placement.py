@@ -0,0 +1,154 @@
+import threading
+from bisect import bisect_left
+
+from model.api_response_models import PlacementCandidateDTO
+from openStack.bulkhead import node_bulkhead
+from openStack.connection import connection_registry
+from util.resource_ledger import ResourceLedger, Reservation, RESOURCES, resource_ledger
+from config.config import openstack_config
+
+
+class _CapacityIndex:
+    """
+    남은 vcpu 순으로 정렬된 노드 목록입니다.
+    요청 vcpu 이상 남은 노드부터 이분 탐색으로 찾아 나머지 차원(ram, disk)만 검사합니다.
+    """
+    def __init__(self, version: int, nodes: list[dict]):
+        self.version = version
+        self._nodes = sorted(nodes, key=lambda node: node['free']['vcpu'])
+        self._keys = [node['free']['vcpu'] for node in self._nodes]
+
+    def fitting(self, vcpu: int, ram: int, disk: int) -> list[dict]:
+        start = bisect_left(self._keys, vcpu)
+        return [node for node in self._nodes[start:]
+                if node['free']['ram'] >= ram and node['free']['disk'] >= disk]
+
+
+class PlacementEngine:
+    """
+    서버/컨테이너를 배치할 노드를 선택합니다.
+    자원이 부족한 노드와 is_healthy가 False인(연결에 실패한) 노드는 후보에서 제외됩니다.
+    is_saturated가 True인(요청 대기열이 가득 찬) 노드는 전략과 관계없이 다른 후보들보다 뒤에 놓입니다.
+
+    전략
+    first_fit: node_config 순서상 처음으로 자원이 충분한 노드
+    best_fit: 배치 후 남는 자원 비율(vcpu, ram, disk 평균)이 가장 작은 노드 (빈 패킹)
+    worst_fit: 배치 후 남는 자원 비율이 가장 큰 노드 (분산 배치)
+    anti_affinity: 같은 사용자의 서버가 가장 적은 노드, 같으면 worst_fit 순서
+
+    기본 전략은 openstack_config의 placement.strategy로 지정합니다.
+    """
+    STRATEGIES = ('first_fit', 'best_fit', 'worst_fit', 'anti_affinity')
+
+    def __init__(self, ledger: ResourceLedger, default_strategy: str, is_healthy=None, is_saturated=None):
+        if default_strategy not in self.STRATEGIES:
+            raise ValueError(f"지원하지 않는 배치 전략입니다: {default_strategy}")
+        self._ledger = ledger
+        self._default_strategy = default_strategy
+        self._is_healthy = is_healthy if is_healthy is not None else (lambda node_name: True)
+        self._is_saturated = is_saturated if is_saturated is not None else (lambda node_name: False)
+        self._index = None
+        self._index_lock = threading.Lock()
+        self._min_flavor = {resource: min(flavor[resource] for flavor in openstack_config['flavors'])
+                            for resource in RESOURCES}
+
+    def rank(self,
+             vcpu: int,
+             ram: int,
+             disk: int,
+             user_name: str = None,
+             strategy: str = None) -> list[PlacementCandidateDTO]:
+        """
+        자원이 충분한 노드들을 전략에 따라 점수를 매겨 높은 순으로 반환합니다.
+
+        :param vcpu: 요청 vcpu 수
+        :param ram: 요청 RAM 용량(MB)
+        :param disk: 요청 디스크 용량(GB)
+        :param user_name: 요청 사용자 (anti_affinity에서 사용)
+        :param strategy: 배치 전략, None일 경우 기본 전략
+        :return: 배치 후보 목록
+        """
+        strategy = strategy if strategy is not None else self._default_strategy
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"지원하지 않는 배치 전략입니다: {strategy}")
+
+        demand = {'vcpu': vcpu, 'ram': ram, 'disk': disk}
+        candidates = []
+        for node in self._get_index().fitting(vcpu, ram, disk):
+            if not self._is_healthy(node['name']):
+                continue
+            after = {resource: node['free'][resource] - demand[resource] for resource in RESOURCES}
+            leftover = sum(after[resource] / node['limit'][resource] for resource in RESOURCES) / len(RESOURCES)
+            user_count = node['users'].get(user_name, 0) if user_name is not None else 0
+
+            # 점수가 같으면 node_config 순서가 앞선 노드 우선
+            if strategy == 'first_fit':
+                key = (-node['order'],)
+            elif strategy == 'best_fit':
+                key = (-leftover, -node['order'])
+            elif strategy == 'worst_fit':
+                key = (leftover, -node['order'])
+            else:
+                key = (-user_count, leftover, -node['order'])
+
+            # 대기열이 가득 찬 노드는 429로 거절되므로 여유 있는 노드를 먼저 고름
+            key = (not self._is_saturated(node['name']),) + key
+            candidates.append((key, PlacementCandidateDTO(name=node['name'],
+                                                          leftover_ratio=round(leftover, 4),
+                                                          remaining=after,
+                                                          stranded=self._stranded(after),
+                                                          user_servers=user_count)))
+
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        return [candidate for _, candidate in candidates]
+
+    def select(self, vcpu: int, ram: int, disk: int, user_name: str = None, strategy: str = None) -> str | None:
+        candidates = self.rank(vcpu, ram, disk, user_name=user_name, strategy=strategy)
+        return candidates[0].name if len(candidates) != 0 else None
+
+    def reserve(self,
+                vcpu: float,
+                ram: int,
+                disk: int,
+                servers: int = 0,
+                containers: int = 0,
+                user_name: str = None,
+                strategy: str = None) -> Reservation | None:
+        """
+        전략에 따라 노드를 고르고 그 노드의 자원을 선점합니다.
+        다른 요청이 먼저 선점해 자원이 부족해진 후보는 건너뛰고 다음 후보에 선점을 시도합니다.
+
+        :return: 선점 정보, 자원이 충분한 노드가 없으면 None
+        """
+        for candidate in self.rank(vcpu, ram, disk, user_name=user_name, strategy=strategy):
+            reservation = self._ledger.reserve(node_name=candidate.name,
+                                               vcpu=vcpu,
+                                               ram=ram,
+                                               disk=disk,
+                                               servers=servers,
+                                               containers=containers,
+                                               user_name=user_name)
+            if reservation is not None:
+                return reservation
+        return None
+
+    def _get_index(self) -> _CapacityIndex:
+        with self._index_lock:
+            if self._index is None or self._index.version != self._ledger.version:
+                version, nodes = self._ledger.snapshot()
+                self._index = _CapacityIndex(version, nodes)
+            return self._index
+
+    def _stranded(self, after: dict) -> dict:
+        """
+        배치 후 가장 작은 플레이버도 들어갈 수 없는 노드라면 남은 자원은 모두 쓸 수 없는(stranded) 자원입니다.
+        """
+        if all(after[resource] >= self._min_flavor[resource] for resource in RESOURCES):
+            return {resource: 0 for resource in RESOURCES}
+        return dict(after)
+
+
+placement_engine = PlacementEngine(ledger=resource_ledger,
+                                   default_strategy=openstack_config['placement']['strategy'],
+                                   is_healthy=connection_registry.is_healthy,
+                                   is_saturated=node_bulkhead.is_saturated)
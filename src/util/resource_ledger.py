@@ -0,0 +1,363 @@
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from sqlalchemy.orm import Session
+
+from database.factories import MySQLEngineFactory
+from database.queries import node_usage_query, node_user_count_query, node_container_usage_query
+from util.logger import get_logger
+from config.config import node_config, openstack_config
+
+db_connection = MySQLEngineFactory().get_instance()
+backend_logger = get_logger(name='backend', log_level='INFO', save_path="./log/backend")
+
+RESOURCES = ('vcpu', 'ram', 'disk')
+
+
+class Reservation:
+    """
+    배치 시점에 노드의 자원을 미리 잡아 둔 기록입니다.
+    claim()으로 감싼 DB 커밋이 성공하면 사용량으로 전환되고, 실패하면 release()로 해제합니다.
+    작업이 시작될 때 refresh()로 만료 시각을 늘립니다.
+    """
+    def __init__(self,
+                 node_name: str,
+                 vcpu: float,
+                 ram: int,
+                 disk: int,
+                 servers: int,
+                 containers: int,
+                 user_name: str | None,
+                 ttl: float):
+        self.id = str(uuid.uuid4())
+        self.node_name = node_name
+        self.vcpu = vcpu
+        self.ram = ram
+        self.disk = disk
+        self.servers = servers
+        self.containers = containers
+        self.user_name = user_name
+        self.expires_at = time.monotonic() + ttl
+        # 전환/해제 전에 만료되어 장부에서 빠졌으면 True
+        self.expired = False
+
+
+class ResourceLedger:
+    """
+    노드별 자원 한도와 사용량(vcpu, ram(MB), disk(GB), 서버 수, 컨테이너 수), 사용자별 인스턴스 수를 메모리에 유지합니다.
+    컨테이너는 선언된 cpu와 memory가 각각 vcpu, ram 사용량에 포함됩니다.
+
+    처음 사용할 때 DB에서 한 번 불러오며, 이후에는 대여/반납/만료 시 change()로 감싼 DB 커밋이
+    성공할 때마다 사용량을 갱신합니다. 커밋에 실패(롤백)하면 사용량은 바뀌지 않습니다.
+    reconcile()은 DB 기준으로 사용량을 다시 불러오며, 진행 중인 커밋이 끝날 때까지 기다렸다가
+    실행되므로 커밋 직후의 갱신이 중복 반영되지 않습니다.
+
+    배치할 때 reserve()로 노드의 자원을 선점하면 선점된 자원은 남은 자원에서 제외되므로,
+    동시에 들어온 대여 요청들이 같은 남은 자원을 보고 한 노드에 몰리지 않습니다.
+    선점은 DB에 기록되지 않으므로 reconcile()의 영향을 받지 않으며,
+    reservation_ttl(초) 안에 전환/해제되지 않은 선점은 만료되어 자동으로 해제됩니다.
+    대여 작업은 노드 슬롯을 기다리는 동안 선점이 만료되지 않도록 실제로 시작될 때 refresh()를 호출합니다.
+    """
+    def __init__(self, reservation_ttl: float):
+        self._lock = threading.Lock()
+        self._commit_gate = threading.Condition()
+        self._inflight_commits = 0
+        self._reconciling = False
+        self._limits: dict[str, dict] = {}
+        self._usage: dict[str, dict] = {}
+        self._user_counts: dict[str, dict[str, int]] = {}
+        self._reservations: dict[str, Reservation] = {}
+        self._reservation_ttl = reservation_ttl
+        self._version = 0
+        self._loaded = False
+
+    def load(self):
+        with self._commit_gate:
+            while self._inflight_commits > 0:
+                self._commit_gate.wait()
+            self._reconciling = True
+
+        try:
+            with Session(db_connection) as session:
+                rows = session.execute(node_usage_query()).all()
+                user_rows = session.execute(node_user_count_query()).all()
+                container_rows = session.execute(node_container_usage_query()).all()
+
+            limits = {}
+            usage = {}
+            for row in rows:
+                limits[row.name] = {'vcpu': row.vcpu, 'ram': row.ram, 'disk': row.disk}
+                usage[row.name] = {'count': row.count,
+                                   'containers': 0,
+                                   'vcpu': row.using_vcpu,
+                                   'ram': row.using_ram,
+                                   'disk': row.using_disk}
+            for row in container_rows:
+                if row.node_name in usage:
+                    usage[row.node_name]['containers'] = row.count
+                    usage[row.node_name]['vcpu'] += row.using_cpu
+                    usage[row.node_name]['ram'] += row.using_memory
+            user_counts = {}
+            for row in user_rows:
+                user_counts.setdefault(row.node_name, {})
+                user_counts[row.node_name][row.user_name] = user_counts[row.node_name].get(row.user_name, 0) + row.count
+
+            with self._lock:
+                drift = {name: usage[name] for name in usage
+                         if self._loaded and self._usage.get(name) != usage[name]}
+                self._limits = limits
+                self._usage = usage
+                self._user_counts = user_counts
+                self._version += 1
+                self._loaded = True
+        finally:
+            with self._commit_gate:
+                self._reconciling = False
+                self._commit_gate.notify_all()
+
+        return drift
+
+    def reconcile(self):
+        backend_logger.info("자원 장부 DB 대조 시작")
+        drift = self.load()
+        for node_name, usage in drift.items():
+            backend_logger.info(f"[{node_name}] : 자원 장부 보정 {usage}")
+
+    @contextmanager
+    def change(self,
+               node_name: str,
+               vcpu: float,
+               ram: int,
+               disk: int,
+               servers: int = 0,
+               containers: int = 0,
+               user_name: str = None):
+        """
+        DB 커밋을 감싸 커밋이 성공했을 때만 노드의 사용량에 변화량을 반영합니다.
+        반납/만료처럼 자원을 돌려줄 때는 음수 값을 전달합니다.
+
+        with resource_ledger.change(node_name, vcpu, ram, disk, servers=1):
+            session.commit()
+        """
+        self._ensure_loaded()
+        with self._commit_gate:
+            while self._reconciling:
+                self._commit_gate.wait()
+            self._inflight_commits += 1
+
+        try:
+            yield
+            with self._lock:
+                usage = self._usage.setdefault(node_name, {'count': 0, 'containers': 0, 'vcpu': 0, 'ram': 0, 'disk': 0})
+                usage['count'] += servers
+                usage['containers'] += containers
+                usage['vcpu'] += vcpu
+                usage['ram'] += ram
+                usage['disk'] += disk
+                if user_name is not None:
+                    user_counts = self._user_counts.setdefault(node_name, {})
+                    user_counts[user_name] = user_counts.get(user_name, 0) + servers + containers
+                self._version += 1
+        finally:
+            with self._commit_gate:
+                self._inflight_commits -= 1
+                self._commit_gate.notify_all()
+
+    def reserve(self,
+                node_name: str,
+                vcpu: float,
+                ram: int,
+                disk: int,
+                servers: int = 0,
+                containers: int = 0,
+                user_name: str = None,
+                ttl: float = None) -> Reservation | None:
+        """
+        노드에 남은 자원이 충분하면 요청한 만큼 선점합니다.
+        남은 자원 확인과 선점이 하나의 잠금 안에서 이루어지므로 동시에 선점해도 노드의 한도를 넘지 않습니다.
+
+        :param node_name: 노드 이름
+        :param vcpu: 선점할 vcpu
+        :param ram: 선점할 RAM 용량(MB)
+        :param disk: 선점할 디스크 용량(GB)
+        :param servers: 전환 시 늘어날 서버 수
+        :param containers: 전환 시 늘어날 컨테이너 수
+        :param user_name: 요청 사용자
+        :param ttl: 선점 유지 시간(초), None일 경우 reservation_ttl (만료되지 않게 하려면 math.inf)
+        :return: 선점 정보, 자원이 부족하면 None
+        """
+        self._ensure_loaded()
+        demand = {'vcpu': vcpu, 'ram': ram, 'disk': disk}
+        with self._lock:
+            self._expire_reservations()
+            limit = self._limits.get(node_name)
+            if limit is None:
+                return None
+            free = self._free(node_name, limit)
+            if any(free[resource] < demand[resource] for resource in RESOURCES):
+                return None
+
+            reservation = Reservation(node_name=node_name,
+                                      vcpu=vcpu,
+                                      ram=ram,
+                                      disk=disk,
+                                      servers=servers,
+                                      containers=containers,
+                                      user_name=user_name,
+                                      ttl=ttl if ttl is not None else self._reservation_ttl)
+            self._reservations[reservation.id] = reservation
+            self._version += 1
+        return reservation
+
+    def refresh(self, reservation: Reservation, ttl: float = None) -> bool:
+        """
+        선점의 만료 시각을 지금부터 ttl(초) 뒤로 늘립니다. 더 늦게 만료되는 선점(ex. 예비 서버)은 그대로 둡니다.
+        이미 만료된 선점이면 남은 자원을 다시 확인해 자원이 충분할 때만 다시 선점합니다.
+
+        :param ttl: 선점 유지 시간(초), None일 경우 reservation_ttl
+        :return: 선점이 유지되면 True, 만료된 뒤 자원이 부족해 다시 선점하지 못하면 False
+        """
+        self._ensure_loaded()
+        with self._lock:
+            self._expire_reservations()
+            return self._renew(reservation, ttl if ttl is not None else self._reservation_ttl)
+
+    @contextmanager
+    def claim(self, reservation: Reservation):
+        """
+        DB 커밋을 감싸 커밋이 성공하면 선점한 자원을 사용량으로 전환합니다.
+        커밋이 실패하면 선점은 그대로 남으므로 롤백 후 release()로 해제해야 합니다.
+
+        선점이 이미 만료되었으면 남은 자원을 다시 확인해 다시 선점한 뒤 전환합니다.
+        자원이 부족해 다시 선점하지 못해도 인스턴스는 이미 생성되었으므로 전환하되, 노드 한도 초과를 오류로 기록합니다.
+
+        with resource_ledger.claim(reservation):
+            session.commit()
+        """
+        self._ensure_loaded()
+        with self._lock:
+            self._expire_reservations()
+            if not self._renew(reservation, self._reservation_ttl):
+                backend_logger.error(f"[{reservation.node_name}] : 만료된 자원 선점 {reservation.id}을 자원이 부족한 상태로 전환, "
+                                     f"노드 한도 초과 (vcpu={reservation.vcpu}, ram={reservation.ram}, disk={reservation.disk})")
+        with self.change(node_name=reservation.node_name,
+                         vcpu=reservation.vcpu,
+                         ram=reservation.ram,
+                         disk=reservation.disk,
+                         servers=reservation.servers,
+                         containers=reservation.containers,
+                         user_name=reservation.user_name):
+            yield
+        self.release(reservation)
+
+    def release(self, reservation: Reservation):
+        """
+        선점한 자원을 해제합니다. 이미 전환/해제/만료된 선점이면 아무것도 하지 않습니다.
+        """
+        with self._lock:
+            if self._reservations.pop(reservation.id, None) is not None:
+                self._version += 1
+
+    def remaining(self) -> list[dict]:
+        """
+        node_config에 등록된 노드 순서대로 남은 자원을 반환합니다.
+
+        :return: [{'name': 노드명, 'vcpu': 남은 vcpu, 'ram': 남은 RAM(MB), 'disk': 남은 디스크(GB)}]
+        """
+        self._ensure_loaded()
+        remaining_resources_by_node = []
+        with self._lock:
+            self._expire_reservations()
+            for node in node_config['nodes']:
+                limit = self._limits.get(node['name'])
+                if limit is None:
+                    continue
+                remaining = {'name': node['name']}
+                remaining.update(self._free(node['name'], limit))
+                remaining_resources_by_node.append(remaining)
+
+        return remaining_resources_by_node
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def snapshot(self) -> tuple[int, list[dict]]:
+        """
+        배치 계산을 위한 노드별 자원 상태를 node_config 순서대로 반환합니다.
+        장부가 바뀔 때마다 증가하는 버전을 함께 반환하므로 버전이 같으면 이전 계산 결과를 재사용할 수 있습니다.
+        선점된 자원과 인스턴스 수도 사용 중인 것으로 포함됩니다.
+
+        :return: (버전, [{'name', 'order', 'limit', 'free', 'users'}])
+        """
+        self._ensure_loaded()
+        nodes = []
+        with self._lock:
+            self._expire_reservations()
+            for order, node in enumerate(node_config['nodes']):
+                limit = self._limits.get(node['name'])
+                if limit is None:
+                    continue
+                users = dict(self._user_counts.get(node['name'], {}))
+                for reservation in self._reservations.values():
+                    if reservation.node_name == node['name'] and reservation.user_name is not None:
+                        users[reservation.user_name] = (users.get(reservation.user_name, 0)
+                                                        + reservation.servers + reservation.containers)
+                nodes.append({'name': node['name'],
+                              'order': order,
+                              'limit': dict(limit),
+                              'free': self._free(node['name'], limit),
+                              'users': users})
+            return self._version, nodes
+
+    def _free(self, node_name: str, limit: dict) -> dict:
+        # self._lock을 잡은 상태에서 호출
+        usage = self._usage.get(node_name, {'vcpu': 0, 'ram': 0, 'disk': 0})
+        free = {resource: limit[resource] - usage[resource] for resource in RESOURCES}
+        for reservation in self._reservations.values():
+            if reservation.node_name == node_name:
+                for resource in RESOURCES:
+                    free[resource] -= getattr(reservation, resource)
+        return free
+
+    def _renew(self, reservation: Reservation, ttl: float) -> bool:
+        # self._lock을 잡은 상태에서 호출
+        expires_at = time.monotonic() + ttl
+        if reservation.id in self._reservations:
+            reservation.expires_at = max(reservation.expires_at, expires_at)
+            return True
+        if not reservation.expired:
+            # 이미 전환/해제된 선점
+            return False
+
+        limit = self._limits.get(reservation.node_name)
+        if limit is None:
+            return False
+        free = self._free(reservation.node_name, limit)
+        if any(free[resource] < getattr(reservation, resource) for resource in RESOURCES):
+            return False
+        reservation.expires_at = expires_at
+        reservation.expired = False
+        self._reservations[reservation.id] = reservation
+        self._version += 1
+        backend_logger.warning(f"[{reservation.node_name}] : 만료된 자원 선점 다시 선점 {reservation.id}")
+        return True
+
+    def _expire_reservations(self):
+        # self._lock을 잡은 상태에서 호출
+        now = time.monotonic()
+        expired = [reservation for reservation in self._reservations.values() if reservation.expires_at <= now]
+        for reservation in expired:
+            del self._reservations[reservation.id]
+            reservation.expired = True
+            backend_logger.warning(f"[{reservation.node_name}] : 자원 선점 만료 {reservation.id}")
+        if len(expired) != 0:
+            self._version += 1
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+
+resource_ledger = ResourceLedger(reservation_ttl=openstack_config['ledger']['reservation_ttl'])
@@ -0,0 +1,37 @@
+from database.table_versions import table_versions
+from util.cache import TTLCache
+from config.config import server_config
+
+
+class ResponseCache:
+    """
+    읽기 전용 목록 조회 응답을 메모리에 캐시합니다.
+    캐시 키에 응답이 의존하는 테이블들의 세대 번호가 포함되므로, 대여/반납/만료로 테이블이 바뀌어 커밋되면
+    다음 요청부터 새로 조회합니다. 이전 세대의 응답은 LRU로 밀려나며,
+    다른 프로세스에서 DB를 직접 수정한 경우에 대비해 ttl(초)이 지나도 만료됩니다.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get_or_load(self, name: str, tables: tuple[str, ...], loader, params: tuple = ()):
+        """
+        :param name: 응답 이름 (ex. server_list)
+        :param tables: 응답이 의존하는 테이블 이름들
+        :param loader: 캐시에 없을 때 응답 데이터를 만드는 함수
+        :param params: 응답을 구분하는 요청 파라미터
+        :return: 응답 데이터 (공유되는 객체이므로 수정하면 안 됨)
+        """
+        return self._cache.get_or_load((name, params, table_versions.get(*tables)), loader)
+
+    async def get_or_load_async(self, name: str, tables: tuple[str, ...], loader, params: tuple = ()):
+        """
+        get_or_load()의 비동기 버전입니다. loader는 코루틴 함수입니다.
+        """
+        return await self._cache.get_or_load_async((name, params, table_versions.get(*tables)), loader)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+response_cache = ResponseCache(maxsize=server_config['response_cache']['maxsize'],
+                               ttl=server_config['response_cache']['ttl'])
@@ -1,6 +1,11 @@
-import schedule
+import heapq
+import itertools
+import threading
 import time
-from datetime import datetime
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from database.factories import MySQLEngineFactory
@@ -8,28 +13,138 @@ from model.db_models import Server, Container
 from openStack.openstack_controller import OpenStackController
 from util.logger import get_logger
 from util.backend_utils import flavor_delete, network_delete
+from util.job_manager import job_manager
+from util.metrics import metrics, LONG_BUCKETS
+from util.resource_ledger import resource_ledger
+from config.config import openstack_config, server_config
 
 controller = OpenStackController()
 db_connection = MySQLEngineFactory().get_instance()
 backend_logger = get_logger(name='scheduler', log_level='INFO', save_path="./log/backend")
+# 주기 작업은 작업 이름, 만료 삭제는 expire_server/expire_container (재시도마다 기록)
+run_seconds = metrics.histogram('kws_scheduler_run_duration_seconds',
+                                '예약 작업 실행 시간',
+                                ('task', 'outcome'),
+                                LONG_BUCKETS)
 
 
-def delete_expired_data():
-    backend_logger.info("스케줄러 실행")
-    today = datetime.now().date()
+class ExpirySweeper:
+    """
+    대여 기간이 지난 서버/컨테이너를 노드별 워커 풀에서 병렬로 삭제합니다.
 
-    with Session(db_connection) as session, session.begin():
-        expired_servers = session.query(Server).filter(Server.end_date < today).all()
-        expired_containers = session.query(Container).filter(Container.end_date < today).all()
+    인스턴스마다 별도의 트랜잭션으로 OpenStack 삭제 -> DB 삭제 커밋(자원 장부 반영)을 수행하므로
+    하나가 실패해도 이미 삭제된 다른 인스턴스의 DB 상태는 롤백되지 않습니다.
+    실패한 인스턴스는 retry_interval(초) 간격으로 max_retries번까지 다시 시도하며,
+    OpenStack 삭제와 DB 삭제는 이미 삭제된 경우 건너뛰므로 여러 번 실행해도 안전합니다.
 
-        backend_logger.info("기간 지난 서버 삭제 시작")
-        for server in expired_servers:
-            flavor_name = server.flavor_name
-            network_name = server.network_name
+    커스텀 플레이버/내부 네트워크 정리는 다른 인스턴스가 사용 중인지 커밋된 상태로 판단해야 하므로
+    인스턴스 커밋 후 전역 잠금 안에서 순서대로 수행합니다.
+    """
+    def __init__(self, workers_per_node: int, max_retries: int, retry_interval: float):
+        self._workers_per_node = workers_per_node
+        self._max_retries = max_retries
+        self._retry_interval = retry_interval
+        self._executors: dict[str, ThreadPoolExecutor] = {}
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self._cleanup_lock = threading.Lock()
+
+    def sweep(self) -> dict[str, int]:
+        """
+        만료된 서버/컨테이너를 모두 삭제하고 끝날 때까지 기다립니다.
+
+        :return: {'succeeded': 삭제 성공 수, 'failed': 재시도 후에도 실패한 수}
+        """
+        today = datetime.now().date()
+        with Session(db_connection) as session:
+            expired_servers = session.execute(select(Server.server_name, Server.node_name)
+                                              .where(Server.end_date < today)).all()
+            expired_containers = session.execute(select(Container.container_name, Container.node_name)
+                                                 .where(Container.end_date < today)).all()
+        backend_logger.info(f"만료 대상 서버 {len(expired_servers)}건, 컨테이너 {len(expired_containers)}건")
+
+        futures = [self.submit_server(server.server_name, server.node_name) for server in expired_servers]
+        futures += [self.submit_container(container.container_name, container.node_name)
+                    for container in expired_containers]
+
+        result = {'succeeded': 0, 'failed': 0}
+        for future in futures:
+            if future is None:
+                continue
+            result['succeeded' if future.result() else 'failed'] += 1
+        backend_logger.info(f"만료 삭제 완료 {result}")
+        return result
+
+    def submit_server(self, server_name: str, node_name: str) -> Future | None:
+        """
+        :return: 삭제 성공 여부(bool)를 결과로 갖는 Future, 이미 삭제 중이면 None
+        """
+        return self._submit(('server', server_name), node_name, self._expire_server, server_name)
+
+    def submit_container(self, container_name: str, node_name: str) -> Future | None:
+        return self._submit(('container', container_name), node_name, self._expire_container, container_name)
+
+    def shutdown(self):
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, target: tuple, node_name: str, expire, name: str) -> Future | None:
+        with self._lock:
+            if target in self._inflight:
+                return None
+            self._inflight.add(target)
+            if node_name not in self._executors:
+                self._executors[node_name] = ThreadPoolExecutor(max_workers=self._workers_per_node,
+                                                                thread_name_prefix=f'sweeper-{node_name}')
+            executor = self._executors[node_name]
+        return executor.submit(self._run_with_retry, target, expire, name)
+
+    def _run_with_retry(self, target: tuple, expire, name: str) -> bool:
+        try:
+            for attempt in range(1, self._max_retries + 1):
+                start = time.perf_counter()
+                try:
+                    expire(name)
+                    run_seconds.observe(time.perf_counter() - start, task=f'expire_{target[0]}', outcome='success')
+                    return True
+                except Exception as e:
+                    run_seconds.observe(time.perf_counter() - start, task=f'expire_{target[0]}', outcome='failure')
+                    backend_logger.error(f"[{name}] : 만료 삭제 실패 ({attempt}/{self._max_retries}) {e}")
+                    if attempt < self._max_retries:
+                        time.sleep(self._retry_interval)
+            return False
+        finally:
+            with self._lock:
+                self._inflight.discard(target)
+
+    def _expire_server(self, server_name: str):
+        today = datetime.now().date()
+        with Session(db_connection) as session:
+            server = session.scalars(select(Server).where(Server.server_name == server_name)).one_or_none()
+            # 이미 반납되었거나 그 사이 연장된 서버
+            if server is None or server.end_date >= today:
+                return
+
+            flavor = server.flavor
             node_name = server.node_name
+            network_name = server.network_name
+            flavor_name = server.flavor_name
+
+            backend_logger.info(f"[{node_name}] : 기간 지난 서버 {server_name} 삭제")
+            controller.delete_server(server_name=server_name, node_name=node_name)
+            session.delete(server)
+            with resource_ledger.change(node_name=node_name,
+                                        vcpu=-flavor.vcpu,
+                                        ram=-flavor.ram,
+                                        disk=-flavor.disk,
+                                        servers=-1,
+                                        user_name=server.user_name):
+                session.commit()
 
-            controller.delete_server(server_name=server.server_name,
-                                     node_name=server.node_name)
+        with self._cleanup_lock, Session(db_connection) as session, session.begin():
             flavor_delete(session=session,
                           controller=controller,
                           flavor_name=flavor_name,
@@ -38,32 +153,206 @@ def delete_expired_data():
                            controller=controller,
                            network_name=network_name,
                            node_name=node_name)
-            session.delete(server)
 
-        backend_logger.info("기간 지난 컨테이너 삭제 시작")
-        for container in expired_containers:
-            network_name = container.network_name
+    def _expire_container(self, container_name: str):
+        today = datetime.now().date()
+        with Session(db_connection) as session:
+            container = session.scalars(select(Container)
+                                        .where(Container.container_name == container_name)).one_or_none()
+            if container is None or container.end_date >= today:
+                return
+
             node_name = container.node_name
+            network_name = container.network_name
+            cpu = container.cpu if container.cpu is not None else openstack_config['container']['cpu']
+            memory = container.memory if container.memory is not None else openstack_config['container']['memory']
+
+            backend_logger.info(f"[{node_name}] : 기간 지난 컨테이너 {container_name} 삭제")
+            controller.delete_container(container_name=container_name, node_name=node_name)
+            session.delete(container)
+            with resource_ledger.change(node_name=node_name,
+                                        vcpu=-cpu,
+                                        ram=-memory,
+                                        disk=0,
+                                        containers=-1,
+                                        user_name=container.user_name):
+                session.commit()
 
-            controller.delete_container(container_name=container.container_name,
-                                        node_name=container.node_name)
+        with self._cleanup_lock, Session(db_connection) as session, session.begin():
             network_delete(session=session,
                            controller=controller,
                            network_name=network_name,
                            node_name=node_name)
-            session.delete(container)
 
-        session.commit()
 
+sweeper = ExpirySweeper(workers_per_node=openstack_config['sweeper']['workers_per_node'],
+                        max_retries=openstack_config['sweeper']['max_retries'],
+                        retry_interval=openstack_config['sweeper']['retry_interval'])
+
+
+class DeadlineScheduler:
+    """
+    서버/컨테이너의 만료 기한과 주기 작업을 하나의 최소 힙으로 관리하고, 가장 가까운 기한에 맞춰 깨어나 실행합니다.
+
+    만료 기한은 대여 종료 일자 다음 날 0시에 인스턴스 이름으로 정해지는 0 ~ spread_seconds초의 오프셋을 더한 시각이며,
+    같은 날 만료되는 인스턴스들의 삭제가 한 시각에 몰리지 않고 고르게 분산됩니다.
+    삭제될 때까지 만료된 인스턴스의 자원은 원장에 선점된 채로 남으므로 spread_seconds는 수 분 정도로 짧게 둡니다.
+    기한이 된 인스턴스는 ExpirySweeper의 노드별 워커 풀로 넘겨 삭제합니다.
+
+    시작할 때 DB에서 모든 기한을 불러오며, 대여/연장/반납 시 schedule_*/cancel_*로 갱신합니다.
+    다른 프로세스에서의 변경이나 삭제에 실패한 인스턴스를 다시 반영하기 위해 resync_interval(초)마다 DB에서 다시 불러옵니다.
+    """
+    # 시스템 시계가 바뀌어도 기한을 놓치지 않도록 최대 대기 시간(초)마다 다시 확인
+    MAX_SLEEP = 60
+
+    def __init__(self, sweeper: ExpirySweeper, spread_seconds: int, resync_interval: float):
+        self._sweeper = sweeper
+        self._spread_seconds = spread_seconds
+        self._resync_interval = resync_interval
+        self._heap: list[tuple[float, int, tuple]] = []
+        self._due: dict[tuple, float] = {}
+        self._nodes: dict[tuple, str] = {}
+        self._periodic: dict[str, tuple[float, object]] = {}
+        self._seq = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def start(self):
+        self.load()
+        self.add_periodic('expiry_resync', self._resync_interval, self.load)
+        with self._condition:
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name='deadline-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def load(self):
+        """
+        DB의 모든 서버/컨테이너로 만료 기한을 다시 구성합니다.
+        """
+        with Session(db_connection) as session:
+            servers = session.execute(select(Server.server_name, Server.node_name, Server.end_date)).all()
+            containers = session.execute(select(Container.container_name, Container.node_name, Container.end_date)).all()
+
+        with self._condition:
+            for key in [key for key in self._due if key[0] != 'periodic']:
+                del self._due[key]
+            self._nodes.clear()
+            for server in servers:
+                self._set(('server', server.server_name), self._due_time('server', server.server_name, server.end_date),
+                          server.node_name)
+            for container in containers:
+                self._set(('container', container.container_name),
+                          self._due_time('container', container.container_name, container.end_date),
+                          container.node_name)
+            self._heap = [(due, next(self._seq), key) for key, due in self._due.items()]
+            heapq.heapify(self._heap)
+            self._condition.notify_all()
+        backend_logger.info(f"만료 기한 {len(servers) + len(containers)}건 등록")
+
+    def add_periodic(self, name: str, interval: float, func):
+        """
+        func를 interval(초)마다 스케줄러 스레드에서 실행합니다. 첫 실행은 interval초 후입니다.
+        """
+        with self._condition:
+            self._periodic[name] = (interval, func)
+            self._push(('periodic', name), time.time() + interval)
+
+    def schedule_server(self, server_name: str, node_name: str, end_date: date):
+        with self._condition:
+            self._push(('server', server_name), self._due_time('server', server_name, end_date), node_name)
 
-schedule.every().day.at("00:00").do(delete_expired_data)
+    def schedule_container(self, container_name: str, node_name: str, end_date: date):
+        with self._condition:
+            self._push(('container', container_name), self._due_time('container', container_name, end_date), node_name)
 
+    def cancel_server(self, server_name: str):
+        self._cancel(('server', server_name))
 
-def run_scheduler():
-    while True:
-        schedule.run_pending()
-        time.sleep(60)
+    def cancel_container(self, container_name: str):
+        self._cancel(('container', container_name))
+
+    def _due_time(self, kind: str, name: str, end_date: date) -> float:
+        expire_at = datetime.combine(end_date + timedelta(days=1), datetime.min.time()).timestamp()
+        if self._spread_seconds > 0:
+            expire_at += zlib.crc32(f'{kind}:{name}'.encode('utf-8')) % self._spread_seconds
+        return expire_at
+
+    def _set(self, key: tuple, due: float, node_name: str = None):
+        # self._condition을 잡은 상태에서 호출
+        self._due[key] = due
+        if node_name is not None:
+            self._nodes[key] = node_name
+
+    def _push(self, key: tuple, due: float, node_name: str = None):
+        # self._condition을 잡은 상태에서 호출, 같은 키의 이전 항목은 꺼낼 때 무시됨
+        self._set(key, due, node_name)
+        heapq.heappush(self._heap, (due, next(self._seq), key))
+        self._condition.notify_all()
+
+    def _cancel(self, key: tuple):
+        with self._condition:
+            self._due.pop(key, None)
+            self._nodes.pop(key, None)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopped:
+                        return
+                    # 연장/반납/재적재로 무효가 된 항목 제거
+                    while len(self._heap) != 0 and self._due.get(self._heap[0][2]) != self._heap[0][0]:
+                        heapq.heappop(self._heap)
+                    now = time.time()
+                    if len(self._heap) != 0 and self._heap[0][0] <= now:
+                        break
+                    timeout = self._heap[0][0] - now if len(self._heap) != 0 else self.MAX_SLEEP
+                    self._condition.wait(min(timeout, self.MAX_SLEEP))
+
+                due, _, key = heapq.heappop(self._heap)
+                del self._due[key]
+                node_name = self._nodes.pop(key, None)
+                if key[0] == 'periodic':
+                    interval, func = self._periodic[key[1]]
+                    self._push(key, max(due + interval, now))
+
+            start = time.perf_counter()
+            try:
+                if key[0] == 'server':
+                    self._sweeper.submit_server(key[1], node_name)
+                elif key[0] == 'container':
+                    self._sweeper.submit_container(key[1], node_name)
+                else:
+                    func()
+                    run_seconds.observe(time.perf_counter() - start, task=key[1], outcome='success')
+            except Exception as e:
+                if key[0] == 'periodic':
+                    run_seconds.observe(time.perf_counter() - start, task=key[1], outcome='failure')
+                backend_logger.error(f"[{key[1]}] : 예약 작업 실패 {e}")
+
+
+expiry_scheduler = DeadlineScheduler(sweeper=sweeper,
+                                     spread_seconds=openstack_config['sweeper']['spread_seconds'],
+                                     resync_interval=openstack_config['sweeper']['resync_interval'])
+expiry_scheduler.add_periodic('ledger_reconcile', openstack_config['ledger']['reconcile_interval'], resource_ledger.reconcile)
+expiry_scheduler.add_periodic('job_purge', server_config['job']['purge_interval'], job_manager.purge)
+
+
+def delete_expired_data():
+    """
+    만료 기한과 관계없이 지금 만료된 모든 서버/컨테이너를 한 번에 삭제합니다.
+    """
+    backend_logger.info("만료 일괄 삭제 실행")
+    sweeper.sweep()
 
 
 if __name__ == "__main__":
-    run_scheduler()
+    delete_expired_data()
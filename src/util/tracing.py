@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+from config.config import server_config
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+# 클라이언트가 보낸 요청 ID는 이 형식일 때만 그대로 사용
+_REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+_current_trace: ContextVar['Trace | None'] = ContextVar('current_trace', default=None)
+_current_span: ContextVar['Span | None'] = ContextVar('current_span', default=None)
+
+
+class Span:
+    __slots__ = ('span_id', 'parent_id', 'name', 'attributes', 'start', 'end', 'error', 'thread')
+
+    def __init__(self, name: str, parent_id: str | None, attributes: dict):
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = time.time()
+        self.end = None
+        self.error = None
+        self.thread = threading.current_thread().name
+
+
+class Trace:
+    """
+    요청 하나에서 기록한 span들의 타임라인입니다.
+    요청이 등록한 작업(job)에서 실행한 호출도 같은 트레이스에 기록되므로 응답을 보낸 뒤에도 span이 추가될 수 있습니다.
+    """
+    def __init__(self, request_id: str, name: str, max_spans: int):
+        self.request_id = request_id
+        self.name = name
+        self.started = time.time()
+        self.status_code = None
+        self.dropped = 0
+        self._spans: list[Span] = []
+        self._max_spans = max_spans
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            if len(self._spans) < self._max_spans:
+                self._spans.append(span)
+            else:
+                self.dropped += 1
+
+    def to_dict(self) -> dict:
+        """
+        span의 start_ms는 요청 시작 시점 기준 오프셋이며, 아직 끝나지 않은 span은 duration_ms가 None입니다.
+        """
+        with self._lock:
+            spans = sorted(self._spans, key=lambda span: span.start)
+        return {'request_id': self.request_id,
+                'name': self.name,
+                'started_at': datetime.fromtimestamp(self.started).isoformat(timespec='milliseconds'),
+                'status_code': self.status_code,
+                'dropped_spans': self.dropped,
+                'spans': [{'span_id': span.span_id,
+                           'parent_id': span.parent_id,
+                           'name': span.name,
+                           'start_ms': round((span.start - self.started) * 1000, 3),
+                           'duration_ms': round((span.end - span.start) * 1000, 3) if span.end is not None else None,
+                           'attributes': span.attributes,
+                           'error': span.error,
+                           'thread': span.thread} for span in spans]}
+
+
+class OtlpFileExporter:
+    """
+    끝난 span을 OTLP/JSON(ExportTraceServiceRequest) 형식으로 파일에 한 줄씩 기록합니다.
+    OpenTelemetry Collector의 otlpjsonfile 수신기로 수집할 수 있으며, 파일 쓰기는 백그라운드 스레드에서 모아서 처리합니다.
+    """
+    def __init__(self, path: str, service_name: str = 'kws-backend', batch_size: int = 256):
+        self._path = path
+        self._service_name = service_name
+        self._batch_size = batch_size
+        self._queue = queue.SimpleQueue()
+        directory = os.path.dirname(path)
+        if directory != '' and not os.path.exists(directory):
+            os.makedirs(directory)
+        threading.Thread(target=self._run, name='otlp-exporter', daemon=True).start()
+
+    def export(self, trace: Trace, span: Span):
+        self._queue.put((trace.request_id, span))
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size and not self._queue.empty():
+                batch.append(self._queue.get())
+            with open(self._path, 'a', encoding='utf-8') as file:
+                file.write(json.dumps(self._encode(batch), ensure_ascii=False) + '\n')
+
+    def _encode(self, batch: list[tuple[str, Span]]) -> dict:
+        spans = []
+        for request_id, span in batch:
+            encoded = {'traceId': _trace_id(request_id),
+                       'spanId': span.span_id,
+                       'name': span.name,
+                       'kind': 1,
+                       'startTimeUnixNano': str(int(span.start * 1e9)),
+                       'endTimeUnixNano': str(int(span.end * 1e9)),
+                       'attributes': [{'key': key, 'value': {'stringValue': str(value)}}
+                                      for key, value in span.attributes.items()] +
+                                     [{'key': 'kws.request_id', 'value': {'stringValue': request_id}},
+                                      {'key': 'thread.name', 'value': {'stringValue': span.thread}}],
+                       'status': {'code': 2, 'message': span.error} if span.error is not None else {'code': 1}}
+            if span.parent_id is not None:
+                encoded['parentSpanId'] = span.parent_id
+            spans.append(encoded)
+        return {'resourceSpans': [{'resource': {'attributes': [{'key': 'service.name',
+                                                                'value': {'stringValue': self._service_name}}]},
+                                   'scopeSpans': [{'scope': {'name': 'kws.tracing'}, 'spans': spans}]}]}
+
+
+class Tracer:
+    """
+    요청 ID별로 컨트롤러/DB 호출의 소요 시간을 span으로 기록하고 최근 max_traces개의 트레이스를 링 버퍼로 유지합니다.
+
+    현재 트레이스는 contextvars로 전달되므로 run_in_threadpool과 작업(job) 워커처럼 컨텍스트를 복사해 실행하는 곳에서는
+    인자로 넘기지 않아도 같은 트레이스에 기록됩니다. 트레이스가 없는 곳(예약 작업, 예비 서버 등)의 span()은 아무것도 기록하지 않습니다.
+    """
+    def __init__(self, max_traces: int, max_spans: int, exporter: OtlpFileExporter | None = None):
+        self._max_traces = max_traces
+        self._max_spans = max_spans
+        self._exporter = exporter
+        self._traces: OrderedDict[str, Trace] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, request_id: str, name: str):
+        """
+        새 트레이스를 시작해 현재 컨텍스트의 트레이스로 지정합니다.
+
+        :return: end()에 넘길 토큰
+        """
+        trace = Trace(request_id, name, self._max_spans)
+        with self._lock:
+            self._traces.pop(request_id, None)
+            self._traces[request_id] = trace
+            while len(self._traces) > self._max_traces:
+                self._traces.popitem(last=False)
+        return _current_trace.set(trace)
+
+    def end(self, token, status_code: int):
+        _current_trace.get().status_code = status_code
+        _current_trace.reset(token)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        with 블록의 실행 시간을 현재 트레이스에 span으로 기록합니다. 예외가 발생하면 span에 기록한 뒤 그대로 던집니다.
+        """
+        trace = _current_trace.get()
+        if trace is None:
+            yield
+            return
+
+        parent = _current_span.get()
+        span = Span(name, parent.span_id if parent is not None else None, attributes)
+        trace.add(span)
+        token = _current_span.set(span)
+        try:
+            yield
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            self._finish(trace, span)
+
+    def record(self, name: str, start: float, error: str | None = None, **attributes):
+        """
+        이미 끝난 호출을 span으로 기록합니다. with 블록으로 감쌀 수 없는 곳(ex. SQLAlchemy 이벤트)에서 사용합니다.
+
+        :param start: 호출 시작 시각 (time.time())
+        """
+        trace = _current_trace.get()
+        if trace is None:
+            return
+        parent = _current_span.get()
+        span = Span(name, parent.span_id if parent is not None else None, attributes)
+        span.start = start
+        span.error = error
+        trace.add(span)
+        self._finish(trace, span)
+
+    def is_active(self) -> bool:
+        return _current_trace.get() is not None
+
+    def get(self, request_id: str) -> dict | None:
+        with self._lock:
+            trace = self._traces.get(request_id)
+        return trace.to_dict() if trace is not None else None
+
+    def recent(self) -> list[dict]:
+        """
+        최근 트레이스 요약 (최신순)
+        """
+        with self._lock:
+            traces = list(self._traces.values())
+        return [{'request_id': trace.request_id,
+                 'name': trace.name,
+                 'started_at': datetime.fromtimestamp(trace.started).isoformat(timespec='milliseconds'),
+                 'status_code': trace.status_code} for trace in reversed(traces)]
+
+    def _finish(self, trace: Trace, span: Span):
+        span.end = time.time()
+        if self._exporter is not None:
+            self._exporter.export(trace, span)
+
+
+def current_request_id() -> str | None:
+    trace = _current_trace.get()
+    return trace.request_id if trace is not None else None
+
+
+def request_id_from(header: str | None) -> str:
+    """
+    클라이언트가 보낸 X-Request-ID가 올바른 형식이면 그대로 사용하고, 아니면 새로 발급합니다.
+    """
+    if header is not None and _REQUEST_ID_PATTERN.match(header):
+        return header
+    return os.urandom(16).hex()
+
+
+def _trace_id(request_id: str) -> str:
+    # OTLP traceId는 16바이트(hex 32자리), 직접 발급한 요청 ID는 그대로 사용
+    if re.fullmatch(r'[0-9a-f]{32}', request_id):
+        return request_id
+    return hashlib.sha256(request_id.encode('utf-8')).hexdigest()[:32]
+
+
+tracer = Tracer(max_traces=server_config['tracing']['max_traces'],
+                max_spans=server_config['tracing']['max_spans'],
+                exporter=OtlpFileExporter(server_config['tracing']['otlp_file'])
+                if server_config['tracing']['otlp_file'] is not None else None)
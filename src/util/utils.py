@@ -1,3 +1,6 @@
+import base64
+import io
+import json
 import paramiko
 import re
 from datetime import date
@@ -24,18 +27,23 @@ def cloud_init_creator(server_name: str,
 
 
 def validate_ssh_key(**kwargs) -> bool:
+    """
+    timeout(초)을 지정하면 TCP 연결, SSH 배너, 인증 대기에 각각 적용됩니다.
+    """
     client = paramiko.SSHClient()
     client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
 
     host_name = kwargs['host_name']
     user_name = kwargs['user_name']
+    timeout = kwargs.get('timeout')
+    timeouts = {'timeout': timeout, 'banner_timeout': timeout, 'auth_timeout': timeout} if timeout is not None else {}
 
     try:
         if kwargs['private_key'] != "":
             key = paramiko.RSAKey.from_private_key(kwargs['private_key'])
-            client.connect(hostname=host_name, username=user_name, pkey=key)
+            client.connect(hostname=host_name, username=user_name, pkey=key, **timeouts)
         else:
-            client.connect(hostname=host_name, username=user_name, password=kwargs['password'])
+            client.connect(hostname=host_name, username=user_name, password=kwargs['password'], **timeouts)
     except Exception as e:
         backend_logger.error(e)
         return False
@@ -45,6 +53,69 @@ def validate_ssh_key(**kwargs) -> bool:
     return True
 
 
+def generate_key_pair() -> tuple[str, str]:
+    """
+    :return: (PEM 형식 개인키, OpenSSH 형식 공개키)
+    """
+    key = paramiko.RSAKey.generate(2048)
+    private_key = io.StringIO()
+    key.write_private_key(private_key)
+    return private_key.getvalue(), f"{key.get_name()} {key.get_base64()}"
+
+
+def apply_credentials(host_name: str,
+                      login_user: str,
+                      login_key: str,
+                      user_name: str,
+                      password: str | None,
+                      public_key: str | None,
+                      timeout: float = 30):
+    """
+    cloud-init으로 생성된 서버에 접속 정보를 나중에 적용합니다.
+    login_user로 접속해 sudo 권한을 가진 user_name 계정을 만들고 password 또는 public_key로 접속할 수 있게 한 뒤,
+    login_user의 비밀번호와 공개키를 제거해 더 이상 login_user로는 접속할 수 없게 합니다.
+    비밀번호와 공개키는 명령어 인자가 아닌 표준 입력으로 전달합니다.
+
+    :param host_name: 접속할 서버의 IP
+    :param login_user: 접속할 계정
+    :param login_key: login_user의 개인키(PEM)
+    :param user_name: 생성할 계정 (서버 이름)
+    :param password: user_name의 비밀번호, None일 경우 public_key 등록
+    :param public_key: user_name에 등록할 공개키
+    :param timeout: 명령어별 타임아웃(초)
+    """
+    home = f"/home/{user_name}"
+    commands = [(f"sudo useradd -m -s /bin/bash {user_name}", None),
+                (f"sudo tee /etc/sudoers.d/90-{user_name}", f"{user_name} ALL=(ALL) NOPASSWD:ALL\n"),
+                (f"sudo hostnamectl set-hostname {user_name}", None)]
+    if password is not None:
+        commands.append(("sudo chpasswd", f"{user_name}:{password}\n"))
+    else:
+        commands += [(f"sudo install -d -m 700 -o {user_name} -g {user_name} {home}/.ssh", None),
+                     (f"sudo tee {home}/.ssh/authorized_keys", public_key + "\n"),
+                     (f"sudo chown {user_name}:{user_name} {home}/.ssh/authorized_keys", None),
+                     (f"sudo chmod 600 {home}/.ssh/authorized_keys", None)]
+    commands += [(f"sudo passwd -l {login_user}", None),
+                 ("rm -f ~/.ssh/authorized_keys", None)]
+
+    client = paramiko.SSHClient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    try:
+        client.connect(hostname=host_name,
+                       username=login_user,
+                       pkey=paramiko.RSAKey.from_private_key(io.StringIO(login_key)),
+                       timeout=timeout)
+        for command, stdin_data in commands:
+            stdin, stdout, _ = client.exec_command(command, timeout=timeout)
+            if stdin_data is not None:
+                stdin.write(stdin_data)
+                stdin.channel.shutdown_write()
+            if stdout.channel.recv_exit_status() != 0:
+                raise Exception(f"접속 정보 적용 실패: {command}")
+    finally:
+        client.close()
+
+
 def gateway_extractor(cidr: str):
     # EX) 192.168.0.0/24 -> 192.168.0.1 반환
     return cidr[:-4] + '1'
@@ -100,3 +171,15 @@ def str_to_date(date_str: str):
 
 def extension_date_check(old_end_date: date, new_end_date: date):
     return old_end_date < new_end_date
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({'id': last_id}).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> int:
+    # 잘못된 커서는 ValueError
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))['id'])
+    except Exception:
+        raise ValueError("잘못된 커서입니다.")
@@ -0,0 +1,296 @@
+import io
+import math
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database.factories import MySQLEngineFactory
+from model.db_models import Server
+from openStack.connection import connection_registry
+from openStack.openstack_controller import OpenStackController
+from util.logger import get_logger
+from util.resource_ledger import Reservation, RESOURCES, resource_ledger
+from util.scheduler import expiry_scheduler
+from util.utils import validate_ssh_key
+from config.config import openstack_config
+
+controller = OpenStackController()
+db_connection = MySQLEngineFactory().get_instance()
+backend_logger = get_logger(name='backend', log_level='INFO', save_path="./log/backend")
+
+WARM_SERVER_NAME = re.compile(r'^warm[0-9a-f]{12}$')
+SSH_POLL_INTERVAL = 5
+
+
+class WarmServer:
+    """
+    미리 부팅해 둔 서버입니다.
+    name 계정으로 private_key를 사용해 접속할 수 있으며, reservation으로 노드의 자원을 잡아 두고 있습니다.
+    """
+    def __init__(self,
+                 name: str,
+                 image_name: str,
+                 flavor_name: str,
+                 node_name: str,
+                 floating_ip: str,
+                 private_key: str,
+                 reservation: Reservation):
+        self.name = name
+        self.image_name = image_name
+        self.flavor_name = flavor_name
+        self.node_name = node_name
+        self.floating_ip = floating_ip
+        self.private_key = private_key
+        self.reservation = reservation
+
+
+class WarmPool:
+    """
+    (이미지, 플레이버, 노드)별로 기본 내부 네트워크에 서버를 미리 부팅해 두었다가
+    조건이 맞는 대여 요청에 넘겨주어 부팅과 유동 IP 할당을 기다리지 않게 합니다.
+
+    풀의 서버는 만료되지 않는 자원 선점으로 노드의 자원을 잡아 두므로 배치 시 사용 중인 자원으로 계산되며,
+    대여되면 그 선점이 그대로 사용량으로 전환됩니다.
+    노드별로 풀이 잡아 둘 수 있는 자원은 노드 한도의 max_hold_ratio 이하로 제한됩니다.
+    대여되거나 삭제된 자리는 refill_workers개의 워커가 백그라운드에서 다시 채우며,
+    자원이 부족해 채우지 못한 자리는 refill_interval(초)마다 다시 시도합니다.
+
+    풀의 서버 정보(개인키)는 메모리에만 있으므로 시작할 때 이전 실행에서 남은 풀 서버는 삭제하고 새로 채웁니다.
+    """
+    def __init__(self,
+                 pools: list[dict],
+                 max_hold_ratio: float,
+                 refill_workers: int,
+                 ssh_timeout: float):
+        flavors = {flavor['name']: flavor for flavor in openstack_config['flavors']}
+        for pool in pools:
+            if pool['flavor'] not in flavors:
+                raise ValueError(f"예비 서버 풀에는 기본 플레이버만 사용할 수 있습니다: {pool['flavor']}")
+
+        self._sizes = {(pool['image'], pool['flavor'], pool['node']): pool['size'] for pool in pools}
+        self._flavors = flavors
+        self._max_hold_ratio = max_hold_ratio
+        self._refill_workers = refill_workers
+        self._ssh_timeout = ssh_timeout
+        self._ready: dict[tuple, deque[WarmServer]] = {key: deque() for key in self._sizes}
+        self._booting: dict[tuple, int] = {key: 0 for key in self._sizes}
+        self._held: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._stopped = True
+
+    def start(self):
+        """
+        이전 실행에서 남은 풀 서버를 삭제하고 풀을 채우기 시작합니다. 채우기는 백그라운드에서 진행됩니다.
+        """
+        if len(self._sizes) == 0:
+            return
+        with self._lock:
+            self._stopped = False
+            self._executor = ThreadPoolExecutor(max_workers=self._refill_workers, thread_name_prefix='warm-pool')
+        self._executor.submit(self._cleanup_and_refill)
+
+    def stop(self):
+        """
+        채우기를 중단합니다. 풀의 서버는 삭제하지 않으며 다음 시작 시 정리됩니다.
+        """
+        with self._lock:
+            self._stopped = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def claim(self, image_name: str, flavor_name: str, user_name: str) -> WarmServer | None:
+        """
+        이미지와 플레이버가 같은 예비 서버를 하나 꺼내고 빈자리를 채웁니다.
+        꺼낸 서버의 자원 선점은 user_name의 대여로 바뀌므로 DB 커밋 시 claim()으로 전환하면 됩니다.
+
+        :return: 예비 서버, 없으면 None
+        """
+        with self._lock:
+            if self._stopped:
+                return None
+            for key, ready in self._ready.items():
+                if key[0] == image_name and key[1] == flavor_name and len(ready) != 0 \
+                        and connection_registry.is_healthy(key[2]):
+                    warm_server = ready.popleft()
+                    self._hold(warm_server.node_name, warm_server.flavor_name, -1)
+                    break
+            else:
+                return None
+
+        warm_server.reservation.user_name = user_name
+        backend_logger.info(f"[{warm_server.node_name}] : 예비 서버 {warm_server.name} 대여")
+        self.refill()
+        return warm_server
+
+    def give_back(self, warm_server: WarmServer):
+        """
+        꺼냈지만 손대지 않은 예비 서버를 풀에 되돌립니다.
+        """
+        warm_server.reservation.user_name = None
+        key = (warm_server.image_name, warm_server.flavor_name, warm_server.node_name)
+        with self._lock:
+            if not self._stopped:
+                self._hold(warm_server.node_name, warm_server.flavor_name)
+                self._ready[key].appendleft(warm_server)
+                return
+        self.discard(warm_server)
+
+    def discard(self, warm_server: WarmServer):
+        """
+        예비 서버를 삭제하고 자원 선점을 해제합니다.
+        """
+        try:
+            controller.delete_server(server_name=warm_server.name,
+                                     node_name=warm_server.node_name,
+                                     server_ip=warm_server.floating_ip)
+        except Exception as e:
+            backend_logger.error(f"[{warm_server.node_name}] : 예비 서버 {warm_server.name} 삭제 실패 {e}")
+        finally:
+            resource_ledger.release(warm_server.reservation)
+
+    def refill(self):
+        """
+        모든 풀의 빈자리만큼 예비 서버 생성을 워커에 등록합니다.
+        """
+        with self._lock:
+            if self._stopped:
+                return
+            for key, size in self._sizes.items():
+                missing = size - len(self._ready[key]) - self._booting[key]
+                for _ in range(missing):
+                    self._booting[key] += 1
+                    self._executor.submit(self._boot, key)
+
+    def stats(self) -> list[dict]:
+        with self._lock:
+            return [{'image': key[0],
+                     'flavor': key[1],
+                     'node': key[2],
+                     'size': size,
+                     'ready': len(self._ready[key]),
+                     'booting': self._booting[key]} for key, size in self._sizes.items()]
+
+    def _cleanup_and_refill(self):
+        with Session(db_connection) as session:
+            rented = set(session.scalars(select(Server.server_name)).all())
+
+        for node_name in {key[2] for key in self._sizes}:
+            try:
+                leftovers = [server for server in controller.find_servers(node_name=node_name)
+                             if WARM_SERVER_NAME.match(server.name) and server.name not in rented]
+            except Exception as e:
+                backend_logger.error(f"[{node_name}] : 남은 예비 서버 조회 실패 {e}")
+                continue
+            for server in leftovers:
+                backend_logger.info(f"[{node_name}] : 남은 예비 서버 {server.name} 삭제")
+                try:
+                    controller.delete_server(server_name=server.name,
+                                             node_name=node_name,
+                                             server_ip=_floating_ip(server))
+                except Exception as e:
+                    backend_logger.error(f"[{node_name}] : 예비 서버 {server.name} 삭제 실패 {e}")
+        self.refill()
+
+    def _boot(self, key: tuple):
+        image_name, flavor_name, node_name = key
+        try:
+            reservation = self._reserve(node_name, flavor_name)
+            if reservation is None:
+                backend_logger.info(f"[{node_name}] : 자원이 부족해 예비 서버를 채우지 않음 ({image_name}, {flavor_name})")
+                return
+
+            name = f"warm{uuid.uuid4().hex[:12]}"
+            floating_ip = None
+            try:
+                backend_logger.info(f"[{node_name}] : 예비 서버 {name} 생성")
+                server, private_key = controller.create_server(server_name=name,
+                                                               image_name=image_name,
+                                                               flavor_name=flavor_name,
+                                                               network_name=openstack_config['internal_network']['name'],
+                                                               password=None,
+                                                               cloud_init="ssh_pwauth: True",
+                                                               node_name=node_name)
+                floating_ip = controller.allocate_floating_ip(server=server, node_name=node_name)
+                self._wait_for_ssh(floating_ip, name, private_key)
+            except Exception as e:
+                backend_logger.error(f"[{node_name}] : 예비 서버 {name} 생성 실패 {e}")
+                self.discard(WarmServer(name, image_name, flavor_name, node_name, floating_ip, "", reservation))
+                with self._lock:
+                    self._hold(node_name, flavor_name, -1)
+                return
+
+            warm_server = WarmServer(name, image_name, flavor_name, node_name, floating_ip, private_key, reservation)
+            with self._lock:
+                if not self._stopped:
+                    self._ready[key].append(warm_server)
+                    backend_logger.info(f"[{node_name}] : 예비 서버 {name} 준비 완료")
+                    return
+                self._hold(node_name, flavor_name, -1)
+            # 준비되는 동안 풀이 중지됨, 서버는 다음 시작 시 정리
+            resource_ledger.release(reservation)
+        finally:
+            with self._lock:
+                self._booting[key] -= 1
+
+    def _reserve(self, node_name: str, flavor_name: str) -> Reservation | None:
+        flavor = self._flavors[flavor_name]
+        _, nodes = resource_ledger.snapshot()
+        limit = next((node['limit'] for node in nodes if node['name'] == node_name), None)
+        if limit is None:
+            return None
+
+        with self._lock:
+            held = self._held.get(node_name, {resource: 0 for resource in RESOURCES})
+            if any(held[resource] + flavor[resource] > limit[resource] * self._max_hold_ratio for resource in RESOURCES):
+                return None
+            reservation = resource_ledger.reserve(node_name=node_name,
+                                                  vcpu=flavor['vcpu'],
+                                                  ram=flavor['ram'],
+                                                  disk=flavor['disk'],
+                                                  servers=1,
+                                                  ttl=math.inf)
+            if reservation is not None:
+                self._hold(node_name, flavor_name)
+        return reservation
+
+    def _hold(self, node_name: str, flavor_name: str, count: int = 1):
+        # self._lock을 잡은 상태에서 호출, 풀이 노드에 잡아 둔 자원(준비/생성 중인 서버)을 count개만큼 더하거나 뺌
+        held = self._held.setdefault(node_name, {resource: 0 for resource in RESOURCES})
+        for resource in RESOURCES:
+            held[resource] += self._flavors[flavor_name][resource] * count
+
+    def _wait_for_ssh(self, floating_ip: str, user_name: str, private_key: str):
+        deadline = time.monotonic() + self._ssh_timeout
+        # 연결은 받지만 SSH 배너를 보내지 않는(부팅 중인) 서버에서 멈추지 않도록 접속 시도마다 남은 시간만큼만 대기
+        while not validate_ssh_key(host_name=floating_ip,
+                                   user_name=user_name,
+                                   private_key=io.StringIO(private_key),
+                                   password="",
+                                   timeout=max(1.0, deadline - time.monotonic())):
+            if time.monotonic() >= deadline:
+                raise Exception("예비 서버 SSH 접속 대기 시간 초과")
+            time.sleep(SSH_POLL_INTERVAL)
+
+
+def _floating_ip(server) -> str | None:
+    for addresses in (server.addresses or {}).values():
+        for address in addresses:
+            if address.get('OS-EXT-IPS:type') == 'floating':
+                return address['addr']
+    return None
+
+
+warm_pool = WarmPool(pools=openstack_config['warm_pool']['pools'] if openstack_config['warm_pool']['enabled'] else [],
+                     max_hold_ratio=openstack_config['warm_pool']['max_hold_ratio'],
+                     refill_workers=openstack_config['warm_pool']['refill_workers'],
+                     ssh_timeout=openstack_config['warm_pool']['ssh_timeout'])
+
+if openstack_config['warm_pool']['enabled']:
+    expiry_scheduler.add_periodic('warm_pool_refill', openstack_config['warm_pool']['refill_interval'], warm_pool.refill)